@@ -0,0 +1,68 @@
+"""
+Benchmark: image download stage against the local mock site
+
+    python -m benchmarks.bench_images [--listings 500] [--concurrency 32]
+        [--per-host 8] [--latency 0.02] [--variant 600x338] [--error-rate 0.01]
+
+Downloads every image of --listings synthetic listings (listings share
+photos in groups of --reuse, like reposts) into a fresh store, then runs
+again to show the manifest resume. Reports images/s, MB/s and how many
+files content-addressing saved.
+"""
+
+import argparse
+import logging
+import tempfile
+
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.images import ImageDownloader
+
+from .mock_site import MockSiteConfig, MockSiteProcess, image_urls
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--listings", type=int, default=500)
+    ap.add_argument("--images", type=int, default=6, help="Images per listing")
+    ap.add_argument("--reuse", type=int, default=3, help="Listings sharing one set of photos")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--per-host", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--variant", default=None, help='e.g. "600x338"')
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    site_config = MockSiteConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        images_per_listing=args.images,
+        image_reuse=args.reuse,
+    )
+
+    with MockSiteProcess(site_config) as site:
+        urls = [
+            url for listing_id in range(200_000, 200_000 + args.listings)
+            for url in image_urls(site_config, site.base_url, listing_id)
+        ]
+        config = BatDongSanConfig(
+            output_dir=tempfile.mkdtemp(prefix="bench_images_"),
+            image_retry_backoff_seconds=0.1,
+        )
+        print(f"Mock site {site.base_url}: {len(urls)} images, latency {args.latency * 1000:.0f}ms, "
+              f"{args.concurrency} workers, {args.per_host} per host")
+        print(f"  {'run':<8} {'ok':>7} {'skipped':>8} {'stored':>7} {'dupes':>7} {'errors':>7} "
+              f"{'seconds':>8} {'img/s':>8} {'MB/s':>7}")
+
+        for run in ("cold", "resume"):
+            downloader = ImageDownloader(config, args.concurrency, args.per_host, args.variant)
+            if not args.verbose:
+                downloader.logger.setLevel(logging.ERROR)
+            r = downloader.download(urls)
+            mb_per_s = r["bytes_downloaded"] / 1e6 / r["seconds"] if r["seconds"] else 0.0
+            print(f"  {run:<8} {r['ok']:>7} {r['skipped']:>8} {r['stored']:>7} {r['duplicates']:>7} "
+                  f"{r['errors']:>7} {r['seconds']:>8.2f} {r['images_per_second']:>8.1f} {mb_per_s:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Benchmark: HTML parsing on recorded pages
+
+    python -m benchmarks.bench_parsers [--repeat 20] [--backends html.parser lxml]
+    python -m benchmarks.bench_parsers --update-golden
+    python -m benchmarks.bench_parsers --record URL [URL ...]
+    python -m benchmarks.bench_parsers --render-details 6 --update-golden
+
+Times soup construction, _parse_detail_page and each _parse_* helper on
+detail pages, card extraction and _parse_post_date on listing pages, for
+every installed BeautifulSoup backend. Reports pages/s and the peak memory
+allocated per page, and checks every backend's output against
+benchmarks/fixtures/golden.json so speedups cannot change results unnoticed.
+Detail pages are also checked cut where detail_stream_cutoff would close
+the connection, with the share of bytes that cut-off saves.
+
+Corpus: benchmarks/fixtures/{listing,detail}_*.html, rendered by the mock
+site (--render-details re-renders the detail pages, trailer included).
+--record saves more pages (URLs ending in -r<id> are detail pages).
+test/debug.html, a batdongsan.com.vn page with different (re__) markup, is
+only a negative case: it must parse to empty fields.
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.scraper import BatDongSanScraper
+from scraper.batdongsan.streaming import MarkerCutoff
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+GOLDEN_PATH = os.path.join(FIXTURES_DIR, "golden.json")
+# Pages of other sites whose markup the parser must not pick anything from
+NEGATIVE_DETAIL_PAGES = [os.path.join(os.path.dirname(__file__), os.pardir, "test", "debug.html")]
+
+# Dates are relative ("2 giờ trước"); golden output is pinned to this day
+REFERENCE_DATE = date(2026, 1, 2)
+
+BACKEND_MODULES = {"html.parser": None, "lxml": "lxml", "html5lib": "html5lib"}
+
+
+def available_backends() -> List[str]:
+    return [
+        name for name, module in BACKEND_MODULES.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def read_pages(paths: List[str]) -> Dict[str, str]:
+    """name -> HTML of the paths that exist"""
+    pages = {}
+    for path in sorted(paths):
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def load_corpus() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(listing pages, detail pages) as name -> HTML"""
+    listings = read_pages(glob.glob(os.path.join(FIXTURES_DIR, "listing_*.html")))
+    details = read_pages(glob.glob(os.path.join(FIXTURES_DIR, "detail_*.html")))
+    return listings, details
+
+
+def check_negative(backend: str) -> List[str]:
+    """Negative pages for which the parser returned any non-empty field"""
+    with make_scraper(backend) as scraper:
+        return [
+            name for name, html in read_pages(NEGATIVE_DETAIL_PAGES).items()
+            if any(scraper._parse_detail_page(BeautifulSoup(html, backend)).values())
+        ]
+
+
+@contextmanager
+def make_scraper(backend: str) -> Iterator[BatDongSanScraper]:
+    """Scraper pinned to REFERENCE_DATE, closed with its temporary output dir"""
+    with tempfile.TemporaryDirectory(prefix="bench_parsers_") as output_dir:
+        with BatDongSanScraper(BatDongSanConfig(output_dir=output_dir, html_parser=backend)) as scraper:
+            scraper.today = REFERENCE_DATE
+            yield scraper
+
+
+def extract_cards(scraper: BatDongSanScraper, soup: BeautifulSoup) -> List[Dict]:
+    """Card extraction as _crawl_listing_page_once does it, without fetching"""
+    cards = [
+        card for card in soup.find_all("a", class_="card-cm")
+        if (card.get("href") or "").startswith("http")
+    ]
+    items = []
+    for card in cards:
+        item = {"url": card.get("href"), "post_date": scraper._extract_post_date(card)}
+        item.update(scraper._extract_card_fields(card))
+        items.append(item)
+    return items
+
+
+def outputs(scraper: BatDongSanScraper, listings: Dict[str, str], details: Dict[str, str]) -> Dict:
+    """Parsed result of every corpus page - what the golden file holds"""
+    backend = scraper.config.html_parser
+    result = {}
+    for name, html in listings.items():
+        items = extract_cards(scraper, BeautifulSoup(html, backend))
+        for item in items:
+            parsed = scraper._parse_post_date(item["post_date"])
+            item["parsed_date"] = str(parsed) if parsed else None
+        result[name] = items
+    for name, html in details.items():
+        result[name] = scraper._parse_detail_page(BeautifulSoup(html, backend))
+    return result
+
+
+def check_cutoff(details: Dict[str, str], golden: Dict) -> Tuple[List[str], List[str], float]:
+    """
+    (pages whose cut-off parse differs from golden, pages the cut-off did
+    not truncate, share of bytes cut off)
+    """
+    mismatched = []
+    uncut = []
+    total = kept = 0
+    with make_scraper("html.parser") as scraper:
+        config = scraper.config
+        for name, html in details.items():
+            body = html.encode("utf-8")
+            cut = MarkerCutoff.cut(body, config.detail_cutoff_markers, config.detail_cutoff_margin)
+            total += len(body)
+            kept += len(cut)
+            if len(cut) == len(body):
+                uncut.append(name)
+                continue
+            parsed = scraper._parse_detail_page(BeautifulSoup(cut.decode("utf-8", "ignore"), config.html_parser))
+            if parsed != golden.get(name):
+                mismatched.append(name)
+    return mismatched, uncut, 1 - kept / total if total else 0.0
+
+
+def time_per_page(fn: Callable, inputs: List, repeat: int) -> float:
+    """Best-of-repeat seconds for one pass over inputs, divided by len(inputs)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in inputs:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs)
+
+
+def peak_kib_per_page(fn: Callable, inputs: List) -> float:
+    """Mean peak traced allocation while processing one input"""
+    total = 0
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(item)
+            total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return total / len(inputs) / 1024
+
+
+def bench_backend(backend: str, listings: Dict[str, str], details: Dict[str, str], repeat: int) -> List[Tuple]:
+    with make_scraper(backend) as scraper:
+        return _bench_cases(scraper, backend, listings, details, repeat)
+
+
+def _bench_cases(scraper: BatDongSanScraper, backend: str, listings: Dict[str, str],
+                 details: Dict[str, str], repeat: int) -> List[Tuple]:
+    detail_html = list(details.values())
+    listing_html = list(listings.values())
+    detail_soups = [BeautifulSoup(html, backend) for html in detail_html]
+    listing_soups = [BeautifulSoup(html, backend) for html in listing_html]
+    date_strs = [item["post_date"] for soup in listing_soups for item in extract_cards(scraper, soup)]
+
+    cases = [
+        ("detail: soup", lambda html: BeautifulSoup(html, backend), detail_html),
+        ("detail: _parse_detail_page", scraper._parse_detail_page, detail_soups),
+        ("detail: soup + parse", lambda html: scraper._parse_detail_page(BeautifulSoup(html, backend)), detail_html),
+        ("detail: _parse_description", scraper._parse_description, detail_soups),
+        ("detail: _parse_category", scraper._parse_category, detail_soups),
+        ("detail: _parse_images", scraper._parse_images, detail_soups),
+        ("detail: _parse_detail_info", scraper._parse_detail_info, detail_soups),
+        ("listing: soup", lambda html: BeautifulSoup(html, backend), listing_html),
+        ("listing: card extraction", lambda soup: extract_cards(scraper, soup), listing_soups),
+        ("card: _parse_post_date", scraper._parse_post_date, date_strs),
+    ]
+
+    rows = []
+    for label, fn, inputs in cases:
+        if not inputs:
+            continue
+        seconds = time_per_page(fn, inputs, repeat)
+        rows.append((label, seconds, peak_kib_per_page(fn, inputs)))
+    return rows
+
+
+def render_details(count: int) -> None:
+    """Write detail fixtures as the mock site serves them (trailer included)"""
+    from .mock_site import MockSiteConfig, render_detail_page
+
+    config = MockSiteConfig()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for listing_id in range(200_000, 200_000 + count):
+        html = render_detail_page(config, listing_id)
+        name = f"detail_{listing_id}.html"
+        with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"  rendered {name} ({len(html):,} chars)")
+
+
+def record(urls: List[str]) -> None:
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory() as output_dir:
+        headers = BatDongSanConfig(output_dir=output_dir).headers
+    for url in urls:
+        response = requests.get(url, headers=headers, timeout=30)
+        response.raise_for_status()
+        match = re.search(r"-r(\d+)/?$", url.split("?", 1)[0])
+        if match:
+            name = f"detail_{match.group(1)}.html"
+        else:
+            slug = re.sub(r"[^a-z0-9]+", "-", url.split("://", 1)[-1].lower()).strip("-")
+            name = f"listing_{slug}.html"
+        with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"  saved {name} ({len(response.text):,} chars)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--backends", nargs="+", default=None, help="Default: every installed backend")
+    ap.add_argument("--update-golden", action="store_true", help="Rewrite golden.json from html.parser")
+    ap.add_argument("--record", nargs="+", metavar="URL", help="Save pages into the fixture corpus")
+    ap.add_argument("--render-details", type=int, default=None, metavar="N",
+                    help="Re-render N detail fixtures from the mock site")
+    args = ap.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    if args.render_details:
+        render_details(args.render_details)
+
+    listings, details = load_corpus()
+    print(f"Corpus: {len(listings)} listing pages, {len(details)} detail pages")
+
+    if args.update_golden:
+        with make_scraper("html.parser") as scraper:
+            golden = outputs(scraper, listings, details)
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+            json.dump(golden, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"  wrote {GOLDEN_PATH}")
+        return
+
+    with open(GOLDEN_PATH, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+
+    mismatched, uncut, saved = check_cutoff(details, golden)
+    failed = bool(mismatched or uncut)
+    print(f"Detail cut-off: {saved:.0%} of bytes skipped, golden output: "
+          f"{'OK' if not mismatched else 'MISMATCH ' + ', '.join(mismatched)}"
+          + (f" | NOT TRUNCATED: {', '.join(uncut)}" if uncut else ""))
+
+    for backend in args.backends or available_backends():
+        with make_scraper(backend) as scraper:
+            actual = outputs(scraper, listings, details)
+        mismatched = sorted(name for name in golden if actual.get(name) != golden[name])
+        not_empty = check_negative(backend)
+        failed |= bool(mismatched or not_empty)
+        print(f"\n[{backend}] golden output: {'OK' if not mismatched else 'MISMATCH ' + ', '.join(mismatched)}"
+              f" | negative pages empty: {'OK' if not not_empty else 'FIELDS IN ' + ', '.join(not_empty)}")
+
+        print(f"  {'case':<30} {'us/page':>10} {'pages/s':>10} {'peak KiB/page':>14}")
+        for label, seconds, kib in bench_backend(backend, listings, details, args.repeat):
+            print(f"  {label:<30} {seconds * 1e6:>10.1f} {1 / seconds:>10,.0f} {kib:>14.1f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Benchmark: end-to-end crawl throughput against the local mock site
+
+    python -m benchmarks.bench_pipeline [--pages 20] [--cards 20] [--workers 8]
+        [--latency 0.05] [--error-rate 0.01] [--burst-every 200 --burst-length 5]
+        [--stages listings details pipeline] [--polite] [--verbose]
+        [--profile PREFIX] [--autotune --max-workers 32]
+        [--bandwidth 2000000] [--stream-cutoff]
+
+--autotune lets ConcurrencyTuner pick the worker count (starting from
+--workers, capped at --max-workers); the chosen values are reported.
+--stream-cutoff stops detail downloads once the parsed fields have arrived;
+compare bytes/page with and without it (--bandwidth makes the time visible).
+KiB/pg is decompressed body size, wire what was transferred (--no-gzip to
+compare).
+--profile writes PREFIX.<stage>.collapsed / .top.txt per stage; against the
+deterministic mock site these profiles are reproducible run to run
+
+Every stage runs in its own spawned process with a fresh scraper and a
+temporary output directory, and reports pages/s, p50/p99 fetch latency and
+that process's peak RSS
+"""
+
+import argparse
+import logging
+import multiprocessing
+import resource
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.profiling import PipelineProfiler
+from scraper.batdongsan.scraper import BatDongSanScraper
+
+from .mock_site import MockSiteConfig, MockSiteProcess
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, and the high-water mark of the whole
+    # process - hence one process per stage
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class TimedScraper(BatDongSanScraper):
+    """Scraper that records the latency and status of every fetch"""
+
+    def __init__(self, config: BatDongSanConfig):
+        super().__init__(config)
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.body_bytes = 0
+        self._timing_lock = threading.Lock()
+
+    def _fetch(self, url: str, *args, **kwargs):
+        start = time.perf_counter()
+        response = super()._fetch(url, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        with self._timing_lock:
+            self.latencies.append(elapsed)
+            self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+            self.body_bytes += len(response.content)
+        return response
+
+
+def make_config(base_url: str, output_dir: str, args: argparse.Namespace) -> BatDongSanConfig:
+    config = BatDongSanConfig(
+        base_url=f"{base_url}/ban-nha-dat",
+        output_dir=output_dir,
+        max_workers=args.workers,
+        autotune_concurrency=args.autotune,
+        autotune_max_workers=args.max_workers,
+        autotune_window_seconds=args.autotune_window,
+        detail_stream_cutoff=args.stream_cutoff,
+    )
+    if not args.polite:
+        config.page_delay = (0.0, 0.0)
+        config.detail_delay = (0.0, 0.0)
+        config.host_rate_limit = None
+    return config
+
+
+def run_stage(stage: str, base_url: str, args: argparse.Namespace) -> Dict:
+    """Run one stage in a fresh process, so its peak RSS is its own"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_run_stage, stage, base_url, args).result()
+
+
+def _run_stage(stage: str, base_url: str, args: argparse.Namespace) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as output_dir:
+        with TimedScraper(make_config(base_url, output_dir, args)) as scraper:
+            return _measure_stage(stage, scraper, args)
+
+
+def _measure_stage(stage: str, scraper: TimedScraper, args: argparse.Namespace) -> Dict:
+    if not args.verbose:
+        scraper.logger.setLevel(logging.ERROR)
+
+    if stage == "details":
+        # Seed the links file untimed so only detail fetches are measured
+        scraper.crawl_listings(start_page=1, end_page=args.pages)
+        scraper.latencies.clear()
+        scraper.statuses.clear()
+        scraper.body_bytes = 0
+        scraper.bandwidth.reset()
+
+    profiler = PipelineProfiler(f"{args.profile}.{stage}") if args.profile else None
+    if profiler:
+        profiler.start()
+
+    start = time.perf_counter()
+    if stage == "listings":
+        scraper.crawl_listings(start_page=1, end_page=args.pages)
+    elif stage == "details":
+        scraper.crawl_details()
+    else:
+        scraper.run_full_pipeline(start_page=1, end_page=args.pages)
+    elapsed = time.perf_counter() - start
+
+    if profiler:
+        profiler.stop()
+
+    fetched = len(scraper.latencies)
+    return {
+        "stage": stage,
+        "pages": fetched,
+        "seconds": elapsed,
+        "pages_per_s": fetched / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(scraper.latencies, 50) * 1000,
+        "p99_ms": percentile(scraper.latencies, 99) * 1000,
+        "kib_per_page": scraper.body_bytes / fetched / 1024 if fetched else 0.0,
+        "wire_kib_per_page": scraper.bandwidth.totals()["wire_bytes"] / fetched / 1024 if fetched else 0.0,
+        "statuses": dict(sorted(scraper.statuses.items())),
+        "peak_rss_mb": peak_rss_mb(),
+        "workers": {stage: tuner.limit for stage, tuner in scraper.concurrency.tuners.items()},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=20)
+    ap.add_argument("--cards", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--autotune", action="store_true", help="Auto-tune workers from pages/s")
+    ap.add_argument("--max-workers", type=int, default=32, help="Upper limit for --autotune")
+    ap.add_argument("--autotune-window", type=float, default=2.0, help="Seconds per tuning step")
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--jitter", type=float, default=0.01)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--not-found-rate", type=float, default=0.0)
+    ap.add_argument("--burst-every", type=int, default=0)
+    ap.add_argument("--burst-length", type=int, default=0)
+    ap.add_argument("--bandwidth", type=int, default=0, help="Mock site bytes/s per response")
+    ap.add_argument("--no-gzip", action="store_true", help="Mock site sends uncompressed responses")
+    ap.add_argument("--stream-cutoff", action="store_true", help="Enable detail_stream_cutoff")
+    ap.add_argument("--stages", nargs="+", default=["listings", "details", "pipeline"],
+                    choices=["listings", "details", "pipeline"])
+    ap.add_argument("--polite", action="store_true", help="Keep the configured delays and rate limit")
+    ap.add_argument("--verbose", action="store_true", help="Show the scraper's log")
+    ap.add_argument("--profile", default=None, metavar="PREFIX", help="Profile every stage")
+    args = ap.parse_args()
+
+    site_config = MockSiteConfig(
+        pages=args.pages,
+        cards_per_page=args.cards,
+        today_pages=args.pages,
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        not_found_rate=args.not_found_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        bandwidth=args.bandwidth,
+        gzip=not args.no_gzip,
+    )
+
+    with MockSiteProcess(site_config) as site:
+        print(f"Mock site {site.base_url}: {args.pages} pages x {args.cards} cards, "
+              f"latency {args.latency * 1000:.0f}ms, {args.workers} workers")
+        print(f"  {'stage':<10} {'pages':>7} {'seconds':>9} {'pages/s':>9} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'KiB/pg':>7} {'wire':>7} {'RSS MB':>8}  statuses / workers")
+        for stage in args.stages:
+            r = run_stage(stage, site.base_url, args)
+            print(f"  {r['stage']:<10} {r['pages']:>7} {r['seconds']:>9.2f} {r['pages_per_s']:>9.1f} "
+                  f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['kib_per_page']:>7.1f} {r['wire_kib_per_page']:>7.1f} {r['peak_rss_mb']:>8.1f}  {r['statuses']} {r['workers']}")
+
+
+if __name__ == "__main__":
+    main()
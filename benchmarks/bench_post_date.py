@@ -0,0 +1,61 @@
+"""
+Benchmark: PostDateParser on listing-card date strings
+
+    python -m benchmarks.bench_post_date [--pages 2000] [--cards 20]
+
+Compares the cached parser against the same grammar with the cache disabled
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+
+from scraper.batdongsan.dates import PostDateParser
+
+
+SAMPLES = (
+    [f"{h} giờ trước" for h in range(1, 24)]
+    + [f"{d} ngày trước" for d in range(1, 8)]
+    + ["Hôm nay", "Hôm qua", "2 tuần trước", "1 tháng trước", "31/12/2025", "01/01/2026"]
+)
+
+
+def make_pages(pages: int, cards: int, seed: int = 42):
+    """Synthetic pages - recent strings dominate, like the real sort order"""
+    rng = random.Random(seed)
+    weights = [1.0 / (i + 1) for i in range(len(SAMPLES))]
+    return [rng.choices(SAMPLES, weights=weights, k=cards) for _ in range(pages)]
+
+
+def run(parser: PostDateParser, pages, today: date) -> float:
+    start = time.perf_counter()
+    for page in pages:
+        parser.parse_many(page, today)
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=2000)
+    ap.add_argument("--cards", type=int, default=20)
+    args = ap.parse_args()
+
+    pages = make_pages(args.pages, args.cards)
+    total = args.pages * args.cards
+    today = date(2026, 1, 2)
+
+    print(f"{total} cards on {args.pages} pages")
+    for label, parser in (
+        ("uncached", PostDateParser(cache_size=0)),
+        ("cached", PostDateParser()),
+    ):
+        elapsed = run(parser, pages, today)
+        print(f"  {label:<10} {elapsed:8.3f}s  {total / elapsed:12,.0f} cards/s  "
+              f"{elapsed / total * 1e9:8.0f} ns/card")
+        if parser.cache_info().maxsize:
+            print(f"  {'':<10} {parser.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
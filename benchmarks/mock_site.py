@@ -0,0 +1,363 @@
+"""
+Local stand-in for batdongsan.vn
+
+    python -m benchmarks.mock_site [--port 8000] [--latency 0.05] [--error-rate 0.01]
+        [--bandwidth 500000]
+
+Serves synthetic listing pages (/<section>/p{n}?sortValue=1 with a.card-cm
+cards and div.time), detail pages (...-r<id>) carrying every selector
+_parse_detail_page reads followed by the related listings and scripts real
+pages carry, and images (/crop/<w>x<h>/posts/<id>_<n>.jpg). Latency,
+per-response bandwidth, 5xx/404 rates and 429 bursts are configurable;
+text responses are gzipped when accepted. /__stats returns request counts
+as JSON.
+"""
+
+import argparse
+import gzip
+import json
+import multiprocessing
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple, Union
+
+
+@dataclass
+class MockSiteConfig:
+    pages: int = 50
+    cards_per_page: int = 20
+    # Pages 1..today_pages show today's posts; later pages show older ones
+    today_pages: int = 40
+    latency: float = 0.0  # mean seconds per response
+    latency_jitter: float = 0.0  # standard deviation
+    error_rate: float = 0.0  # share of 500 responses
+    not_found_rate: float = 0.0  # share of detail pages that are gone (404)
+    burst_every: int = 0  # start a 429 burst every N requests (0 = never)
+    burst_length: int = 0  # requests per 429 burst
+    retry_after: int = 1
+    images_per_listing: int = 6
+    description_lines: int = 12
+    # Trailing sections after the fields the parser reads
+    related_listings: int = 12
+    script_bytes: int = 40_000
+    bandwidth: int = 0  # bytes per second per response (0 = unlimited)
+    gzip: bool = True  # compress responses for clients that accept gzip
+    # /crop/<w>x<h>/posts/<id>_<n>.jpg: listings id // image_reuse share
+    # their photos (reposts); size scales with the crop
+    image_reuse: int = 3
+    seed: int = 42
+
+
+_STREETS = ["Lê Lợi", "Nguyễn Trãi", "Trần Phú", "Vĩnh Cát", "Hai Bà Trưng", "Lạch Tray"]
+_DISTRICTS = [
+    ("Quận 12", "Hồ Chí Minh", "quan-12"),
+    ("Cầu Giấy", "Hà Nội", "cau-giay"),
+    ("Lê Chân", "Hải Phòng", "le-chan"),
+    ("Hải Châu", "Đà Nẵng", "hai-chau"),
+    ("Ninh Kiều", "Cần Thơ", "ninh-kieu"),
+]
+_KINDS = ["Bán Nhà", "Bán Đất", "Bán Căn hộ chung cư", "Bán Nhà mặt phố"]
+_LEGAL = ["Sổ đỏ/ Sổ hồng", "Hợp đồng mua bán", "Đang chờ sổ"]
+_DIRECTIONS = ["Đông", "Tây", "Nam", "Bắc", "Đông Nam", "Tây Bắc"]
+
+_DETAIL_RE = re.compile(r"-r(\d+)/?$")
+_PAGE_RE = re.compile(r"/p(\d+)/?$")
+_IMAGE_RE = re.compile(r"/crop/(\d+)x(\d+)/posts/(\d+)_(\d+)\.jpg$")
+
+
+def listing_ids(config: MockSiteConfig, page: int):
+    first = 200_000 + (page - 1) * config.cards_per_page
+    return range(first, first + config.cards_per_page)
+
+
+def render_listing_page(config: MockSiteConfig, base_url: str, section: str, page: int) -> str:
+    cards = []
+    for listing_id in listing_ids(config, page):
+        rng = random.Random(listing_id)
+        district, province, slug = rng.choice(_DISTRICTS)
+        posted = "Hôm nay" if page <= config.today_pages else f"{rng.randint(1, 6)} ngày trước"
+        cards.append(
+            f'<div class="card-container">'
+            f'<a class="card-cm" href="{base_url}/{section}-{slug}-r{listing_id}">'
+            f'<div class="image"><img src="/images/{listing_id}.jpg"></div>'
+            f'<div class="content"><h3 class="name">{rng.choice(_KINDS)} {rng.choice(_STREETS)}, {rng.randint(40, 300)}m</h3>'
+            f'<div class="price">{rng.randint(2, 30)} tỷ</div>'
+            f'<div class="acreage">{rng.randint(40, 300)} m²</div>'
+            f'<div class="address">{district}, {province}</div>'
+            f'<div class="time">{posted}</div></div></a></div>'
+        )
+    nav = "".join(f'<a href="/{section}/p{n}">{n}</a>' for n in range(1, min(config.pages, 10) + 1))
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Mua bán nhà đất - trang {page}</title></head>"
+        f"<body><div class=\"header\">batdongsan.vn</div><div class=\"list-card\">{''.join(cards)}</div>"
+        f"<div class=\"pagination\">{nav}</div></body></html>"
+    )
+
+
+def render_detail_page(config: MockSiteConfig, listing_id: int) -> str:
+    rng = random.Random(listing_id)
+    district, province, _ = rng.choice(_DISTRICTS)
+    kind = rng.choice(_KINDS)
+    street = rng.choice(_STREETS)
+    area = rng.randint(40, 300)
+    price = rng.randint(2, 30)
+
+    description = "<br>".join(
+        f"• {kind} {street} dòng {i}: diện tích {area}m², giá {price} tỷ, liên hệ 09{rng.randint(10**7, 10**8 - 1)}"
+        for i in range(config.description_lines)
+    )
+    images = "".join(
+        f'<div class="swiper-slide"><img lazy-src="https://media.batdongsan.vn/crop/1275x717/posts/'
+        f'{listing_id}_{i:02d}.jpg" src="data:image/gif;base64,R0lGOD"></div>'
+        for i in range(config.images_per_listing)
+    )
+    lines = {
+        "Diện tích": f"{area} m²",
+        "Mức giá": f"{price} tỷ",
+        "Pháp lý": rng.choice(_LEGAL),
+        "Số phòng ngủ": str(rng.randint(1, 6)),
+        "Số toilet": str(rng.randint(1, 5)),
+        "Hướng nhà": rng.choice(_DIRECTIONS),
+    }
+    info = "".join(
+        f'<div class="line"><div class="line-label">{label}</div><div class="line-text">{value}</div></div>'
+        for label, value in lines.items()
+    )
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{kind} {street}</title></head><body>"
+        f'<div class="title mb-3 re__breadcrumb"><a href="/">Trang chủ</a><a href="/ban">{kind}</a>'
+        f'<a href="/q">{district}</a><a href="/t">{province}</a></div>'
+        f'<div class="swiper-wrapper">{images}</div>'
+        f'<div class="content"><h1>{kind} {street}, {area}m, giá {price} tỷ</h1></div>'
+        f'<div class="footer">Đường {street}, {district}'
+        f'<div class="box-text"><div class="label">Giá</div><div class="value">{price} tỷ</div></div>'
+        f'<div class="box-text"><div class="label">Diện tích</div><div class="value">{area} m²</div></div></div>'
+        f'<div id="more1">{description}</div>'
+        f'<div class="detail-info">{info}</div>'
+        f'<div class="date"><div class="label">Ngày đăng</div><div class="value">01/01/2026</div></div>'
+        f"{_render_trailer(config, listing_id)}</body></html>"
+    )
+
+
+def _render_trailer(config: MockSiteConfig, listing_id: int) -> str:
+    """Related listings, footer and scripts - nothing _parse_detail_page reads"""
+    rng = random.Random(-listing_id)
+    related = "".join(
+        f'<div class="related-card"><a href="/ban-nha-dat-r{other}"><h3>{rng.choice(_KINDS)} '
+        f'{rng.choice(_STREETS)}</h3><span class="price">{rng.randint(2, 30)} tỷ</span></a></div>'
+        for other in rng.sample(range(100_000, 300_000), config.related_listings)
+    )
+    script = json.dumps({"listing": listing_id, "tracking": rng.randbytes(max(0, config.script_bytes - 40) // 2).hex()})
+    return (
+        f'<div class="related-listings"><h2>Tin đăng tương tự</h2>{related}</div>'
+        f'<div class="site-footer">batdongsan.vn</div><script>window.__DATA__ = {script};</script>'
+    )
+
+
+def image_urls(config: MockSiteConfig, base_url: str, listing_id: int):
+    """What _parse_images collects for listing_id, pointed at base_url"""
+    return [
+        f"{base_url}/crop/1275x717/posts/{listing_id}_{i:02d}.jpg" for i in range(config.images_per_listing)
+    ]
+
+
+def render_image(config: MockSiteConfig, width: int, height: int, listing_id: int, index: int) -> bytes:
+    rng = random.Random(f"{listing_id // max(1, config.image_reuse)}_{index}_{width}x{height}")
+    return b"\xff\xd8\xff\xe0" + rng.randbytes(max(64, width * height // 20))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections (or cutting a body short)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockSite:
+    """Threaded HTTP server serving the synthetic site"""
+
+    def __init__(self, config: Optional[MockSiteConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockSiteConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self.stats: Dict[str, int] = {}
+        self.server = _Server((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockSite":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "MockSite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def respond(self, path: str) -> Tuple[int, Dict[str, str], Union[str, bytes]]:
+        """Status, headers and body for a request path"""
+        config = self.config
+        with self._lock:
+            self._requests += 1
+            n = self._requests
+            delay = max(0.0, self._rng.gauss(config.latency, config.latency_jitter)) if config.latency else 0.0
+            fail = self._rng.random() < config.error_rate
+            gone = self._rng.random() < config.not_found_rate
+
+        if delay:
+            time.sleep(delay)
+
+        if path.startswith("/__stats"):
+            return 200, {"Content-Type": "application/json"}, json.dumps(self.stats)
+
+        if config.burst_every and (n - 1) % config.burst_every < config.burst_length:
+            return 429, {"Retry-After": str(config.retry_after)}, "Too Many Requests"
+        if fail:
+            return 500, {}, "Internal Server Error"
+
+        route = path.split("?", 1)[0]
+        image = _IMAGE_RE.search(route)
+        if image:
+            width, height, listing_id, index = map(int, image.groups())
+            return 200, {"Content-Type": "image/jpeg"}, render_image(config, width, height, listing_id, index)
+
+        detail = _DETAIL_RE.search(route)
+        if detail:
+            if gone:
+                return 404, {}, "Tin đăng không tồn tại"
+            return 200, {}, render_detail_page(config, int(detail.group(1)))
+
+        page_match = _PAGE_RE.search(route)
+        page = int(page_match.group(1)) if page_match else 1
+        section = (route[:page_match.start()] if page_match else route).strip("/") or "ban-nha-dat"
+        if page > config.pages:
+            return 404, {}, "Not Found"
+        return 200, {}, render_listing_page(config, self.base_url, section, page)
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, headers, body = site.respond(self.path)
+                payload = body.encode("utf-8") if isinstance(body, str) else body
+                compressible = headers.get("Content-Type", "text/html").startswith(("text/", "application/json"))
+                if site.config.gzip and compressible and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    payload = gzip.compress(payload, compresslevel=6)
+                    headers["Content-Encoding"] = "gzip"
+                with site._lock:
+                    site.stats[str(status)] = site.stats.get(str(status), 0) + 1
+                    site.stats["bytes"] = site.stats.get("bytes", 0) + len(payload)
+
+                self.send_response(status)
+                self.send_header("Content-Type", headers.pop("Content-Type", "text/html; charset=utf-8"))
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if not site.config.bandwidth:
+                    self.wfile.write(payload)
+                    return
+                step = max(1024, site.config.bandwidth // 20)
+                try:
+                    for start in range(0, len(payload), step):
+                        self.wfile.write(payload[start:start + step])
+                        self.wfile.flush()
+                        time.sleep(step / site.config.bandwidth)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client stopped reading (early cut-off)
+
+        return Handler
+
+
+def _serve(config_dict: Dict, ready, stop) -> None:
+    site = MockSite(MockSiteConfig(**config_dict)).start()
+    ready.put(site.base_url)
+    stop.wait()
+    site.stop()
+
+
+class MockSiteProcess:
+    """MockSite in a child process, so it does not share the GIL or RSS with the client"""
+
+    def __init__(self, config: Optional[MockSiteConfig] = None):
+        self.config = config or MockSiteConfig()
+        self.base_url = ""
+        self._stop = multiprocessing.Event()
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "MockSiteProcess":
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(asdict(self.config), ready, self._stop), daemon=True
+        )
+        self._process.start()
+        self.base_url = ready.get(timeout=30)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._process.join(timeout=10)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--pages", type=int, default=50)
+    ap.add_argument("--cards", type=int, default=20)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--not-found-rate", type=float, default=0.0)
+    ap.add_argument("--burst-every", type=int, default=0)
+    ap.add_argument("--burst-length", type=int, default=0)
+    ap.add_argument("--bandwidth", type=int, default=0, help="Bytes/s per response (0 = unlimited)")
+    ap.add_argument("--no-gzip", action="store_true")
+    args = ap.parse_args()
+
+    config = MockSiteConfig(
+        pages=args.pages,
+        cards_per_page=args.cards,
+        today_pages=args.pages,
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        not_found_rate=args.not_found_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        bandwidth=args.bandwidth,
+        gzip=not args.no_gzip,
+    )
+    site = MockSite(config, port=args.port)
+    print(f"Serving {config.pages} listing pages on {site.base_url}/ban-nha-dat")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        site.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
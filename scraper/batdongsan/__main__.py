@@ -0,0 +1,285 @@
+"""
+Command line entry point
+
+    python -m scraper.batdongsan run --start-page 1 --end-page 5
+    python -m scraper.batdongsan daemon --interval-minutes 15
+    python -m scraper.batdongsan discover
+    python -m scraper.batdongsan recrawl --max-requests 500
+    python -m scraper.batdongsan retry-failures --stage detail
+    python -m scraper.batdongsan queue-fill --db queue.sqlite
+    python -m scraper.batdongsan queue-work --db queue.sqlite
+    python -m scraper.batdongsan export --out data/batdongsan/parquet
+    python -m scraper.batdongsan normalize details.json --out details.parquet
+    python -m scraper.batdongsan images --variant 600x338
+    python -m scraper.batdongsan reposts --processes 4
+    python -m scraper.batdongsan --autotune --max-workers 16 run --end-page 20
+    python -m scraper.batdongsan --profile prof/run run --end-page 5
+    python -m scraper.batdongsan profile-merge --out prof/all prof/worker-1 prof/worker-2
+"""
+
+import argparse
+import json
+
+from .config import BatDongSanConfig
+
+
+def _cmd_run(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .scraper import BatDongSanScraper
+
+    with BatDongSanScraper(config) as scraper:
+        return scraper.run_full_pipeline(
+            start_page=args.start_page,
+            end_page=args.end_page,
+            only_today=not args.all_dates,
+        )
+
+
+def _cmd_daemon(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .daemon import PipelineDaemon
+    from .scraper import BatDongSanScraper
+
+    with BatDongSanScraper(config) as scraper:
+        daemon = PipelineDaemon(
+            scraper,
+            interval_minutes=args.interval_minutes,
+            start_page=args.start_page,
+            end_page=args.end_page,
+            detail_budget=args.max_details,
+            recrawl_budget=args.recrawl_budget,
+        )
+        cycles = daemon.run(max_cycles=args.max_cycles)
+    return {"cycles": len(cycles), "last_cycle": cycles[-1] if cycles else None}
+
+
+def _cmd_discover(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .scraper import BatDongSanScraper
+    from .sitemap import parse_lastmod
+
+    with BatDongSanScraper(config) as scraper:
+        new_items = scraper.discover_from_sitemaps(
+            sitemap_url=args.sitemap_url,
+            since=parse_lastmod(args.since),
+        )
+    return {"new_listings": len(new_items)}
+
+
+def _cmd_recrawl(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .scraper import BatDongSanScraper
+
+    with BatDongSanScraper(config) as scraper:
+        changed = scraper.recrawl(max_requests=args.max_requests)
+    return {"changed": len(changed)}
+
+
+def _cmd_retry_failures(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .scraper import BatDongSanScraper
+
+    with BatDongSanScraper(config) as scraper:
+        return scraper.retry_failures(stage=args.stage)
+
+
+def _cmd_queue_fill(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .jsonfiles import iter_json_array
+    from .workqueue import SQLiteWorkQueue
+
+    links = iter_json_array(config.get_links_path())
+    queue = SQLiteWorkQueue(args.db, max_attempts=args.max_attempts)
+    added = queue.put(item["url"] for item in links if "url" in item and item.get("needs_detail", True))
+    return {"added": added, "queue": queue.stats()}
+
+
+def _cmd_queue_work(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .scraper import BatDongSanScraper
+    from .workqueue import QueueWorker, SQLiteWorkQueue
+
+    queue = SQLiteWorkQueue(args.db, max_attempts=args.max_attempts)
+    with BatDongSanScraper(config) as scraper:
+        worker = QueueWorker(
+            scraper,
+            queue,
+            worker_id=args.worker_id,
+            batch_size=args.batch_size,
+            lease_seconds=args.lease_seconds,
+        )
+        result = worker.run(stop_when_empty=not args.follow)
+    result["queue"] = queue.stats()
+    return result
+
+
+def _cmd_export(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .export import DetailsParquetExporter
+
+    exporter = DetailsParquetExporter(
+        config,
+        row_group_size=args.row_group_size,
+        max_buffered_rows=args.max_buffered_rows,
+    )
+    return exporter.export(args.out, sources=args.sources or None, overwrite=args.overwrite)
+
+
+def _cmd_normalize(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    import pandas as pd
+
+    from .jsonfiles import iter_json_array
+    from .normalize import PriceAreaNormalizer
+
+    records = [record for source in args.sources for record in iter_json_array(source)]
+    normalizer = PriceAreaNormalizer()
+    df = normalizer.normalize(pd.DataFrame.from_records(records))
+
+    if args.out.endswith(".json"):
+        df.to_json(args.out, orient="records", force_ascii=False, indent=2)
+    else:
+        df.to_parquet(args.out, index=False)
+
+    return normalizer.last_report.to_dict()
+
+
+def _cmd_images(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .images import ImageDownloader, iter_image_urls
+
+    downloader = ImageDownloader(
+        config,
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        variant=args.variant,
+    )
+    urls = iter_image_urls(args.sources) if args.sources else None
+    return downloader.download(urls, limit=args.limit)
+
+
+def _cmd_reposts(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .reposts import RepostDetector
+
+    if args.radius is not None:
+        config.repost_hamming_radius = args.radius
+    if args.min_matches is not None:
+        config.repost_min_matches = args.min_matches
+    detector = RepostDetector(config, processes=args.processes)
+    return detector.update(args.sources or None)
+
+
+def _cmd_profile_merge(args: argparse.Namespace, config: BatDongSanConfig) -> dict:
+    from .profiling import merge_profiles
+
+    return {"written": list(merge_profiles(args.prefixes, args.out))}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m scraper.batdongsan")
+    parser.add_argument("--output-dir", default=None, help="Override config.output_dir")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Auto-tune listing/detail workers from measured pages/s")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Override config.max_workers (with --autotune: the upper limit)")
+    parser.add_argument("--bandwidth-budget-mb", type=float, default=None,
+                        help="Per-run budget of bytes transferred (see config.bandwidth_budget_action)")
+    parser.add_argument("--profile", default=None, metavar="PREFIX",
+                        help="Profile the command: PREFIX.collapsed (flamegraph) and PREFIX.top.txt")
+    parser.add_argument("--profile-cprofile", action="store_true", help="Also write a merged cProfile PREFIX.prof")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the full listings + details pipeline")
+    run.add_argument("--start-page", type=int, default=1)
+    run.add_argument("--end-page", type=int, default=50)
+    run.add_argument("--all-dates", action="store_true", help="Do not stop at yesterday's posts")
+    run.set_defaults(func=_cmd_run)
+
+    daemon = sub.add_parser("daemon", help="Run the pipeline every N minutes until SIGTERM")
+    daemon.add_argument("--interval-minutes", type=float, default=15)
+    daemon.add_argument("--start-page", type=int, default=1)
+    daemon.add_argument("--end-page", type=int, default=10)
+    daemon.add_argument("--max-details", type=int, default=None, help="Detail request budget per cycle")
+    daemon.add_argument("--recrawl-budget", type=int, default=0, help="Recrawl request budget per cycle (0 = off)")
+    daemon.add_argument("--max-cycles", type=int, default=None)
+    daemon.set_defaults(func=_cmd_daemon)
+
+    discover = sub.add_parser("discover", help="Collect listing URLs from the XML sitemaps")
+    discover.add_argument("--sitemap-url", default=None, help="Override config.sitemap_url")
+    discover.add_argument("--since", default=None, help="Override the lastmod high-water mark")
+    discover.set_defaults(func=_cmd_discover)
+
+    recrawl = sub.add_parser("recrawl", help="Revisit listings that are due by their change rate")
+    recrawl.add_argument("--max-requests", type=int, default=None)
+    recrawl.set_defaults(func=_cmd_recrawl)
+
+    retry = sub.add_parser("retry-failures", help="Retry only the fetches in the failure ledger")
+    retry.add_argument("--stage", choices=("listing", "detail"), default=None)
+    retry.set_defaults(func=_cmd_retry_failures)
+
+    queue_fill = sub.add_parser("queue-fill", help="Enqueue today's links into the shared work queue")
+    queue_fill.add_argument("--db", required=True, help="SQLite queue file on local disk (single host)")
+    queue_fill.add_argument("--max-attempts", type=int, default=3)
+    queue_fill.set_defaults(func=_cmd_queue_fill)
+
+    queue_work = sub.add_parser("queue-work", help="Crawl details leased from the shared work queue")
+    queue_work.add_argument("--db", required=True, help="SQLite queue file on local disk (single host)")
+    queue_work.add_argument("--worker-id", default=None)
+    queue_work.add_argument("--batch-size", type=int, default=20)
+    queue_work.add_argument("--lease-seconds", type=float, default=600)
+    queue_work.add_argument("--max-attempts", type=int, default=3)
+    queue_work.add_argument("--follow", action="store_true", help="Keep polling when the queue is empty")
+    queue_work.set_defaults(func=_cmd_queue_work)
+
+    export = sub.add_parser("export", help="Export detail JSON files to partitioned Parquet")
+    export.add_argument("--out", required=True, help="Parquet dataset root")
+    export.add_argument("sources", nargs="*", help="Detail JSON files (default: all in output dir)")
+    export.add_argument("--row-group-size", type=int, default=50_000)
+    export.add_argument("--max-buffered-rows", type=int, default=200_000)
+    export.add_argument("--overwrite", action="store_true", help="Replace an existing dataset in --out")
+    export.set_defaults(func=_cmd_export)
+
+    normalize = sub.add_parser("normalize", help="Add price_vnd / area_m2 / price_per_m2 columns")
+    normalize.add_argument("sources", nargs="+", help="Detail JSON files")
+    normalize.add_argument("--out", required=True, help="Output .parquet or .json file")
+    normalize.set_defaults(func=_cmd_normalize)
+
+    images = sub.add_parser("images", help="Download listing images into the content-addressed store")
+    images.add_argument("sources", nargs="*", help="Detail JSON files (default: all in output dir)")
+    images.add_argument("--limit", type=int, default=None)
+    images.add_argument("--concurrency", type=int, default=None, help="Override config.image_concurrency")
+    images.add_argument("--per-host", type=int, default=None, help="Override config.image_per_host_concurrency")
+    images.add_argument("--variant", default=None, help='Crop size replacing 1275x717, e.g. "600x338"')
+    images.set_defaults(func=_cmd_images)
+
+    reposts = sub.add_parser("reposts", help="Hash downloaded images and flag listings that repost earlier ones")
+    reposts.add_argument("sources", nargs="*", help="Detail JSON files (default: all in output dir)")
+    reposts.add_argument("--processes", type=int, default=None, help="Override config.repost_processes")
+    reposts.add_argument("--radius", type=int, default=None, help="Override config.repost_hamming_radius")
+    reposts.add_argument("--min-matches", type=int, default=None, help="Override config.repost_min_matches")
+    reposts.set_defaults(func=_cmd_reposts)
+
+    profile_merge = sub.add_parser("profile-merge", help="Merge --profile outputs of several processes")
+    profile_merge.add_argument("prefixes", nargs="+", help="--profile prefixes to merge")
+    profile_merge.add_argument("--out", required=True, help="Output prefix")
+    profile_merge.set_defaults(func=_cmd_profile_merge)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+
+    config = BatDongSanConfig(output_dir=args.output_dir) if args.output_dir else BatDongSanConfig()
+    config.metrics_port = args.metrics_port
+    config.autotune_concurrency = args.autotune
+    if args.bandwidth_budget_mb:
+        config.bandwidth_budget_bytes = int(args.bandwidth_budget_mb * 1_000_000)
+    if args.max_workers and args.autotune:
+        config.autotune_max_workers = args.max_workers
+    elif args.max_workers:
+        config.max_workers = args.max_workers
+    if args.profile:
+        from .profiling import PipelineProfiler
+
+        with PipelineProfiler(args.profile, cprofile=args.profile_cprofile) as profiler:
+            result = args.func(args, config)
+        result["profile"] = profiler.outputs
+    else:
+        result = args.func(args, config)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Bandwidth accounting
+Bytes moved per stage and host (as transferred and decompressed) and an
+optional per-run budget that stops or pauses the crawl
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+
+from .logger import setup_logger
+
+
+def accept_encoding() -> str:
+    """
+    Encodings this process can decode: gzip and deflate always, br when
+    brotli/brotlicffi is installed, zstd when zstandard is (urllib3 decides)
+    """
+    return ACCEPT_ENCODING.replace(",", ", ")
+
+
+def wire_bytes(response: requests.Response) -> int:
+    """Status line, headers and body bytes as transferred (compressed)"""
+    headers = sum(len(key) + len(value) + 4 for key, value in response.headers.items())
+    status_line = len(response.reason or "") + 15
+    try:
+        body = response.raw.tell()
+    except (AttributeError, OSError):
+        body = len(response.content)
+    return status_line + headers + 2 + body
+
+
+class FetchStopped(requests.exceptions.RequestException):
+    """The run was stopped before the request was sent"""
+
+
+class BandwidthMeter:
+    """
+    (stage, host) -> {"requests", "wire_bytes", "decoded_bytes"}
+
+    wire_bytes counts response headers plus bodies as transferred, what a
+    proxy bills; decoded_bytes the decompressed bodies the parser sees.
+
+    Budget actions once budget_bytes have moved in the run:
+        "stop"   exhausted turns True; the crawl skips its queued fetches
+        "pause"  wait() blocks fetches until the next window_seconds window
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, action: str = "stop", window_seconds: float = 3600.0):
+        if action not in ("stop", "pause"):
+            raise ValueError(f"Unknown bandwidth budget action: {action}")
+        self.budget_bytes = budget_bytes
+        self.action = action
+        self.window_seconds = window_seconds
+        self.logger = setup_logger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new run: zero the totals and the budget"""
+        with self._lock:
+            self._by_key: Dict[tuple, Dict[str, int]] = {}
+            self._total = 0
+            self._window_start = time.monotonic()
+            self._window_used = 0
+            self._paused_window = None
+            self.exhausted = False
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def record(self, stage: str, url: str, wire: int, decoded: int) -> None:
+        host = urlsplit(url).netloc
+        with self._lock:
+            entry = self._by_key.get((stage, host))
+            if entry is None:
+                entry = self._by_key[(stage, host)] = {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0}
+            entry["requests"] += 1
+            entry["wire_bytes"] += wire
+            entry["decoded_bytes"] += decoded
+            self._total += wire
+            self._window_used += wire
+
+            spent = self.budget_bytes and self._total >= self.budget_bytes
+            if self.action == "stop" and spent and not self.exhausted:
+                self.exhausted = True
+                self.logger.warning(
+                    f"Bandwidth budget spent ({self._total:,} >= {self.budget_bytes:,} bytes) - stopping the run"
+                )
+
+    def wait(self, stop_event: threading.Event) -> float:
+        """
+        "pause" budget: block until the current window has budget left
+
+        Returns early, with no budget, once stop_event is set; callers must
+        check it before fetching.
+
+        Returns:
+            Seconds waited
+        """
+        if self.action != "pause" or not self.budget_bytes:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now - self._window_start >= self.window_seconds:
+                    self._window_start = now
+                    self._window_used = 0
+                if self._window_used < self.budget_bytes:
+                    return waited
+                remaining = self.window_seconds - (now - self._window_start)
+                announce = self._paused_window != self._window_start
+                self._paused_window = self._window_start
+            if announce:
+                self.logger.warning(f"Bandwidth budget spent for this window - pausing {remaining:.0f}s")
+            started = time.monotonic()
+            stopped = stop_event.wait(remaining)
+            waited += time.monotonic() - started
+            if stopped:
+                return waited
+
+    def totals(self) -> Dict:
+        """Run totals overall, per stage and per host"""
+        with self._lock:
+            items = [(key, dict(entry)) for key, entry in self._by_key.items()]
+
+        def add(target: Dict, entry: Dict) -> None:
+            for name, value in entry.items():
+                target[name] = target.get(name, 0) + value
+
+        overall: Dict[str, int] = {}
+        by_stage: Dict[str, Dict] = {}
+        by_host: Dict[str, Dict] = {}
+        for (stage, host), entry in sorted(items):
+            add(overall, entry)
+            add(by_stage.setdefault(stage, {}), entry)
+            add(by_host.setdefault(host, {}), entry)
+
+        wire = overall.get("wire_bytes", 0)
+        return {
+            "requests": overall.get("requests", 0),
+            "wire_bytes": wire,
+            "decoded_bytes": overall.get("decoded_bytes", 0),
+            "compression_ratio": round(overall.get("decoded_bytes", 0) / wire, 2) if wire else None,
+            "budget_bytes": self.budget_bytes,
+            "budget_exhausted": self.exhausted,
+            "by_stage": by_stage,
+            "by_host": by_host,
+        }
@@ -0,0 +1,92 @@
+"""
+Canonical listing identity
+Maps every spelling of a listing URL (http/https, www, trailing slash,
+tracking parameters, edited slug) to one stable integer key
+"""
+
+import re
+from typing import Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Listing keys are (site << SITE_SHIFT) | listing id, so batdongsan.vn keys
+# are the bare r<id> and ids from other sites never collide with them
+SITE_SHIFT = 40
+SITE_BATDONGSAN = 0
+SITE_ALONHADAT = 1
+
+# batdongsan.vn: .../ban-nha-rieng-quan-12-r197474
+_BATDONGSAN_ID_RE = re.compile(r"-r(\d+)$")
+# alonhadat.com.vn: .../ban-nha-quan-12-15234567.html
+_ALONHADAT_ID_RE = re.compile(r"-(\d+)\.html?$")
+
+# Host -> (site, listing id pattern); subdomains count as their site
+_SITES = {
+    "batdongsan.vn": (SITE_BATDONGSAN, _BATDONGSAN_ID_RE),
+    "alonhadat.com.vn": (SITE_ALONHADAT, _ALONHADAT_ID_RE),
+}
+
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "zarsrc", "ref", "source", "utm_id"})
+
+
+def _split(url: str):
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return parts, host
+
+
+def _site(host: str):
+    for domain, site in _SITES.items():
+        if host == domain or host.endswith("." + domain):
+            return site
+    return None
+
+
+def listing_key(url: str) -> Optional[int]:
+    """
+    Stable integer key of a listing URL
+
+        "https://batdongsan.vn/ban-nha-quan-12-r197474/?utm_source=x" -> 197474
+        "http://www.batdongsan.vn/slug-sua-lai-r197474"               -> 197474
+        "https://alonhadat.com.vn/ban-nha-15234567.html" -> (1 << 40) | 15234567
+
+    Returns:
+        None for URLs that are not listing detail pages or are on hosts
+        without a site id
+    """
+    parts, host = _split(url)
+    site = _site(host)
+    if site is None:
+        return None
+
+    match = site[1].search(parts.path.rstrip("/"))
+    if not match:
+        return None
+    return (site[0] << SITE_SHIFT) | int(match.group(1))
+
+
+def canonical_url(url: str) -> str:
+    """https, lowercase host without www, no trailing slash/fragment/tracking params"""
+    parts, host = _split(url)
+    if parts.port:
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def url_key(url: str) -> Union[int, str]:
+    """Dedupe key: the listing key, or the canonical URL for non-listing pages"""
+    key = listing_key(url)
+    return key if key is not None else canonical_url(url)
+
+
+def key_str(url: str) -> str:
+    """url_key as a string, for JSON object keys"""
+    return str(url_key(url))
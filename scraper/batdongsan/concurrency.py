@@ -0,0 +1,245 @@
+"""
+Concurrency auto-tuning
+Per-stage worker limits that follow measured successful pages/s: hill
+climbing while the error rate is low, halving when it rises
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .config import BatDongSanConfig
+from .jsonfiles import update_json_file
+from .logger import setup_logger
+
+
+class ConcurrencyTuner:
+    """
+    Adjustable worker gate for one stage
+
+    Executors are sized to `maximum`; every task holds a slot() while it
+    runs, so only `limit` of them fetch at once. Outcomes reported through
+    record() are evaluated once per window:
+
+        error rate > error_threshold      limit // 2 (multiplicative decrease)
+        pages/s up by more than tolerance keep stepping in the same direction
+        pages/s down by more than tolerance reverse direction
+        pages/s flat                      step down (same throughput, fewer workers)
+
+    The first window probes one step up. Limits stay in [minimum, maximum].
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 8,
+        window_seconds: float = 15.0,
+        min_samples: int = 5,
+        error_threshold: float = 0.1,
+        tolerance: float = 0.05,
+        enabled: bool = True,
+    ):
+        self.stage = stage
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.error_threshold = error_threshold
+        self.tolerance = tolerance
+        self.enabled = enabled
+        self.logger = setup_logger(self.__class__.__name__)
+
+        self._cond = threading.Condition()
+        self._limit = min(self.maximum, max(self.minimum, initial))
+        self._active = 0
+
+        self._direction = 1
+        self._last_rate: Optional[float] = None
+        self._window_start = time.monotonic()
+        self._successes = 0
+        self._errors = 0
+        self.best_rate = 0.0
+        self.history: List[Dict] = []
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    @contextmanager
+    def slot(self) -> Iterator[Callable[[], None]]:
+        """
+        Hold one of `limit` worker slots; yields a release function that
+        frees the slot early (e.g. for a hung worker) - idempotent
+        """
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+        released = []
+
+        def release() -> None:
+            with self._cond:
+                if released:
+                    return
+                released.append(True)
+                self._active -= 1
+                self._cond.notify()
+
+        try:
+            yield release
+        finally:
+            release()
+
+    def record(self, success: bool) -> None:
+        """Report one fetch: a page (True) or a retryable error (False)"""
+        if not self.enabled:
+            return
+        with self._cond:
+            if success:
+                self._successes += 1
+            else:
+                self._errors += 1
+
+            elapsed = time.monotonic() - self._window_start
+            if elapsed >= self.window_seconds and self._successes + self._errors >= self.min_samples:
+                self._adjust(elapsed)
+
+    def state(self) -> Dict:
+        with self._cond:
+            return {"workers": self._limit, "best_pages_per_second": round(self.best_rate, 3)}
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    def _adjust(self, elapsed: float) -> None:
+        # Called with self._cond held
+        rate = self._successes / elapsed
+        error_rate = self._errors / (self._successes + self._errors)
+        previous = self._limit
+
+        if error_rate > self.error_threshold:
+            new_limit = previous // 2
+            self._direction = 1
+            self._last_rate = None
+            reason = f"error rate {error_rate:.0%}"
+        else:
+            if self._last_rate is None or rate > self._last_rate * (1 + self.tolerance):
+                reason = "pages/s up" if self._last_rate is not None else "probe"
+            elif rate < self._last_rate * (1 - self.tolerance):
+                self._direction = -self._direction
+                reason = "pages/s down"
+            else:
+                self._direction = -1
+                reason = "pages/s flat"
+            new_limit = previous + self._direction
+            self._last_rate = rate
+            self.best_rate = max(self.best_rate, rate)
+
+        new_limit = min(self.maximum, max(self.minimum, new_limit))
+        if new_limit == self.maximum:
+            self._direction = -1
+        elif new_limit == self.minimum:
+            self._direction = 1
+
+        self.history.append({
+            "at": datetime.now().isoformat(),
+            "workers": previous,
+            "pages_per_second": round(rate, 3),
+            "error_rate": round(error_rate, 3),
+            "next_workers": new_limit,
+        })
+        if new_limit != previous:
+            self.logger.info(
+                f"[{self.stage}] workers {previous} -> {new_limit} "
+                f"({reason}: {rate:.2f} pages/s, {error_rate:.0%} errors)"
+            )
+            self._limit = new_limit
+            self._cond.notify_all()
+
+        self._window_start = time.monotonic()
+        self._successes = 0
+        self._errors = 0
+
+
+class ConcurrencyController:
+    """
+    Tuners for the listing and detail stages plus the state file the chosen
+    limits are saved to, so the next run starts where this one ended
+    """
+
+    STAGES = ("listing", "detail")
+
+    def __init__(self, config: BatDongSanConfig):
+        self.config = config
+        self.path = os.path.join(config.output_dir, config.autotune_state_file)
+        self.logger = setup_logger(self.__class__.__name__)
+
+        saved = self._load() if config.autotune_concurrency else {}
+        self.tuners: Dict[str, ConcurrencyTuner] = {}
+        for stage in self.STAGES:
+            if config.autotune_concurrency:
+                initial = saved.get(stage, {}).get("workers", config.max_workers)
+                tuner = ConcurrencyTuner(
+                    stage,
+                    initial,
+                    minimum=config.autotune_min_workers,
+                    maximum=config.autotune_max_workers,
+                    window_seconds=config.autotune_window_seconds,
+                    error_threshold=config.autotune_error_threshold,
+                )
+            else:
+                tuner = ConcurrencyTuner(
+                    stage, config.max_workers, config.max_workers, config.max_workers, enabled=False
+                )
+            self.tuners[stage] = tuner
+
+        if config.autotune_concurrency:
+            self.logger.info(
+                "Auto-tuning concurrency from "
+                + ", ".join(f"{stage}={tuner.limit}" for stage, tuner in self.tuners.items())
+                + f" (range {config.autotune_min_workers}-{config.autotune_max_workers})"
+            )
+
+    def __getitem__(self, stage: str) -> Optional[ConcurrencyTuner]:
+        return self.tuners.get(stage)
+
+    def pool_size(self, *stages: str) -> int:
+        """
+        Executor size able to run every stage at its largest limit, plus
+        spare threads that take over from workers the watchdog gave up on
+        """
+        spare = self.config.watchdog_spare_workers if self.config.watchdog_stuck_seconds else 0
+        return max(self.tuners[stage].maximum for stage in stages) + spare
+
+    def save(self) -> None:
+        """Persist the limits of stages that completed a tuning window"""
+        if not self.config.autotune_concurrency:
+            return
+
+        # Under the file lock: other processes' stages are kept
+        def merge(stored: Optional[Dict]) -> Dict[str, Dict]:
+            data = stored or {}
+            for stage, tuner in self.tuners.items():
+                if tuner.history:
+                    data[stage] = dict(tuner.state(), updated_at=datetime.now().isoformat())
+            return data
+
+        update_json_file(self.path, merge, indent=2)
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
@@ -1,10 +1,19 @@
 
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
 
+# CSS selectors (comma separated alternatives) for fields on a listing card
+DEFAULT_CARD_SELECTORS: Dict[str, str] = {
+    "title": "h3, .name, .title",
+    "price": ".price, .card-price",
+    "area": ".area, .acreage, .card-area",
+    "location": ".address, .location, .card-location",
+}
+
+
 @dataclass
 class BatDongSanConfig:
     """Configuration for BatDongSan.vn scraper"""
@@ -12,31 +21,179 @@ class BatDongSanConfig:
     # URLs
     base_url: str = "https://batdongsan.vn/ban-nha-dat"
     
+    # Listing sections / filtered listings crawled together, e.g.
+    # ["https://batdongsan.vn/ban-nha-dat", "https://batdongsan.vn/cho-thue-nha-dat",
+    #  "https://batdongsan.vn/ban-nha-dat-ha-noi"]. Defaults to [base_url]
+    listing_roots: List[str] = field(default_factory=list)
+    
+    # Sitemap discovery (alternative to paginated listing crawls)
+    sitemap_url: str = "https://batdongsan.vn/sitemap.xml"
+    sitemap_listing_pattern: str = r"-r\d+/?$"
+    sitemap_state_file: str = "batdongsan_sitemap_state.json"
+    
     # Base directory
     output_dir: str = "data/batdongsan/raw"
     links_file_pattern: str = "batdongsan_links_{date}.json"
     details_file_pattern: str = "batdongsan_details_{date}.json"
+    changes_file_pattern: str = "batdongsan_changes_{date}.json"
     date_format: str = "%Y-%m-%d"
     
     # Crawling parameters
     max_workers: int = 2
-    request_timeout: int = 20
+    request_timeout: int = 20  # per socket read (connect, each chunk of body)
+    
+    # Total limit per fetch including the body download (None = off)
+    request_deadline: Optional[float] = 60.0
+    
+    # Largest response body accepted (None = unlimited)
+    max_body_bytes: Optional[int] = 5 * 1024 * 1024
+    
+    # Detail pages: close the connection detail_cutoff_margin bytes after
+    # every marker has arrived - the related listings, scripts and footer
+    # that follow are never parsed (check with bench_parsers first when the
+    # page layout changes)
+    detail_stream_cutoff: bool = False
+    detail_cutoff_markers: Tuple[str, ...] = ("line-label", "Ngày đăng")
+    detail_cutoff_margin: int = 8192
+    
+    # Per-run bandwidth budget in bytes moved (headers + bodies as
+    # transferred): "stop" ends the run once spent, "pause" holds fetches
+    # until the next bandwidth_window_seconds window (None = unlimited)
+    bandwidth_budget_bytes: Optional[int] = None
+    bandwidth_budget_action: str = "stop"
+    bandwidth_window_seconds: float = 3600.0
+    
+    # Fetches still running after watchdog_stuck_seconds are written with
+    # the worker's stack to watchdog_file and the worker's slot goes to one
+    # of watchdog_spare_workers extra threads (None = off)
+    watchdog_stuck_seconds: Optional[float] = 90.0
+    watchdog_spare_workers: int = 1
+    watchdog_file: str = "batdongsan_hung_fetches.json"
+    
+    # Concurrency auto-tuning: listing/detail workers move between the
+    # min/max below following measured successful pages/s (starting from
+    # the last run's values in autotune_state_file, else max_workers)
+    autotune_concurrency: bool = False
+    autotune_min_workers: int = 1
+    autotune_max_workers: int = 8
+    autotune_window_seconds: float = 15.0
+    autotune_error_threshold: float = 0.1  # 429/5xx/exception share that halves workers
+    autotune_state_file: str = "batdongsan_concurrency.json"
+    
+    # BeautifulSoup tree builder: "html.parser" (stdlib), "lxml" or "html5lib"
+    # when installed (see benchmarks/bench_parsers.py)
+    html_parser: str = "html.parser"
+    
+    # Per-run metrics file written by run_full_pipeline, e.g.
+    # "batdongsan_metrics_{time}.json" (None = only in the returned dict)
+    metrics_file_pattern: Optional[str] = None
+    
+    # Prometheus text endpoint (GET /metrics) on a background thread
+    # (None = disabled)
+    metrics_port: Optional[int] = None
+    metrics_host: str = "127.0.0.1"
+    
+    # Keep loaded JSON files in memory while they are unchanged on disk
+    # (long-running processes such as the daemon)
+    keep_files_in_memory: bool = False
+    
+    # Shared per-host budget across all workers and roots (None = unlimited)
+    host_rate_limit: Optional[float] = 1.0  # requests per second
+    host_burst: int = 1
     
     # Delays (min, max) in seconds
     page_delay: Tuple[float, float] = (1.5, 3.0)
     detail_delay: Tuple[float, float] = (1.2, 2.5)
     
+    # Detail fetch priority: newest, never-crawled, weighted categories first
+    # category_weights keys are matched against the link's root/category/URL,
+    # e.g. {"ban-nha-dat-ha-noi": 2.0, "cho-thue": 0.5}
+    detail_priority: bool = True
+    category_weights: Dict[str, float] = field(default_factory=dict)
+    priority_half_life_hours: float = 24.0
+    priority_never_crawled_bonus: float = 1.0
+    priority_history_days: int = 7
+    
+    # Adaptive recrawl: every detail fetch is recorded in the change history
+    recrawl_tracking: bool = True
+    recrawl_state_file: str = "batdongsan_recrawl_state.json"
+    recrawl_initial_interval_hours: float = 24.0
+    recrawl_min_interval_hours: float = 6.0
+    recrawl_max_interval_hours: float = 24.0 * 14
+    
+    # Removed listings: tombstoned URLs are never fetched again. Redirects
+    # away from a listing and empty pages are only suspect; a listing seen
+    # suspect suspect_tombstone_after times with no good response in between,
+    # over at least suspect_tombstone_min_hours, is tombstoned too
+    tombstones_file: str = "batdongsan_tombstones.json"
+    suspect_tombstone_after: int = 3
+    suspect_tombstone_min_hours: float = 24.0
+    soft_404_markers: Tuple[str, ...] = (
+        "Tin đăng không tồn tại",
+        "Tin đăng đã hết hạn",
+        "Không tìm thấy trang",
+    )
+    
+    # Failure ledger and retry-failures backoff
+    failures_file: str = "batdongsan_failures.json"
+    retry_max_attempts: int = 5
+    retry_backoff_seconds: float = 60.0
+    
+    # Card-only mode: keep listing card fields on the links records and
+    # fetch detail pages only for incomplete or changed cards
+    card_mode: bool = False
+    card_selectors: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_CARD_SELECTORS))
+    card_required_fields: Tuple[str, ...] = ("title", "price", "area", "location")
+    
+    # Image download stage (the `images` command, or after the details step
+    # of run_full_pipeline with download_images): content-addressed files
+    # and a JSON-lines manifest under images_dir (None = <output_dir>/images).
+    # Downloads count against the bandwidth budget. image_variant rewrites
+    # /crop/1275x717/ to a smaller crop, e.g. "600x338"
+    download_images: bool = False
+    images_dir: Optional[str] = None
+    image_manifest_file: str = "images_manifest.jsonl"
+    image_concurrency: int = 32
+    image_per_host_concurrency: int = 8
+    image_host_rate_limit: Optional[float] = None  # requests per second
+    image_variant: Optional[str] = None
+    image_max_bytes: int = 10 * 1024 * 1024
+    image_retries: int = 3
+    image_retry_backoff_seconds: float = 2.0
+    
+    # Repost detection (the `reposts` command, or after the images step of
+    # run_full_pipeline with detect_reposts): perceptual hashes of the stored
+    # images in a Hamming-distance index. A listing sharing
+    # repost_min_matches photos with an earlier listing is flagged; flagged
+    # listings get repost_priority_weight times the detail priority and,
+    # with repost_skip_recrawl, are no longer recrawled. Decoding needs Pillow
+    detect_reposts: bool = False
+    reposts_file: str = "batdongsan_reposts.json"
+    repost_index_file: str = "batdongsan_phash_index.npz"
+    repost_hamming_radius: int = 6  # of 64 bits
+    repost_min_matches: int = 2
+    repost_processes: Optional[int] = None  # None = one per CPU
+    repost_priority_weight: float = 0.1
+    repost_skip_recrawl: bool = True
+    
     # HTTP headers
     headers: Dict[str, str] = field(default_factory=dict)
     
     # Runtime properties (set after init)
     _links_file: str = field(init=False, default="")
     _details_file: str = field(init=False, default="")
+    _changes_file: str = field(init=False, default="")
     
     def __post_init__(self):
         """Initialize after dataclass creation"""
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
 
+        if not self.listing_roots:
+            self.listing_roots = [self.base_url]
+
+        if self.images_dir is None:
+            self.images_dir = str(Path(self.output_dir) / "images")
+
         if not self.headers:
             self.headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -48,6 +205,7 @@ class BatDongSanConfig:
         today = datetime.now().strftime(self.date_format)
         self._links_file = self.links_file_pattern.format(date=today)
         self._details_file = self.details_file_pattern.format(date=today)
+        self._changes_file = self.changes_file_pattern.format(date=today)
     
     @property
     def links_file(self) -> str:
@@ -57,9 +215,14 @@ class BatDongSanConfig:
     def details_file(self) -> str:
         return self._details_file
     
+    @property
+    def changes_file(self) -> str:
+        return self._changes_file
+    
     def set_date(self, date: str):
         self._links_file = self.links_file_pattern.format(date=date)
         self._details_file = self.details_file_pattern.format(date=date)
+        self._changes_file = self.changes_file_pattern.format(date=date)
     
     def get_links_path(self) -> str:
         return str(Path(self.output_dir) / self.links_file)
@@ -0,0 +1,152 @@
+"""
+Daemon mode
+Runs the listing + detail passes every N minutes in one long-lived process,
+rolls the dated output files over at midnight and shuts down cleanly on
+SIGTERM / SIGINT
+"""
+
+import signal
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from .logger import setup_logger
+
+
+class PipelineDaemon:
+    """Continuous scheduled pipeline around one warm BatDongSanScraper"""
+
+    def __init__(
+        self,
+        scraper,
+        interval_minutes: float = 15,
+        start_page: int = 1,
+        end_page: int = 10,
+        detail_budget: Optional[int] = None,
+        recrawl_budget: Optional[int] = 0,
+        retry_failures: bool = True,
+    ):
+        """
+        Args:
+            scraper: BatDongSanScraper; its session, caches and stores stay warm
+                (the caller closes it once run() returns)
+            interval_minutes: Time between the starts of two cycles
+            start_page: First listing page of each cycle
+            end_page: Last listing page of each cycle
+            detail_budget: max_requests for crawl_details per cycle (None = all)
+            recrawl_budget: max_requests for recrawl per cycle (0 disables)
+            retry_failures: Retry due failure-ledger entries every cycle
+        """
+        self.scraper = scraper
+        self.interval_seconds = interval_minutes * 60
+        self.start_page = start_page
+        self.end_page = end_page
+        self.detail_budget = detail_budget
+        self.recrawl_budget = recrawl_budget
+        self.retry_failures = retry_failures
+        self.logger = setup_logger(self.__class__.__name__)
+
+        # Indexes and files stay in memory between cycles
+        self.scraper.config.keep_files_in_memory = True
+        self.current_date: Optional[date] = None
+        self.cycles: List[Dict] = []
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def run(self, max_cycles: Optional[int] = None) -> List[Dict]:
+        """
+        Run cycles until stopped (signal or stop()) or max_cycles is reached
+
+        Returns:
+            Summary dict of every completed cycle
+        """
+        self._install_signal_handlers()
+        self.logger.info(f"Daemon started: every {self.interval_seconds / 60:.1f} min")
+
+        while not self.scraper.stopping:
+            started = time.monotonic()
+            self._rollover()
+            self.cycles.append(self.run_cycle())
+
+            if max_cycles is not None and len(self.cycles) >= max_cycles:
+                break
+
+            wait = max(0.0, self.interval_seconds - (time.monotonic() - started))
+            self.logger.info(f"Next cycle in {wait:.0f}s")
+            if self.scraper._stop_event.wait(wait):
+                break
+
+        self.logger.info(f"Daemon stopped after {len(self.cycles)} cycles")
+        return self.cycles
+
+    def run_cycle(self) -> Dict:
+        """One listing pass followed by details, recrawl and retries"""
+        scraper = self.scraper
+        start_time = datetime.now()
+        scraper.bandwidth.reset()
+
+        new_listings = scraper.crawl_listings(start_page=self.start_page, end_page=self.end_page)
+
+        new_details = []
+        if not scraper.stopping:
+            new_details = scraper.crawl_details(max_requests=self.detail_budget)
+
+        changed = []
+        if self.recrawl_budget != 0 and not scraper.stopping:
+            changed = scraper.recrawl(max_requests=self.recrawl_budget)
+
+        retried = {}
+        if self.retry_failures and not scraper.stopping:
+            retried = scraper.retry_failures()
+
+        summary = {
+            "date": str(self.current_date),
+            "start_time": start_time.isoformat(),
+            "duration_seconds": (datetime.now() - start_time).total_seconds(),
+            "new_listings": len(new_listings),
+            "new_details": len(new_details),
+            "changed": len(changed),
+            "recovered": retried.get("recovered", 0),
+            "interrupted": scraper.stopping,
+            "wire_bytes": scraper.bandwidth.totals()["wire_bytes"],
+        }
+        self.logger.info(f"Cycle done: {summary}")
+        return summary
+
+    def stop(self) -> None:
+        """Ask the running cycle to flush and the loop to exit"""
+        self.logger.info("Stop requested - finishing in-flight requests and saving")
+        self.scraper.request_stop()
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    def _rollover(self) -> None:
+        """Point the dated output files at today's date when the day changes"""
+        today = date.today()
+        if today == self.current_date:
+            return
+
+        # Pin the scraper's date so a cycle running past midnight stays consistent
+        config = self.scraper.config
+        config.set_date(today.strftime(config.date_format))
+        self.scraper.today = today
+        if self.current_date is not None:
+            self.logger.info(f"Midnight rollover: {self.current_date} -> {today} ({config.links_file})")
+        self.current_date = today
+
+    def _install_signal_handlers(self) -> None:
+        # Signal handlers can only be installed from the main thread
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def handler(signum, frame):
+            self.logger.info(f"Received signal {signum}")
+            self.stop()
+
+        signal.signal(signal.SIGTERM, handler)
+        signal.signal(signal.SIGINT, handler)
@@ -0,0 +1,129 @@
+"""
+BatDongSan.vn post date parsing
+Normalizes the relative dates shown on listing cards ("10 giờ trước",
+"Hôm qua", "01/01/2026") against a reference date
+"""
+
+import re
+import unicodedata
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+# One grammar for every format the cards use (matched against lower-cased text)
+_GRAMMAR = re.compile(
+    r"(?P<today>hôm nay)"
+    r"|(?P<yesterday>hôm qua)"
+    r"|(?P<count>\d+)\s*(?P<unit>giây|phút|giờ|ngày|tuần|tháng|năm)\s*trước"
+    r"|(?P<day>\d{1,2})/(?P<month>\d{1,2})/(?P<year>\d{4})"
+)
+
+# Days per unit - sub-day units mean "still today"
+# Approximate: 1 month = 30 days, 1 year = 365 days
+_UNIT_DAYS = {
+    "giây": 0,
+    "phút": 0,
+    "giờ": 0,
+    "ngày": 1,
+    "tuần": 7,
+    "tháng": 30,
+    "năm": 365,
+}
+
+# (days before the reference date, None) or (None, absolute date)
+Offset = Tuple[Optional[int], Optional[date]]
+
+
+class PostDateParser:
+    """Parse card date strings with a cached string -> offset lookup"""
+
+    def __init__(
+        self,
+        reference: Optional[Callable[[], date]] = None,
+        cache_size: int = 4096,
+    ):
+        """
+        Args:
+            reference: Returns the date relative strings are measured from.
+                Defaults to date.today, evaluated at every call so long
+                running processes roll over at midnight
+            cache_size: Number of distinct strings kept in the LRU cache
+                (0 disables caching)
+        """
+        self.reference = reference or date.today
+        self._offset = lru_cache(maxsize=cache_size)(self._resolve)
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def parse(self, date_str: str, today: Optional[date] = None) -> Optional[date]:
+        """
+        Parse a single date string
+
+        Args:
+            date_str: Date string like "10 giờ trước", "1 ngày trước"
+            today: Reference date; defaults to self.reference()
+
+        Returns:
+            date object or None if cannot parse
+        """
+        if not date_str:
+            return None
+
+        return self._apply(self._offset(date_str), today or self.reference())
+
+    def parse_many(
+        self,
+        date_strs: Iterable[str],
+        today: Optional[date] = None,
+    ) -> List[Optional[date]]:
+        """Parse a whole page of date strings against one reference date"""
+        today = today or self.reference()
+        offset = self._offset
+        return [
+            self._apply(offset(s), today) if s else None
+            for s in date_strs
+        ]
+
+    def cache_info(self):
+        """LRU cache statistics of the string -> offset lookup"""
+        return self._offset.cache_info()
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    @staticmethod
+    def _resolve(date_str: str) -> Optional[Offset]:
+        """Map a date string to an offset, independent of the reference date"""
+        text = unicodedata.normalize("NFC", date_str).lower()
+        match = _GRAMMAR.search(text)
+        if not match:
+            return None
+
+        if match.group("today"):
+            return 0, None
+
+        if match.group("yesterday"):
+            return 1, None
+
+        if match.group("count"):
+            return int(match.group("count")) * _UNIT_DAYS[match.group("unit")], None
+
+        day, month, year = int(match.group("day")), int(match.group("month")), int(match.group("year"))
+        try:
+            return None, date(year, month, day)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _apply(offset: Optional[Offset], today: date) -> Optional[date]:
+        if offset is None:
+            return None
+
+        days_ago, absolute = offset
+        if absolute is not None:
+            return absolute
+        return today - timedelta(days=days_ago)
@@ -0,0 +1,287 @@
+"""
+BatDongSan.vn Parquet export
+Turns the JSON detail files into a hive-partitioned Parquet dataset
+(date_posted=YYYY-MM-DD/province=...) without loading them into memory
+"""
+
+import glob
+import os
+import shutil
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .canonical import listing_key
+from .config import BatDongSanConfig
+from .jsonfiles import iter_json_array
+from .logger import setup_logger
+from .numerals import parse_number
+
+
+# detail_info label -> (column name, arrow type)
+DETAIL_INFO_COLUMNS: Dict[str, Tuple[str, pa.DataType]] = {
+    "Diện tích": ("info_area_m2", pa.float64()),
+    "Mức giá": ("info_price", pa.string()),
+    "Pháp lý": ("info_legal", pa.string()),
+    "Số phòng ngủ": ("info_bedrooms", pa.int16()),
+    "Số toilet": ("info_toilets", pa.int16()),
+    "Số tầng": ("info_floors", pa.int16()),
+    "Mặt tiền": ("info_frontage_m", pa.float64()),
+    "Đường vào": ("info_road_width_m", pa.float64()),
+    "Nội thất": ("info_furniture", pa.string()),
+    "Hướng nhà": ("info_house_direction", pa.string()),
+    "Hướng ban công": ("info_balcony_direction", pa.string()),
+}
+
+# Repeated, low-cardinality strings stored as dictionary pages
+DICTIONARY_COLUMNS = [
+    "category",
+    "info_legal",
+    "info_furniture",
+    "info_house_direction",
+    "info_balcony_direction",
+]
+
+SCHEMA = pa.schema(
+    [
+        ("url", pa.string()),
+        ("listing_key", pa.int64()),
+        ("title", pa.string()),
+        ("address", pa.string()),
+        ("price", pa.string()),
+        ("area", pa.string()),
+        ("description", pa.string()),
+        ("category", pa.string()),
+        ("images", pa.list_(pa.string())),
+        ("crawled_at", pa.timestamp("us")),
+    ]
+    + [(name, dtype) for name, dtype in DETAIL_INFO_COLUMNS.values()]
+    + [("detail_info_extra", pa.map_(pa.string(), pa.string()))]
+)
+
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+class DetailsParquetExporter:
+    """Stream detail records into a partitioned Parquet dataset"""
+
+    def __init__(
+        self,
+        config: Optional[BatDongSanConfig] = None,
+        row_group_size: int = 50_000,
+        max_buffered_rows: int = 200_000,
+        max_open_files: int = 64,
+        compression: str = "zstd",
+    ):
+        self.config = config or BatDongSanConfig()
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows
+        self.max_open_files = max_open_files
+        self.compression = compression
+        self.logger = setup_logger(self.__class__.__name__)
+
+        self._buffers: Dict[Tuple[str, str], List[Dict]] = {}
+        self._buffered = 0
+        self._writers: "OrderedDict[Tuple[str, str], pq.ParquetWriter]" = OrderedDict()
+        self._part_counter: Dict[Tuple[str, str], int] = {}
+        self._output_dir = ""
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def export(
+        self,
+        output_dir: str,
+        sources: Optional[List[str]] = None,
+        overwrite: bool = False,
+    ) -> Dict:
+        """
+        Export detail JSON files to Parquet
+
+        Args:
+            output_dir: Root directory of the Parquet dataset
+            sources: Detail JSON files. If None, every file matching
+                details_file_pattern in config.output_dir is exported
+            overwrite: Replace a dataset already in output_dir. Part files
+                are numbered per run, so writing over an earlier export
+                would mix its leftover parts with the new ones
+
+        Returns:
+            Summary with file, row and partition counts
+
+        Raises:
+            FileExistsError: output_dir holds a dataset and overwrite is False
+        """
+        if sources is None:
+            pattern = self.config.details_file_pattern.format(date="*")
+            sources = sorted(glob.glob(os.path.join(self.config.output_dir, pattern)))
+
+        existing = glob.glob(os.path.join(output_dir, "date_posted=*"))
+        if existing and not overwrite:
+            raise FileExistsError(f"{output_dir} already holds a Parquet dataset (overwrite to replace it)")
+        for partition_dir in existing:
+            shutil.rmtree(partition_dir)
+
+        self._output_dir = output_dir
+        self._part_counter = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+        rows = 0
+        partitions = set()
+
+        try:
+            for source in sources:
+                self.logger.info(f"Exporting {source}")
+                for record in iter_json_array(source):
+                    key = self._partition_key(record)
+                    self._buffers.setdefault(key, []).append(self._to_row(record))
+                    self._buffered += 1
+                    rows += 1
+                    partitions.add(key)
+
+                    if len(self._buffers[key]) >= self.row_group_size:
+                        self._flush(key)
+                    elif self._buffered >= self.max_buffered_rows:
+                        self._flush(max(self._buffers, key=lambda k: len(self._buffers[k])))
+
+            for key in list(self._buffers):
+                self._flush(key)
+        finally:
+            self._close_all()
+
+        self.logger.info(
+            f"Exported {rows} rows from {len(sources)} files "
+            f"into {len(partitions)} partitions"
+        )
+
+        return {
+            "files": len(sources),
+            "rows": rows,
+            "partitions": len(partitions),
+            "output_dir": output_dir,
+        }
+
+    # ========================================================================
+    # PRIVATE - ROW CONVERSION
+    # ========================================================================
+
+    def _partition_key(self, record: Dict) -> Tuple[str, str]:
+        """Get (date_posted, province) partition values for a record"""
+        date_value = DEFAULT_PARTITION
+        date_posted = (record.get("date_posted") or "").strip()
+        if date_posted:
+            try:
+                date_value = datetime.strptime(date_posted, "%d/%m/%Y").date().isoformat()
+            except ValueError:
+                pass
+
+        # Category looks like "Bán Nhà, Quận 12, Hồ Chí Minh" - province is last
+        parts = [p.strip() for p in (record.get("category") or "").split(",")]
+        province = parts[-1].replace("/", "-") if len(parts) > 1 and parts[-1] else DEFAULT_PARTITION
+
+        return date_value, province
+
+    def _to_row(self, record: Dict) -> Dict:
+        """Convert a detail record to a row matching SCHEMA"""
+        crawled_at = None
+        if record.get("crawled_at"):
+            try:
+                crawled_at = datetime.fromisoformat(record["crawled_at"])
+            except ValueError:
+                pass
+
+        row = {
+            "url": record.get("url"),
+            "listing_key": listing_key(record["url"]) if record.get("url") else None,
+            "title": record.get("title"),
+            "address": record.get("address"),
+            "price": record.get("price"),
+            "area": record.get("area"),
+            "description": record.get("description"),
+            "category": record.get("category"),
+            "images": record.get("images") or [],
+            "crawled_at": crawled_at,
+        }
+
+        extra = []
+        for label, value in (record.get("detail_info") or {}).items():
+            # Labels sometimes carry the page's line breaks ("Hướng ban\n   công")
+            label = " ".join(label.split())
+            column = DETAIL_INFO_COLUMNS.get(label)
+            if column is None:
+                extra.append((label, value))
+                continue
+
+            name, dtype = column
+            row[name] = self._convert(value, dtype)
+
+        row["detail_info_extra"] = extra
+        return row
+
+    def _convert(self, value: str, dtype: pa.DataType):
+        """Convert a detail_info string to the column's type (numbers as normalize reads them)"""
+        if pa.types.is_string(dtype):
+            return value
+
+        number = parse_number(value)
+        if number is None:
+            return None
+        if pa.types.is_integer(dtype):
+            return int(number)
+        return number
+
+    # ========================================================================
+    # PRIVATE - PARQUET WRITING
+    # ========================================================================
+
+    def _flush(self, key: Tuple[str, str]) -> None:
+        """Write one partition's buffered rows as a row group"""
+        rows = self._buffers.pop(key, [])
+        if not rows:
+            return
+
+        self._buffered -= len(rows)
+        table = pa.Table.from_pylist(rows, schema=SCHEMA)
+        self._get_writer(key).write_table(table, row_group_size=self.row_group_size)
+
+    def _get_writer(self, key: Tuple[str, str]) -> pq.ParquetWriter:
+        """Get an open writer for a partition, closing the least recently used"""
+        writer = self._writers.get(key)
+        if writer is not None:
+            self._writers.move_to_end(key)
+            return writer
+
+        if len(self._writers) >= self.max_open_files:
+            _, oldest = self._writers.popitem(last=False)
+            oldest.close()
+
+        date_value, province = key
+        partition_dir = os.path.join(
+            self._output_dir,
+            f"date_posted={date_value}",
+            f"province={province}",
+        )
+        os.makedirs(partition_dir, exist_ok=True)
+
+        # A partition reopened after eviction gets a new part file
+        part = self._part_counter.get(key, 0)
+        self._part_counter[key] = part + 1
+
+        writer = pq.ParquetWriter(
+            os.path.join(partition_dir, f"part-{part:05d}.parquet"),
+            SCHEMA,
+            compression=self.compression,
+            use_dictionary=DICTIONARY_COLUMNS,
+        )
+        self._writers[key] = writer
+        return writer
+
+    def _close_all(self) -> None:
+        """Close every open writer"""
+        while self._writers:
+            _, writer = self._writers.popitem(last=False)
+            writer.close()
@@ -0,0 +1,391 @@
+"""
+Image download stage
+Fetches the photos collected by _parse_images: asyncio workers run requests
+in a thread pool under per-host limits, files are stored by content hash so
+a reposted photo is kept once, and an append-only manifest lets an
+interrupted run resume
+"""
+
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .bandwidth import BandwidthMeter, wire_bytes
+from .config import BatDongSanConfig
+from .jsonfiles import iter_json_array
+from .logger import setup_logger
+from .ratelimit import HostRateLimiter
+
+
+CROP_RE = re.compile(r"/crop/\d+x\d+/")
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/avif": ".avif",
+}
+
+# Manifest statuses that are not retried on resume
+FINAL_STATUSES = ("ok", "gone")
+
+
+def rewrite_variant(url: str, variant: Optional[str]) -> str:
+    """'.../crop/1275x717/...' -> '.../crop/<variant>/...' (e.g. variant="600x338")"""
+    return CROP_RE.sub(f"/crop/{variant}/", url, count=1) if variant else url
+
+
+def iter_image_urls(sources: Iterable[str]) -> Iterator[str]:
+    """Image URLs of every record in the detail JSON files, in file order"""
+    for source in sources:
+        for record in iter_json_array(source):
+            yield from record.get("images") or ()
+
+
+class ImageStore:
+    """
+    Content-addressed files: <root>/<sha[:2]>/<sha[2:4]>/<sha><ext>
+
+    Identical bytes map to one path, so a photo reused by reposts or by
+    several listings is written once.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path_for(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}{ext}")
+
+    def temp_file(self):
+        return tempfile.NamedTemporaryFile(dir=self.tmp_dir, delete=False)
+
+    def put(self, tmp_path: str, sha256: str, ext: str) -> tuple:
+        """
+        Move a downloaded temp file to its content path
+
+        Returns:
+            (path relative to root, True if the content was new)
+        """
+        path = self.path_for(sha256, ext)
+        with self._lock:
+            new = not os.path.exists(path)
+            if new:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        if not new:
+            os.remove(tmp_path)
+        return os.path.relpath(path, self.root), new
+
+
+class ImageManifest:
+    """
+    Append-only JSON lines, one per download attempt: url, status
+    ("ok", "gone" or "error"), sha256, path, bytes, fetched_url, fetched_at
+
+    The last line per URL wins. Appending keeps the cost per image constant
+    at millions of entries, where rewriting one JSON document would not;
+    only url -> status is held in memory.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self.status: Dict[str, str] = self._load()
+        self._file = None
+        self._pending = 0
+
+    def done(self, url: str) -> bool:
+        return self.status.get(url) in FINAL_STATUSES
+
+    def append(self, entry: Dict) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self.status[entry["url"]] = entry["status"]
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load(self) -> Dict[str, str]:
+        status = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line of an interrupted run
+                    status[entry["url"]] = entry["status"]
+        except FileNotFoundError:
+            pass
+        return status
+
+
+class ImageDownloader:
+    """
+    Download images into an ImageStore
+
+    `concurrency` asyncio workers take URLs from a bounded queue (so the
+    URL source can be a generator over millions of records); each holds its
+    host's semaphore while a pool thread runs the blocking fetch. Failed
+    downloads are retried with exponential backoff without holding the
+    semaphore, and stay "error" in the manifest for the next run.
+
+    Every response is recorded in `bandwidth` (stage "image") and counts
+    against its budget. Once `stop_event` is set or a "stop" budget is
+    spent, queued URLs are left for the next run.
+    """
+
+    def __init__(
+        self,
+        config: Optional[BatDongSanConfig] = None,
+        concurrency: Optional[int] = None,
+        per_host: Optional[int] = None,
+        variant: Optional[str] = None,
+        bandwidth: Optional[BandwidthMeter] = None,
+        stop_event: Optional[threading.Event] = None,
+    ):
+        """
+        Args:
+            bandwidth: Shared meter (the scraper's); default: a new one with
+                the configured budget
+            stop_event: Set to stop the run (the scraper's request_stop)
+        """
+        self.config = config or BatDongSanConfig()
+        self.concurrency = concurrency or self.config.image_concurrency
+        self.per_host = per_host or self.config.image_per_host_concurrency
+        self.variant = variant if variant is not None else self.config.image_variant
+        self.logger = setup_logger(self.__class__.__name__)
+
+        self.store = ImageStore(self.config.images_dir)
+        self.manifest = ImageManifest(os.path.join(self.config.images_dir, self.config.image_manifest_file))
+        self.rate_limiter = HostRateLimiter(self.config.image_host_rate_limit, self.per_host)
+        self.bandwidth = bandwidth or BandwidthMeter(
+            self.config.bandwidth_budget_bytes,
+            self.config.bandwidth_budget_action,
+            self.config.bandwidth_window_seconds,
+        )
+        self.stop_event = stop_event or threading.Event()
+
+        self.session = requests.Session()
+        self.session.headers.update(self.config.headers)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.stats: Dict[str, int] = {}
+
+    @property
+    def stopping(self) -> bool:
+        return self.stop_event.is_set() or self.bandwidth.exhausted
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def download(self, urls: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> Dict:
+        """
+        Download every URL not yet in the manifest
+
+        Args:
+            urls: Image URLs. If None, the images of every detail file in
+                config.output_dir
+            limit: Download at most this many images
+
+        Returns:
+            Counts (ok, stored, duplicates, gone, errors, skipped), bytes
+            downloaded/stored, images per second and whether the run was
+            interrupted (stop requested or bandwidth budget spent)
+        """
+        if urls is None:
+            pattern = self.config.details_file_pattern.format(date="*")
+            urls = iter_image_urls(sorted(glob.glob(os.path.join(self.config.output_dir, pattern))))
+
+        self.stats = {
+            "ok": 0, "stored": 0, "duplicates": 0, "gone": 0, "errors": 0, "skipped": 0,
+            "bytes_downloaded": 0, "bytes_stored": 0,
+        }
+        started = time.perf_counter()
+        try:
+            asyncio.run(self._run(urls, limit))
+        finally:
+            self.manifest.close()
+            self.session.close()
+
+        elapsed = time.perf_counter() - started
+        result = dict(self.stats)
+        result["seconds"] = round(elapsed, 2)
+        result["images_per_second"] = round(result["ok"] / elapsed, 2) if elapsed else 0.0
+        result["interrupted"] = self.stopping
+        self.logger.info(
+            f"Images: {result['ok']} downloaded ({result['duplicates']} duplicates), "
+            f"{result['gone']} gone, {result['errors']} failed, {result['skipped']} already done | "
+            f"{result['bytes_downloaded'] / 1e6:.1f} MB in {elapsed:.1f}s"
+        )
+        return result
+
+    # ========================================================================
+    # PRIVATE - SCHEDULING
+    # ========================================================================
+
+    async def _run(self, urls: Iterable[str], limit: Optional[int]) -> None:
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="image")
+        loop.set_default_executor(executor)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 4)
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        workers = [
+            asyncio.create_task(self._worker(queue, semaphores)) for _ in range(self.concurrency)
+        ]
+
+        queued = set()
+        for url in urls:
+            if limit is not None and len(queued) >= limit or self.stopping:
+                break
+            if not url or url in queued:
+                continue
+            if self.manifest.done(url):
+                self.stats["skipped"] += 1
+                continue
+            queued.add(url)
+            await queue.put(url)
+
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        executor.shutdown(wait=True)
+
+    async def _worker(self, queue: asyncio.Queue, semaphores: Dict[str, asyncio.Semaphore]) -> None:
+        while True:
+            url = await queue.get()
+            if url is None:
+                return
+
+            host = urlsplit(url).netloc
+            semaphore = semaphores.get(host)
+            if semaphore is None:
+                semaphore = semaphores[host] = asyncio.Semaphore(self.per_host)
+
+            entry = None
+            for attempt in range(self.config.image_retries + 1):
+                if self.stopping:
+                    break
+                async with semaphore:
+                    entry = await asyncio.to_thread(self._fetch, url)
+                if entry is None or entry["status"] != "error" or attempt == self.config.image_retries:
+                    break
+                await asyncio.sleep(self.config.image_retry_backoff_seconds * 2 ** attempt)
+
+            # Left out of the manifest when stopped, so the next run fetches it
+            if entry is not None:
+                self._record(entry)
+
+    def _record(self, entry: Dict) -> None:
+        stats = self.stats
+        new = entry.pop("new", False)
+        self.manifest.append(entry)
+        if entry["status"] == "ok":
+            stats["ok"] += 1
+            stats["bytes_downloaded"] += entry["bytes"]
+            if new:
+                stats["stored"] += 1
+                stats["bytes_stored"] += entry["bytes"]
+            else:
+                stats["duplicates"] += 1
+        elif entry["status"] == "gone":
+            stats["gone"] += 1
+        else:
+            stats["errors"] += 1
+
+        done = stats["ok"] + stats["gone"] + stats["errors"]
+        if done % 1000 == 0:
+            self.logger.info(f"Images: {done} processed, {stats['stored']} stored, {stats['errors']} failed")
+
+    # ========================================================================
+    # PRIVATE - FETCH (runs in a pool thread)
+    # ========================================================================
+
+    def _fetch(self, url: str) -> Optional[Dict]:
+        """Manifest entry for url, None if the run stopped before fetching"""
+        entry = {"url": url, "fetched_at": datetime.now().isoformat()}
+        candidates = [rewrite_variant(url, self.variant)]
+        if candidates[0] != url:
+            candidates.append(url)  # variant not offered for this image
+
+        try:
+            for fetch_url in candidates:
+                entry["fetched_url"] = fetch_url
+                self.bandwidth.wait(self.stop_event)
+                if self.stopping:
+                    return None
+                self.rate_limiter.acquire(fetch_url)
+                with self.session.get(fetch_url, timeout=self.config.request_timeout, stream=True) as response:
+                    try:
+                        entry["http_status"] = response.status_code
+                        if response.status_code in (404, 410):
+                            continue
+                        if response.status_code != 200:
+                            entry["status"] = "error"
+                            return entry
+                        return self._store(response, entry)
+                    finally:
+                        self.bandwidth.record("image", fetch_url, wire_bytes(response), entry.get("bytes", 0))
+        except Exception as e:
+            entry["status"] = "error"
+            entry["error"] = type(e).__name__
+            return entry
+
+        entry["status"] = "gone"
+        return entry
+
+    def _store(self, response: requests.Response, entry: Dict) -> Dict:
+        """Stream the body to a temp file while hashing, then file it by hash"""
+        digest = hashlib.sha256()
+        size = 0
+        with self.store.temp_file() as f:
+            try:
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > self.config.image_max_bytes:
+                        raise ValueError(f"Image over {self.config.image_max_bytes} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+
+        content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip()
+        ext = CONTENT_TYPE_EXTENSIONS.get(content_type) or os.path.splitext(entry["fetched_url"].split("?", 1)[0])[1]
+        path, new = self.store.put(f.name, digest.hexdigest(), ext.lower()[:6])
+
+        entry.update(status="ok", sha256=digest.hexdigest(), path=path, bytes=size, new=new)
+        return entry
@@ -0,0 +1,114 @@
+"""
+Streaming reads of the JSON array files (links, details) and locked
+read-modify-write of the state files several processes share
+Standard library only, so the crawl modules can import it without the
+optional export/normalize dependencies
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+
+def iter_json_array(filepath: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """
+    Yield the elements of a top-level JSON array one at a time
+
+    Args:
+        filepath: Path to a file containing a JSON array of objects
+        chunk_size: Number of characters read per chunk
+
+    Yields:
+        Each decoded element, in file order
+    """
+    decoder = json.JSONDecoder()
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        started = False
+
+        while True:
+            # Skip whitespace and separators, refilling as needed
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                chunk = f.read(chunk_size)
+                buf, pos = buf[pos:] + chunk, 0
+                eof = not chunk
+
+            if pos >= len(buf):
+                return
+
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError(f"{filepath} does not contain a JSON array")
+                started = True
+                pos += 1
+                continue
+
+            if buf[pos] == "]":
+                return
+
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                buf, pos = buf[pos:] + chunk, 0
+                eof = not chunk
+                continue
+
+            yield item
+            buf, pos = buf[end:], 0
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on <path>.lock, held across processes of one host"""
+    with open(f"{path}.lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def update_json_file(path: str, update: Callable[[Any], Any], indent: Optional[int] = None) -> Any:
+    """
+    Read-modify-write a JSON file under file_lock
+
+    Args:
+        path: JSON file
+        update: Gets the current content (None if missing or corrupt) and
+            returns what to write
+        indent: json.dump indent
+
+    Returns:
+        The data written
+    """
+    with file_lock(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                current = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            current = None
+
+        data = update(current)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, path)
+    return data
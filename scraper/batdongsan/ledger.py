@@ -0,0 +1,145 @@
+"""
+Failure ledger
+Persistent record of failed listing/detail fetches so they can be retried
+on their own instead of re-running the whole day
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from .canonical import key_str
+from .config import BatDongSanConfig
+from .jsonfiles import update_json_file
+
+
+class FailureLedger:
+    """
+    (stage, canonical URL key) -> failure entry, persisted as JSON
+
+    Entry fields: url, stage, error_class, http_status, attempts,
+    first_failed_at, last_attempt_at (ISO) and stage-specific extras
+    (root/page for listing pages).
+
+    save() writes only the entries this process touched over the file's
+    current content (under a lock), so queue workers sharing the output
+    dir do not erase each other's entries.
+    """
+
+    def __init__(self, config: BatDongSanConfig):
+        self.config = config
+        self.path = os.path.join(config.output_dir, config.failures_file)
+        self._lock = threading.Lock()
+        self._changed: Set[str] = set()  # keys recorded or resolved since the last save
+        self._entries: Dict[str, Dict] = self._load()
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def record_failure(
+        self,
+        stage: str,
+        url: str,
+        error_class: str,
+        http_status: Optional[int] = None,
+        **extra,
+    ) -> None:
+        now = datetime.now().isoformat()
+        key = self._key(stage, url)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    "url": url,
+                    "stage": stage,
+                    "attempts": 0,
+                    "first_failed_at": now,
+                }
+            entry.update(extra)
+            entry["error_class"] = error_class
+            entry["http_status"] = http_status
+            entry["attempts"] += 1
+            entry["last_attempt_at"] = now
+            self._changed.add(key)
+
+    def get(self, stage: str, url: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(self._key(stage, url))
+            return dict(entry) if entry else None
+
+    def resolve(self, stage: str, url: str) -> None:
+        """Drop the entry after a success (or a tombstone)"""
+        key = self._key(stage, url)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._changed.add(key)
+
+    def entries(self, stage: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            return [
+                dict(entry) for entry in self._entries.values()
+                if stage is None or entry["stage"] == stage
+            ]
+
+    def due(self, stage: Optional[str] = None, now: Optional[float] = None) -> List[Dict]:
+        """
+        Entries whose backoff has elapsed and that have attempts left
+
+        Backoff after n attempts: retry_backoff_seconds * 2 ** (n - 1)
+        """
+        now = now or time.time()
+        due = []
+        for entry in self.entries(stage):
+            if entry["attempts"] >= self.config.retry_max_attempts:
+                continue
+            last = datetime.fromisoformat(entry["last_attempt_at"]).timestamp()
+            backoff = self.config.retry_backoff_seconds * 2 ** (entry["attempts"] - 1)
+            if last + backoff <= now:
+                due.append(entry)
+        return due
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self) -> None:
+        """Persist if anything changed since the last save, keeping other processes' entries"""
+        with self._lock:
+            if not self._changed:
+                return
+
+        def merge(stored: Optional[List[Dict]]) -> List[Dict]:
+            with self._lock:
+                merged = self._parse(stored or [])
+                for key in self._changed:
+                    if key in self._entries:
+                        merged[key] = self._entries[key]
+                    else:
+                        merged.pop(key, None)
+                self._entries = merged
+                self._changed = set()
+                return list(merged.values())
+
+        update_json_file(self.path, merge, indent=2)
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    @staticmethod
+    def _key(stage: str, url: str) -> str:
+        return f"{stage}|{key_str(url)}"
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return self._parse(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _parse(self, stored: List[Dict]) -> Dict[str, Dict]:
+        return {self._key(e["stage"], e["url"]): e for e in stored}
@@ -0,0 +1,23 @@
+"""
+Shared logger setup for the BatDongSan.vn modules
+"""
+
+import logging
+
+
+def setup_logger(name: str) -> logging.Logger:
+    """Setup logger with console output (idempotent)"""
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    return logger
@@ -0,0 +1,140 @@
+"""
+Pipeline metrics
+Per-stage latency histograms and counters for fetch, parse, politeness
+wait, dedupe and save - cheap enough to stay on in production
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+
+# Upper bounds in seconds: 0.5ms .. ~65s, doubling
+BUCKETS: Tuple[float, ...] = tuple(0.0005 * 2 ** i for i in range(18))
+
+
+class Histogram:
+    """Fixed exponential buckets; percentiles interpolate within a bucket"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+    def to_dict(self, buckets: bool = False) -> Dict:
+        result = {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p90_ms": round(self.percentile(90) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+        if buckets:
+            result["buckets"] = {
+                (f"{BUCKETS[i]:g}" if i < len(BUCKETS) else "+Inf"): n
+                for i, n in enumerate(self.counts) if n
+            }
+        return result
+
+
+class PipelineMetrics:
+    """
+    (stage, operation) -> Histogram and (stage, counter) -> int
+
+    Stages are "listing" and "detail"; operations are "fetch", "parse",
+    "wait", "dedupe" and "save". Counters include "bytes", "pages" and
+    "status_<code>"; gauges "queued" and "in_flight".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+        self.gauges: Dict[Tuple[str, str], float] = {}
+        self.started_at = time.time()
+
+    def observe(self, stage: str, operation: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get((stage, operation))
+            if histogram is None:
+                histogram = self.histograms[(stage, operation)] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, operation: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, operation, time.perf_counter() - start)
+
+    def count(self, stage: str, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[(stage, name)] = self.counters.get((stage, name), 0) + n
+
+    def add_gauge(self, stage: str, name: str, delta: float) -> None:
+        with self._lock:
+            self.gauges[(stage, name)] = self.gauges.get((stage, name), 0) + delta
+
+    def collect(self) -> Tuple[Dict, Dict, Dict]:
+        """Consistent copies of (histograms, counters, gauges) for exporters"""
+        with self._lock:
+            histograms = {}
+            for key, histogram in self.histograms.items():
+                copy = histograms[key] = Histogram()
+                copy.counts = list(histogram.counts)
+                copy.count, copy.total, copy.max = histogram.count, histogram.total, histogram.max
+            return histograms, dict(self.counters), dict(self.gauges)
+
+    def snapshot(self, buckets: bool = False) -> Dict[str, Dict]:
+        """{stage: {"timings": {operation: histogram}, "counters": {...}, "pages_per_second"}}"""
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        histograms, counters, _ = self.collect()
+
+        result: Dict[str, Dict] = {}
+        for (stage, operation), histogram in sorted(histograms.items()):
+            entry = result.setdefault(stage, {"timings": {}, "counters": {}})
+            entry["timings"][operation] = histogram.to_dict(buckets)
+        for (stage, name), value in sorted(counters.items()):
+            entry = result.setdefault(stage, {"timings": {}, "counters": {}})
+            entry["counters"][name] = value
+
+        for entry in result.values():
+            entry["pages_per_second"] = round(entry["counters"].get("pages", 0) / elapsed, 3)
+        return result
+
+    def save(self, path: str) -> None:
+        data = {"started_at": self.started_at, "stages": self.snapshot(buckets=True)}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
@@ -0,0 +1,155 @@
+"""
+Prometheus text-format metrics endpoint
+Serves GET /metrics from a background thread, so scrapes never block the
+crawl workers
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from .logger import setup_logger
+from .metrics import BUCKETS
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsServer:
+    """
+    Exposes a scraper's PipelineMetrics, rate limiter, single-flight and
+    failure ledger state
+
+        batdongsan_requests_total{stage,status}
+        batdongsan_pages_total{stage}
+        batdongsan_bytes_total{stage}
+        batdongsan_wire_bytes_total{stage}
+        batdongsan_stage_seconds{stage,operation}   (histogram)
+        batdongsan_queue_depth{stage}
+        batdongsan_in_flight_requests{stage}
+        batdongsan_rate_limit_backlog_seconds{host}
+        batdongsan_rate_limit_waited_seconds_total{host}
+        batdongsan_coalesced_requests_total
+        batdongsan_hung_workers_total{stage}
+        batdongsan_failures_pending
+    """
+
+    def __init__(self, scraper, host: str = "127.0.0.1", port: int = 9108, prefix: str = "batdongsan"):
+        self.scraper = scraper
+        self.prefix = prefix
+        self.logger = setup_logger(self.__class__.__name__)
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Serving metrics on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port"""
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+
+    def render(self) -> str:
+        """Current metrics in the Prometheus text exposition format"""
+        p = self.prefix
+        scraper = self.scraper
+        histograms, counters, gauges = scraper.metrics.collect()
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: Dict[str, float]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value:g}" for labels, value in samples.items())
+
+        family(f"{p}_requests_total", "counter", "HTTP responses by stage and status", {
+            _labels(stage=stage, status=name[len("status_"):]): value
+            for (stage, name), value in sorted(counters.items()) if name.startswith("status_")
+        })
+        family(f"{p}_pages_total", "counter", "Pages fetched and parsed successfully", {
+            _labels(stage=stage): value for (stage, name), value in sorted(counters.items()) if name == "pages"
+        })
+        family(f"{p}_bytes_total", "counter", "Response body bytes", {
+            _labels(stage=stage): value for (stage, name), value in sorted(counters.items()) if name == "bytes"
+        })
+        family(f"{p}_wire_bytes_total", "counter", "Response headers and bodies as transferred (compressed)", {
+            _labels(stage=stage): value for (stage, name), value in sorted(counters.items()) if name == "wire_bytes"
+        })
+
+        lines.append(f"# HELP {p}_stage_seconds Time per operation (fetch, parse, wait, dedupe, save)")
+        lines.append(f"# TYPE {p}_stage_seconds histogram")
+        for (stage, operation), histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, histogram.counts):
+                cumulative += n
+                lines.append(
+                    f"{p}_stage_seconds_bucket{_labels(stage=stage, operation=operation, le=f'{bound:g}')} {cumulative}"
+                )
+            labels = _labels(stage=stage, operation=operation, le="+Inf")
+            lines.append(f"{p}_stage_seconds_bucket{labels} {histogram.count}")
+            labels = _labels(stage=stage, operation=operation)
+            lines.append(f"{p}_stage_seconds_sum{labels} {histogram.total:g}")
+            lines.append(f"{p}_stage_seconds_count{labels} {histogram.count}")
+
+        family(f"{p}_queue_depth", "gauge", "Pages submitted to the worker pool but not started", {
+            _labels(stage=stage): value for (stage, name), value in sorted(gauges.items()) if name == "queued"
+        })
+        family(f"{p}_in_flight_requests", "gauge", "HTTP requests currently in progress", {
+            _labels(stage=stage): value for (stage, name), value in sorted(gauges.items()) if name == "in_flight"
+        })
+
+        limiter = scraper.rate_limiter.state()
+        family(f"{p}_rate_limit_backlog_seconds", "gauge", "Seconds until a new request to the host may start", {
+            _labels(host=host): state["backlog_seconds"] for host, state in sorted(limiter.items())
+        })
+        family(f"{p}_rate_limit_waited_seconds_total", "counter", "Total time workers waited on the host budget", {
+            _labels(host=host): state["waited_seconds"] for host, state in sorted(limiter.items())
+        })
+
+        family(f"{p}_coalesced_requests_total", "counter", "Fetches served by another in-flight fetch", {
+            "": scraper._inflight.shared
+        })
+        family(f"{p}_hung_workers_total", "counter", "Fetches the watchdog gave up on and replaced", {
+            _labels(stage=stage): value for (stage, name), value in sorted(counters.items()) if name == "hung"
+        })
+        family(f"{p}_failures_pending", "gauge", "Entries in the failure ledger", {"": len(scraper.ledger)})
+
+        return "\n".join(lines) + "\n"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                payload = server.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
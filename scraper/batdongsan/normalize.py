@@ -0,0 +1,235 @@
+"""
+BatDongSan.vn price / area normalization
+Parses the raw Vietnamese price and area strings ("6 tỷ", "3 tỷ 900 triệu",
+"65 tr/m", "93 m²") column-wise with pandas instead of row by row
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .logger import setup_logger
+from .numerals import NUMBER_PATTERN, THOUSANDS_PATTERN
+
+
+TY = 1_000_000_000
+TRIEU = 1_000_000
+NGHIN = 1_000
+
+_NUM = NUMBER_PATTERN
+
+# "<a> tỷ <b> triệu <c> nghìn [/m²]" - every part optional, at least one present
+PRICE_PATTERN = (
+    rf"^\s*(?:(?P<ty>{_NUM})\s*(?:tỷ|tỉ))?"
+    rf"\s*(?:(?P<trieu>{_NUM})\s*(?:triệu|tr))?"
+    rf"\s*(?:(?P<nghin>{_NUM})\s*(?:nghìn|ngàn|k))?"
+    r"\s*(?P<per_m2>/\s*m(?:²|2)?)?\s*$"
+)
+
+AREA_PATTERN = rf"^\s*(?P<value>{_NUM})\s*(?:m²|m2|m)?\s*$"
+
+# Prices that are deliberately not numbers
+NEGOTIABLE_PATTERN = r"thỏa thuận|thoả thuận|liên hệ"
+
+
+@dataclass
+class NormalizationReport:
+    """Bulk summary of a normalization pass"""
+
+    rows: int = 0
+    price_parsed: int = 0
+    price_negotiable: int = 0
+    area_parsed: int = 0
+    unparseable_price: Dict[str, int] = field(default_factory=dict)
+    unparseable_area: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "price_parsed": self.price_parsed,
+            "price_negotiable": self.price_negotiable,
+            "area_parsed": self.area_parsed,
+            "unparseable_price": self.unparseable_price,
+            "unparseable_area": self.unparseable_area,
+        }
+
+
+def to_number(values: pd.Series) -> pd.Series:
+    """
+    Convert Vietnamese-formatted number strings to floats
+
+    "1.200" -> 1200 (dot as thousands separator), "6,5" / "6.5" -> 6.5
+    """
+    values = values.astype("string")
+    thousands = values.str.fullmatch(THOUSANDS_PATTERN, na=False)
+    cleaned = values.where(~thousands, values.str.replace(".", "", regex=False))
+    cleaned = cleaned.str.replace(",", ".", regex=False)
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+
+class PriceAreaNormalizer:
+    """Add price_vnd, area_m2 and price_per_m2 columns to detail records"""
+
+    def __init__(self, max_reported_values: int = 20):
+        self.max_reported_values = max_reported_values
+        self.last_report: Optional[NormalizationReport] = None
+        self.logger = setup_logger(self.__class__.__name__)
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parse price/area of every row
+
+        Missing `price`/`area` values fall back to the "Mức giá"/"Diện tích"
+        entries of `detail_info` (or the info_* columns of a Parquet export).
+
+        Args:
+            df: Detail records, one row per listing
+
+        Returns:
+            Copy of df with price_vnd, area_m2 and price_per_m2 float columns
+        """
+        df = df.copy()
+        price_raw = self._with_fallback(df, "price", "Mức giá", "info_price")
+        area_raw = self._with_fallback(df, "area", "Diện tích", None)
+
+        # Prices and areas repeat heavily - parse each distinct string once
+        # and broadcast the results back with the factorized codes
+        price_codes, price_uniques = pd.factorize(price_raw)
+        area_codes, area_uniques = pd.factorize(area_raw)
+        price_uniques = pd.Series(price_uniques, dtype="string")
+        area_uniques = pd.Series(area_uniques, dtype="string")
+
+        total_u, per_unit_u = self._parse_price(price_uniques)
+        area_u = self._parse_area(area_uniques)
+
+        price_total = self._broadcast(total_u, price_codes, df.index)
+        price_per_unit = self._broadcast(per_unit_u, price_codes, df.index)
+        area_m2 = self._broadcast(area_u, area_codes, df.index)
+        if "info_area_m2" in df.columns:
+            area_m2 = area_m2.fillna(df["info_area_m2"].astype("float64"))
+
+        # "65 tr/m" is a unit price - total comes from the area
+        df["price_vnd"] = price_total.fillna(price_per_unit * area_m2)
+        df["area_m2"] = area_m2
+        df["price_per_m2"] = price_per_unit.fillna(price_total / area_m2.where(area_m2 > 0))
+
+        self.last_report = self._build_report(
+            price_uniques, np.bincount(price_codes[price_codes >= 0], minlength=len(price_uniques)),
+            total_u.notna() | per_unit_u.notna(),
+            area_uniques, np.bincount(area_codes[area_codes >= 0], minlength=len(area_uniques)),
+            area_u.notna(),
+            rows=len(df),
+            area_parsed=int(area_m2.notna().sum()),
+        )
+        self._log_report(self.last_report)
+
+        return df
+
+    def normalize_records(self, records: List[Dict]) -> List[Dict]:
+        """Normalize a list of detail dicts, returning dicts with the new keys"""
+        df = self.normalize(pd.DataFrame.from_records(records))
+        df = df.replace({np.nan: None})
+        return df.to_dict(orient="records")
+
+    # ========================================================================
+    # PRIVATE - PARSING
+    # ========================================================================
+
+    def _with_fallback(
+        self,
+        df: pd.DataFrame,
+        column: str,
+        info_label: str,
+        info_column: Optional[str],
+    ) -> pd.Series:
+        """Take `column`, filling blanks from detail_info[info_label]"""
+        values = df[column] if column in df.columns else pd.Series(pd.NA, index=df.index)
+        values = values.astype("string").str.strip().replace("", pd.NA)
+
+        if "detail_info" in df.columns:
+            info = df["detail_info"].str.get(info_label).astype("string")
+            values = values.fillna(info)
+        if info_column and info_column in df.columns:
+            values = values.fillna(df[info_column].astype("string"))
+
+        return values
+
+    def _broadcast(self, values: pd.Series, codes: np.ndarray, index: pd.Index) -> pd.Series:
+        """Map per-unique results back to rows (code -1 = missing -> NaN)"""
+        result = np.append(values.to_numpy(dtype="float64"), np.nan)[codes]
+        return pd.Series(result, index=index, dtype="float64")
+
+    def _parse_price(self, raw: pd.Series):
+        """Return (total price, price per m²) in VND; NaN where not applicable"""
+        lowered = raw.str.lower().str.strip()
+        parts = lowered.str.extract(PRICE_PATTERN)
+
+        amount = (
+            to_number(parts["ty"]).fillna(0) * TY
+            + to_number(parts["trieu"]).fillna(0) * TRIEU
+            + to_number(parts["nghin"]).fillna(0) * NGHIN
+        )
+        matched = parts[["ty", "trieu", "nghin"]].notna().any(axis=1)
+        amount = amount.where(matched)
+
+        per_m2 = parts["per_m2"].notna()
+        return amount.where(~per_m2), amount.where(per_m2)
+
+    def _parse_area(self, raw: pd.Series) -> pd.Series:
+        """Return area in m²"""
+        parts = raw.str.lower().str.extract(AREA_PATTERN)
+        return to_number(parts["value"])
+
+    # ========================================================================
+    # PRIVATE - REPORTING
+    # ========================================================================
+
+    def _build_report(
+        self,
+        price_values: pd.Series,
+        price_counts: np.ndarray,
+        price_ok: pd.Series,
+        area_values: pd.Series,
+        area_counts: np.ndarray,
+        area_ok: pd.Series,
+        rows: int,
+        area_parsed: int,
+    ) -> NormalizationReport:
+        """Summarize distinct values and their row counts"""
+        negotiable = price_values.str.lower().str.contains(NEGOTIABLE_PATTERN, na=False).to_numpy()
+        price_ok = price_ok.to_numpy()
+        area_ok = area_ok.to_numpy()
+
+        bad_price = ~price_ok & ~negotiable
+        bad_area = ~area_ok
+
+        return NormalizationReport(
+            rows=rows,
+            price_parsed=int(price_counts[price_ok].sum()),
+            price_negotiable=int(price_counts[negotiable].sum()),
+            area_parsed=area_parsed,
+            unparseable_price=self._top_values(price_values[bad_price], price_counts[bad_price]),
+            unparseable_area=self._top_values(area_values[bad_area], area_counts[bad_area]),
+        )
+
+    def _top_values(self, values: pd.Series, counts: np.ndarray) -> Dict[str, int]:
+        """Most frequent values first, capped at max_reported_values"""
+        order = np.argsort(-counts, kind="stable")[: self.max_reported_values]
+        return {str(values.iloc[i]): int(counts[i]) for i in order}
+
+    def _log_report(self, report: NormalizationReport) -> None:
+        self.logger.info(
+            f"Normalized {report.rows} rows | "
+            f"price: {report.price_parsed} parsed, {report.price_negotiable} negotiable | "
+            f"area: {report.area_parsed} parsed"
+        )
+        if report.unparseable_price:
+            self.logger.warning(f"Unparseable prices (top values): {report.unparseable_price}")
+        if report.unparseable_area:
+            self.logger.warning(f"Unparseable areas (top values): {report.unparseable_area}")
@@ -0,0 +1,39 @@
+"""
+Vietnamese-formatted numbers
+"1.200" uses the dot as thousands separator, "6,5" the comma as decimal
+point. One rule for the Parquet export and the vectorized normalizer;
+standard library only
+"""
+
+import re
+from typing import Optional
+
+
+# A number token: digits with "." / "," groups
+NUMBER_PATTERN = r"\d+(?:[.,]\d+)*"
+
+# Tokens whose dots are thousands separators ("1.200", "12.500.000")
+THOUSANDS_PATTERN = r"\d{1,3}(?:\.\d{3})+"
+
+_NUMBER_RE = re.compile(NUMBER_PATTERN)
+_THOUSANDS_RE = re.compile(THOUSANDS_PATTERN)
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    """
+    First number in text as a float
+
+    "1.200 m²" -> 1200.0, "1,5 tỷ" -> 1.5, "6.5 m" -> 6.5; None when there
+    is no number or it is malformed ("1.200.5")
+    """
+    match = _NUMBER_RE.search(text or "")
+    if not match:
+        return None
+
+    token = match.group()
+    if _THOUSANDS_RE.fullmatch(token):
+        token = token.replace(".", "")
+    try:
+        return float(token.replace(",", "."))
+    except ValueError:
+        return None
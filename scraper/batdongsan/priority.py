@@ -0,0 +1,156 @@
+"""
+Priority ordering of detail fetches
+Newest, never-crawled listings in the categories we care about go first;
+flagged reposts go last
+"""
+
+import glob
+import heapq
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+from .canonical import url_key
+from .config import BatDongSanConfig
+from .jsonfiles import iter_json_array
+
+
+def repost_keys(config: BatDongSanConfig) -> Set[str]:
+    """key_str of every listing RepostDetector flagged"""
+    try:
+        with open(os.path.join(config.output_dir, config.reposts_file), "r", encoding="utf-8") as f:
+            return set(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+
+
+class DetailPrioritizer:
+    """
+    Score detail URLs from their links records
+
+        score = category_weight * (recency + never_crawled_bonus * never_crawled)
+
+    recency halves every config.priority_half_life_hours since posting;
+    category_weight is the largest config.category_weights entry whose key
+    occurs in the record's root, category or URL (1.0 if none match).
+    Listings flagged as reposts score config.repost_priority_weight times less.
+    """
+
+    def __init__(self, config: BatDongSanConfig):
+        self.config = config
+        # crawled_before() result and the (days, since) it was read for
+        self._crawled: Set[Hashable] = set()
+        self._crawled_window = None
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def order(
+        self,
+        urls: Iterable[str],
+        records: Dict[Hashable, Dict],
+        crawled_before: Set[Hashable],
+        limit: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Return urls highest priority first
+
+        Args:
+            urls: URLs to schedule
+            records: Links records by url_key (missing records get default scores)
+            crawled_before: url_keys that already have a detail record
+            limit: Request budget - only the top `limit` URLs are returned
+            now: Reference time for recency
+        """
+        now = now or datetime.now()
+        reposts = repost_keys(self.config)
+        heap = []
+        for i, url in enumerate(urls):
+            key = url_key(url)
+            score = self.score(records.get(key, {}), key in crawled_before, now)
+            if reposts and str(key) in reposts:
+                score *= self.config.repost_priority_weight
+            heap.append((-score, i, url))
+        heapq.heapify(heap)
+
+        count = len(heap) if limit is None else min(limit, len(heap))
+        return [heapq.heappop(heap)[2] for _ in range(count)]
+
+    def score(self, record: Dict, crawled: bool, now: datetime) -> float:
+        posted = self._posted_at(record)
+        if posted is None:
+            recency = 0.0
+        else:
+            age_hours = max(0.0, (now - posted).total_seconds() / 3600)
+            recency = 0.5 ** (age_hours / self.config.priority_half_life_hours)
+
+        never_crawled = 0.0 if crawled else 1.0
+        return self._category_weight(record) * (
+            recency + self.config.priority_never_crawled_bonus * never_crawled
+        )
+
+    def crawled_before(self, days: Optional[int] = None) -> Set[Hashable]:
+        """
+        url_keys present in the detail files of the last `days` days
+
+        The files are read once per day; keys crawled since then are added
+        through mark_crawled(). Do not mutate the returned set.
+        """
+        days = self.config.priority_history_days if days is None else days
+        since = (datetime.now() - timedelta(days=days)).strftime(self.config.date_format)
+        if self._crawled_window != (days, since):
+            self._crawled = self._read_crawled(since)
+            self._crawled_window = (days, since)
+        return self._crawled
+
+    def mark_crawled(self, keys: Iterable[Hashable]):
+        """Record url_keys whose detail records were just saved"""
+        self._crawled.update(keys)
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    def _read_crawled(self, since: str) -> Set[Hashable]:
+
+        pattern = self.config.details_file_pattern.format(date="*")
+        prefix, suffix = self.config.details_file_pattern.split("{date}")
+
+        keys = set()
+        for path in glob.glob(os.path.join(self.config.output_dir, pattern)):
+            name = os.path.basename(path)
+            file_date = name[len(prefix):len(name) - len(suffix)]
+            if file_date < since:
+                continue
+            keys.update(url_key(item["url"]) for item in iter_json_array(path) if "url" in item)
+        return keys
+
+    def _posted_at(self, record: Dict) -> Optional[datetime]:
+        """Best known posting time: sitemap lastmod, card date, collection time"""
+        for key, fmt in (("lastmod", None), ("parsed_date", "%Y-%m-%d"), ("collected_at", None)):
+            value = record.get(key)
+            if not value:
+                continue
+            try:
+                parsed = datetime.strptime(value, fmt) if fmt else datetime.fromisoformat(value)
+            except ValueError:
+                continue
+            # Compare in local naive time
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone().replace(tzinfo=None)
+            return parsed
+        return None
+
+    def _category_weight(self, record: Dict) -> float:
+        weights = self.config.category_weights
+        if not weights:
+            return 1.0
+
+        haystack = " ".join(
+            str(record.get(key) or "") for key in ("root", "category", "url")
+        ).lower()
+        matches = [weight for key, weight in weights.items() if key.lower() in haystack]
+        return max(matches) if matches else 1.0
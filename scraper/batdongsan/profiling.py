@@ -0,0 +1,209 @@
+"""
+Built-in profiler for pipeline runs
+A sampling profiler over every thread writes collapsed stacks (flamegraph.pl,
+speedscope, inferno) and a top-N table; optional cProfile covers every
+worker thread and is merged into one .prof file
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .logger import setup_logger
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class PipelineProfiler:
+    """
+    Context manager profiling all threads of this process
+
+        with PipelineProfiler("data/profile/run"):
+            scraper.run_full_pipeline()
+
+    writes run.collapsed and run.top.txt (and run.prof with cprofile=True).
+    Processes (e.g. several queue-work workers) profile themselves; combine
+    their outputs with merge_profiles().
+    """
+
+    def __init__(self, prefix: str, interval: float = 0.005, cprofile: bool = False, top: int = 30):
+        """
+        Args:
+            prefix: Output path prefix (directories are created)
+            interval: Seconds between stack samples
+            cprofile: Also run cProfile in every thread (slower, exact counts)
+            top: Rows in the top-N table
+        """
+        self.prefix = prefix
+        self.interval = interval
+        self.cprofile = cprofile
+        self.top_n = top
+        self.logger = setup_logger(self.__class__.__name__)
+
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._profiles_lock = threading.Lock()
+        self._started = 0.0
+        self.outputs: Dict[str, str] = {}
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def __enter__(self) -> "PipelineProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        if self.cprofile:
+            # New threads (the executors' workers) start their own profile;
+            # the current thread is profiled directly
+            threading.setprofile(self._bootstrap_thread)
+            self._new_profile().enable()
+
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> Dict[str, str]:
+        """Stop sampling and write the outputs; returns their paths"""
+        self._stop.set()
+        self._sampler.join()
+        elapsed = time.perf_counter() - self._started
+
+        outputs = {}
+        directory = os.path.dirname(self.prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        outputs["collapsed"] = f"{self.prefix}.collapsed"
+        write_collapsed(self.samples, outputs["collapsed"])
+
+        stats = None
+        if self.cprofile:
+            threading.setprofile(None)
+            with self._profiles_lock:
+                profiles = list(self._profiles)
+            for profile in profiles:
+                profile.disable()
+            stats = pstats.Stats(*profiles)
+            outputs["prof"] = f"{self.prefix}.prof"
+            stats.dump_stats(outputs["prof"])
+
+        outputs["top"] = f"{self.prefix}.top.txt"
+        with open(outputs["top"], "w", encoding="utf-8") as f:
+            f.write(f"# {elapsed:.1f}s, {self.sample_count} samples every {self.interval * 1000:g}ms\n\n")
+            f.write(format_top(self.samples, self.top_n))
+            if stats is not None:
+                f.write(f"\n# cProfile, {len(profiles)} threads merged, by cumulative time\n\n")
+                stats.stream = f
+                stats.sort_stats("cumulative").print_stats(self.top_n)
+
+        self.logger.info(f"Profile written: {', '.join(outputs.values())}")
+        self.outputs = outputs
+        return outputs
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    def _new_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        with self._profiles_lock:
+            self._profiles.append(profile)
+        return profile
+
+    def _bootstrap_thread(self, frame, event, arg) -> None:
+        # First profile event of a new thread: hand the thread to cProfile
+        sys.setprofile(None)
+        if threading.current_thread() is not self._sampler:
+            self._new_profile().enable()
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack.append(_thread_group(names.get(ident, str(ident))))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+
+def _thread_group(name: str) -> str:
+    """'ThreadPoolExecutor-3_1' -> 'ThreadPoolExecutor' so workers merge in the flamegraph"""
+    return name.split("-", 1)[0] if name.startswith("ThreadPoolExecutor") else name
+
+
+def write_collapsed(samples: Counter, path: str) -> None:
+    """Brendan Gregg's collapsed format: 'frame;frame;frame count' per line"""
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def read_collapsed(path: str) -> Counter:
+    samples: Counter = Counter()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack:
+                samples[stack] += int(count)
+    return samples
+
+
+def format_top(samples: Counter, n: int = 30) -> str:
+    """Top-n functions by self samples, with inclusive samples"""
+    total = sum(samples.values()) or 1
+    self_counts: Counter = Counter()
+    inclusive: Counter = Counter()
+    for stack, count in samples.items():
+        frames = stack.split(";")[1:]  # drop the thread name
+        if not frames:
+            continue
+        self_counts[frames[-1]] += count
+        for frame in set(frames):
+            inclusive[frame] += count
+
+    rows = [f"{'self %':>7} {'total %':>8}  function"]
+    for frame, count in self_counts.most_common(n):
+        rows.append(f"{count / total:>7.1%} {inclusive[frame] / total:>8.1%}  {frame}")
+    return "\n".join(rows) + "\n"
+
+
+def merge_profiles(prefixes: Iterable[str], out_prefix: str, top: int = 30) -> Tuple[str, ...]:
+    """Merge per-process outputs (<prefix>.collapsed / .prof) into out_prefix"""
+    prefixes = list(prefixes)
+    samples: Counter = Counter()
+    for prefix in prefixes:
+        if os.path.exists(f"{prefix}.collapsed"):
+            samples.update(read_collapsed(f"{prefix}.collapsed"))
+
+    written = [f"{out_prefix}.collapsed", f"{out_prefix}.top.txt"]
+    write_collapsed(samples, written[0])
+    with open(written[1], "w", encoding="utf-8") as f:
+        f.write(format_top(samples, top))
+
+    prof_files = [f"{prefix}.prof" for prefix in prefixes if os.path.exists(f"{prefix}.prof")]
+    if prof_files:
+        written.append(f"{out_prefix}.prof")
+        pstats.Stats(*prof_files).dump_stats(written[-1])
+    return tuple(written)
@@ -0,0 +1,67 @@
+"""
+Per-host request rate limiting shared by every worker thread
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """
+    Generic cell rate algorithm (GCRA) limiter keyed by host
+
+    Each call to acquire() reserves the next free slot for the URL's host
+    and sleeps until it comes up, so any number of threads crawling any
+    number of listing roots share one budget per host.
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        """
+        Args:
+            rate: Requests per second per host (None or 0 disables limiting)
+            burst: Requests allowed back-to-back before spacing kicks in
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tat: Dict[str, float] = {}  # theoretical arrival time per host
+        self._waited: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> float:
+        """
+        Block until a request to url's host is allowed
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not self.rate:
+            return 0.0
+
+        host = urlsplit(url).netloc
+        interval = 1.0 / self.rate
+        tolerance = (self.burst - 1) * interval
+
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat.get(host, now), now)
+            wait = max(0.0, tat - tolerance - now)
+            self._tat[host] = tat + interval
+            self._waited[host] = self._waited.get(host, 0.0) + wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def state(self) -> Dict[str, Dict[str, float]]:
+        """Backlog (seconds until a new request would run) and total wait per host"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    "backlog_seconds": max(0.0, tat - now),
+                    "waited_seconds": self._waited.get(host, 0.0),
+                }
+                for host, tat in self._tat.items()
+            }
@@ -0,0 +1,217 @@
+"""
+Adaptive revisit scheduling for listings
+Keeps a content-hash history per listing, estimates how often each listing
+changes and schedules the next visit from that estimate
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from .canonical import key_str
+from .config import BatDongSanConfig
+from .jsonfiles import update_json_file
+
+
+HASHED_FIELDS = ("title", "price", "area", "detail_info")
+
+
+def content_hash(record: Dict) -> str:
+    """Hash of the fields whose change we track"""
+    payload = json.dumps(
+        {key: record.get(key) for key in HASHED_FIELDS},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class RecrawlScheduler:
+    """
+    Per-listing change history and next-visit times, keyed by listing key
+
+    The change rate uses the Cho & Garcia-Molina estimator for a Poisson
+    process observed at (roughly) regular visits:
+
+        rate = -ln((n - X + 0.5) / (n + 0.5)) / mean_interval
+
+    where n is the number of revisits and X the number that saw a change.
+    The next visit is 1 / rate later, clamped to the configured bounds.
+    Failed visits back off exponentially from the minimum interval, so a
+    listing that keeps failing does not stay at the front of due().
+
+    save() writes the listings this process visited over the file's
+    current content (under a lock), so queue workers sharing the output
+    dir keep each other's history.
+    """
+
+    def __init__(self, config: BatDongSanConfig, max_history: int = 20):
+        self.config = config
+        self.max_history = max_history
+        self.path = os.path.join(config.output_dir, config.recrawl_state_file)
+        self._lock = threading.Lock()
+        self._changed: Set[str] = set()  # keys observed or forgotten since the last save
+        self._state: Dict[str, Dict] = self._load()
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def observe(self, url: str, record: Dict, now: Optional[float] = None) -> bool:
+        """
+        Record a visit of url
+
+        Returns:
+            True if the listing changed since the previous visit
+        """
+        now = now or time.time()
+        digest = content_hash(record)
+
+        with self._lock:
+            self._changed.add(key_str(url))
+            entry = self._state.get(key_str(url))
+            if entry is None:
+                entry = self._state[key_str(url)] = {
+                    "url": url,
+                    "hash": digest,
+                    "first_seen": now,
+                    "last_visit": now,
+                    "visits": 0,
+                    "changes": 0,
+                    "history": [[now, digest]],
+                }
+                changed = False
+            else:
+                changed = digest != entry["hash"]
+                entry.pop("failures", None)
+                entry["visits"] += 1
+                entry["changes"] += int(changed)
+                entry["last_visit"] = now
+                if changed:
+                    entry["hash"] = digest
+                    entry["history"] = (entry["history"] + [[now, digest]])[-self.max_history:]
+
+            entry["rate_per_hour"] = self._rate(entry, now)
+            entry["next_visit"] = now + self._interval_hours(entry["rate_per_hour"]) * 3600
+
+        return changed
+
+    def observe_failure(self, url: str, now: Optional[float] = None) -> None:
+        """
+        Record a visit that got no usable record (fetch error, suspect page)
+
+        The next visit moves recrawl_min_interval_hours * 2 ** (failures - 1)
+        ahead, capped at recrawl_max_interval_hours; the change history is
+        left untouched
+        """
+        now = now or time.time()
+        config = self.config
+        with self._lock:
+            entry = self._state.get(key_str(url))
+            if entry is None:
+                return
+            self._changed.add(key_str(url))
+            entry["failures"] = entry.get("failures", 0) + 1
+            backoff = min(
+                config.recrawl_max_interval_hours,
+                config.recrawl_min_interval_hours * 2 ** (entry["failures"] - 1),
+            )
+            entry["next_visit"] = now + backoff * 3600
+
+    def observe_many(self, records: Iterable[Dict], now: Optional[float] = None) -> int:
+        """Observe detail records (keyed by their "url"). Returns number changed"""
+        return sum(self.observe(record["url"], record, now) for record in records if "url" in record)
+
+    def forget(self, url: str) -> None:
+        """Stop scheduling url (e.g. the listing was removed)"""
+        with self._lock:
+            self._state.pop(key_str(url), None)
+            self._changed.add(key_str(url))
+
+    def due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+        """URLs whose next visit has passed, most overdue first"""
+        now = now or time.time()
+        with self._lock:
+            overdue = [
+                (entry["next_visit"], entry["url"])
+                for entry in self._state.values()
+                if entry["next_visit"] <= now
+            ]
+
+        if limit is None:
+            overdue.sort()
+            return [url for _, url in overdue]
+        return [url for _, url in heapq.nsmallest(limit, overdue)]
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._state.get(key_str(url))
+            return dict(entry) if entry else None
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def save(self) -> None:
+        """Persist the state atomically, keeping other processes' listings"""
+        def merge(stored: Optional[Dict]) -> Dict[str, Dict]:
+            with self._lock:
+                merged = self._parse(stored or {})
+                for key in self._changed:
+                    if key in self._state:
+                        merged[key] = self._state[key]
+                    else:
+                        merged.pop(key, None)
+                self._state = merged
+                self._changed = set()
+                return dict(merged)
+
+        update_json_file(self.path, merge)
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return self._parse(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _parse(stored: Dict) -> Dict[str, Dict]:
+        # Older files were keyed by raw URL
+        state = {}
+        for key, entry in stored.items():
+            url = entry.setdefault("url", key)
+            state.setdefault(key_str(url), entry)
+        return state
+
+    def _rate(self, entry: Dict, now: float) -> Optional[float]:
+        """Estimated changes per hour (None before the first revisit)"""
+        n = entry["visits"]
+        if n == 0:
+            return None
+
+        mean_interval_hours = (now - entry["first_seen"]) / 3600 / n
+        if mean_interval_hours <= 0:
+            return None
+
+        x = entry["changes"]
+        return -math.log((n - x + 0.5) / (n + 0.5)) / mean_interval_hours
+
+    def _interval_hours(self, rate: Optional[float]) -> float:
+        config = self.config
+        if rate is None:
+            return config.recrawl_initial_interval_hours
+        if rate <= 0:
+            return config.recrawl_max_interval_hours
+        return min(
+            config.recrawl_max_interval_hours,
+            max(config.recrawl_min_interval_hours, 1.0 / rate),
+        )
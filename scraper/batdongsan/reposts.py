@@ -0,0 +1,425 @@
+"""
+Repost detection
+Brokers repost the same property under a new listing id with the same
+photos. Stored images get a 64-bit perceptual hash (DCT pHash, computed in
+batches across processes) and go into a Hamming-distance index; a listing
+sharing enough near-identical photos with an earlier one is flagged
+"""
+
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .canonical import listing_key
+from .config import BatDongSanConfig
+from .jsonfiles import iter_json_array
+from .logger import setup_logger
+
+
+HASH_SIZE = 8
+IMAGE_SIZE = 32
+
+# Hashes with fewer/more set bits come from flat images (placeholders,
+# logos, blank renders) that every listing would match
+MIN_HASH_BITS = 8
+MAX_HASH_BITS = 64 - MIN_HASH_BITS
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    return np.cos(np.pi * k * (2 * x + 1) / (2 * n)).astype(np.float32)
+
+
+_DCT = _dct_matrix(IMAGE_SIZE)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    bits = np.unpackbits(np.ascontiguousarray(values).view(np.uint8).reshape(len(values), -1), axis=1)
+    return bits.sum(axis=1)
+
+
+def phash_batch(pixels: np.ndarray) -> np.ndarray:
+    """
+    pHash of N grayscale 32x32 images at once, same bits as imagehash.phash
+
+    2-D DCT as two matrix products, the top-left 8x8 low frequencies
+    thresholded at their median, packed row-major into one uint64
+
+    Args:
+        pixels: (N, 32, 32) array
+
+    Returns:
+        (N,) uint64
+    """
+    pixels = np.asarray(pixels, dtype=np.float32)
+    coeffs = _DCT @ pixels @ _DCT.T
+    low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(len(pixels), HASH_SIZE * HASH_SIZE)
+    bits = low > np.median(low, axis=1, keepdims=True)
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def _require_pillow() -> None:
+    try:
+        import PIL  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Pillow is required to decode images for repost detection: pip install Pillow") from e
+
+
+def _load_pixels(paths: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode to 32x32 grayscale; returns (pixels, mask of files that decoded)"""
+    from PIL import Image
+
+    pixels = np.zeros((len(paths), IMAGE_SIZE, IMAGE_SIZE), dtype=np.float32)
+    ok = np.zeros(len(paths), dtype=bool)
+    for i, path in enumerate(paths):
+        try:
+            with Image.open(path) as image:
+                image.draft("L", (IMAGE_SIZE * 2, IMAGE_SIZE * 2))  # JPEG: decode at reduced scale
+                gray = image.convert("L").resize((IMAGE_SIZE, IMAGE_SIZE), Image.LANCZOS)
+                pixels[i] = np.asarray(gray, dtype=np.float32)
+            ok[i] = True
+        except Exception:
+            continue
+    return pixels, ok
+
+
+def _hash_chunk(paths: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    pixels, ok = _load_pixels(paths)
+    return phash_batch(pixels), ok
+
+
+def hash_files(paths: List[str], processes: Optional[int] = None, chunk_size: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    pHash image files, `chunk_size` files per task across `processes`
+    worker processes (decoding dominates; 1 = in this process)
+
+    Returns:
+        (hashes uint64, mask of files that decoded)
+    """
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    if not chunks:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+
+    # Checked here: a decode failure per file is skipped silently
+    _require_pillow()
+
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or len(chunks) == 1:
+        results = [_hash_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as executor:
+            results = list(executor.map(_hash_chunk, chunks))
+
+    return (
+        np.concatenate([hashes for hashes, _ in results]),
+        np.concatenate([ok for _, ok in results]),
+    )
+
+
+class _Segment:
+    """Immutable multi-index over a slice of the hashes: per 16-bit chunk, the chunk values sorted"""
+
+    def __init__(self, hashes: np.ndarray, owners: np.ndarray, chunks: int):
+        self.hashes = hashes
+        self.owners = owners
+        self.bits = 64 // chunks
+        self.order = []
+        self.keys = []
+        for j in range(chunks):
+            values = ((hashes >> np.uint64(j * self.bits)) & np.uint64((1 << self.bits) - 1)).astype(np.uint16)
+            order = np.argsort(values, kind="stable")
+            self.order.append(order)
+            self.keys.append(values[order])
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def candidates(self, queries: np.ndarray, masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(query index, position) pairs whose chunk j is within the masks' flips of the query's chunk j"""
+        query_idx, positions = [], []
+        for j, (keys, order) in enumerate(zip(self.keys, self.order)):
+            values = ((queries >> np.uint64(j * self.bits)) & np.uint64((1 << self.bits) - 1)).astype(np.uint16)
+            probes = (values[:, None] ^ masks[None, :]).ravel()
+            lo = np.searchsorted(keys, probes, side="left")
+            hi = np.searchsorted(keys, probes, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if not total:
+                continue
+            starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            positions.append(order[starts + np.arange(total)])
+            query_idx.append(np.repeat(np.repeat(np.arange(len(queries)), len(masks)), counts))
+        if not positions:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(query_idx), np.concatenate(positions)
+
+
+class HammingIndex:
+    """
+    Nearest-neighbour search over 64-bit hashes by Hamming distance
+
+    Multi-index hashing: a hash within `radius` bits of the query agrees
+    with it to within radius // chunks bits on at least one of the `chunks`
+    16-bit chunks, so each chunk is looked up (with those few bit flips) in
+    a sorted array and only the candidates are compared in full. Added
+    batches become segments that are merged as they grow, keeping both
+    insertion and lookup logarithmic.
+    """
+
+    def __init__(self, radius: int = 6, chunks: int = 4):
+        if 64 % chunks:
+            raise ValueError(f"64 bits do not split into {chunks} chunks")
+        self.radius = radius
+        self.chunks = chunks
+        flips = radius // chunks
+        bits = 64 // chunks
+        self._masks = np.array(
+            [sum(1 << b for b in combo) for n in range(flips + 1) for combo in combinations(range(bits), n)],
+            dtype=np.uint16,
+        )
+        self._segments: List[_Segment] = []
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments)
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return np.concatenate([s.hashes for s in self._segments] or [np.zeros(0, dtype=np.uint64)])
+
+    @property
+    def owners(self) -> np.ndarray:
+        return np.concatenate([s.owners for s in self._segments] or [np.zeros(0, dtype=np.int64)])
+
+    def add(self, hashes: np.ndarray, owners: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        self._segments.append(_Segment(np.asarray(hashes, np.uint64), np.asarray(owners, np.int64), self.chunks))
+        while len(self._segments) > 1 and 2 * len(self._segments[-1]) >= len(self._segments[-2]):
+            newer, older = self._segments.pop(), self._segments.pop()
+            self._segments.append(_Segment(
+                np.concatenate([older.hashes, newer.hashes]),
+                np.concatenate([older.owners, newer.owners]),
+                self.chunks,
+            ))
+
+    def query(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every indexed hash within `radius` bits of each query
+
+        Returns:
+            (query index, owner, distance) arrays, one entry per match
+        """
+        queries = np.asarray(queries, np.uint64)
+        found_query, found_owner, found_distance = [], [], []
+        for segment in self._segments:
+            query_idx, positions = segment.candidates(queries, self._masks)
+            if not len(positions):
+                continue
+            # A candidate can come up under several chunks
+            pairs = np.unique(query_idx.astype(np.int64) * len(segment) + positions)
+            query_idx, positions = pairs // len(segment), pairs % len(segment)
+            distance = _popcount(queries[query_idx] ^ segment.hashes[positions])
+            close = distance <= self.radius
+            found_query.append(query_idx[close])
+            found_owner.append(segment.owners[positions[close]])
+            found_distance.append(distance[close])
+        if not found_query:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(found_query), np.concatenate(found_owner), np.concatenate(found_distance)
+
+
+class RepostDetector:
+    """
+    Incremental repost flagging over the detail files and the image store
+
+    Listings are processed once, oldest detail file first, after their
+    images are downloaded. Each listing's image hashes are looked up in the
+    index before being added, and a listing with at least
+    config.repost_min_matches distinct photos matching one earlier listing
+    is flagged as a repost of that listing (or of the listing it reposts).
+
+    State in config.output_dir:
+        repost_index_file  hashes with their listing key, processed
+                           listings and pHash by image sha256 (.npz)
+        reposts_file       key -> {url, repost_of, matched_images,
+                           images, flagged_at}
+    """
+
+    def __init__(self, config: Optional[BatDongSanConfig] = None, processes: Optional[int] = None):
+        self.config = config or BatDongSanConfig()
+        self.processes = processes or self.config.repost_processes
+        self.logger = setup_logger(self.__class__.__name__)
+
+        self.index_path = os.path.join(self.config.output_dir, self.config.repost_index_file)
+        self.flags_path = os.path.join(self.config.output_dir, self.config.reposts_file)
+        self.index = HammingIndex(self.config.repost_hamming_radius)
+        self.listings: Set[int] = set()
+        self.sha_hashes: Dict[str, int] = {}
+        self.flags: Dict[str, Dict] = self._load_flags()
+        self._load_index()
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def update(self, sources: Optional[Iterable[str]] = None, batch_images: int = 4096) -> Dict:
+        """
+        Hash and index the listings not processed yet, flagging reposts
+
+        Args:
+            sources: Detail JSON files (default: all in config.output_dir)
+            batch_images: Images hashed per batch
+
+        Returns:
+            Counts (listings, images_hashed, flagged, indexed_images)
+        """
+        if sources is None:
+            pattern = self.config.details_file_pattern.format(date="*")
+            sources = sorted(glob.glob(os.path.join(self.config.output_dir, pattern)))
+
+        stored = self._stored_images()
+        stats = {"listings": 0, "images_hashed": 0, "flagged": 0}
+        batch: List[Tuple[int, Dict, List[str]]] = []
+        batch_size = 0
+        pending: Set[int] = set()
+
+        for source in sources:
+            for record in iter_json_array(source):
+                key = listing_key(record.get("url") or "")
+                if key is None or key in self.listings or key in pending:
+                    continue
+                entries = [stored[url] for url in record.get("images") or () if url in stored]
+                if not entries:
+                    continue  # images not downloaded yet: try again next time
+                batch.append((key, record, entries))
+                pending.add(key)
+                batch_size += len(entries)
+                if batch_size >= batch_images:
+                    self._process(batch, stats)
+                    batch, batch_size = [], 0
+
+        if batch:
+            self._process(batch, stats)
+
+        self._save()
+        stats["indexed_images"] = len(self.index)
+        self.logger.info(
+            f"Reposts: {stats['listings']} listings indexed, {stats['images_hashed']} images hashed, "
+            f"{stats['flagged']} flagged ({len(self.flags)} total)"
+        )
+        return stats
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    def _process(self, batch: List[Tuple[int, Dict, List[str]]], stats: Dict) -> None:
+        # One pHash per distinct file: the store is content-addressed
+        todo = {sha: path for _, _, entries in batch for sha, path in entries if sha not in self.sha_hashes}
+        if todo:
+            paths = [os.path.join(self.config.images_dir, path) for path in todo.values()]
+            hashes, ok = hash_files(paths, self.processes)
+            for sha, value, decoded in zip(todo, hashes.tolist(), ok.tolist()):
+                if decoded:
+                    self.sha_hashes[sha] = value
+            stats["images_hashed"] += int(ok.sum())
+
+        for key, record, entries in batch:
+            values = sorted({self.sha_hashes[sha] for sha, _ in entries if sha in self.sha_hashes})
+            hashes = np.array(values, dtype=np.uint64)
+            hashes = hashes[(_popcount(hashes) >= MIN_HASH_BITS) & (_popcount(hashes) <= MAX_HASH_BITS)]
+
+            if len(hashes):
+                self._check(key, record, hashes, stats)
+                self.index.add(hashes, np.full(len(hashes), key, dtype=np.int64))
+            self.listings.add(key)
+            stats["listings"] += 1
+
+    def _check(self, key: int, record: Dict, hashes: np.ndarray, stats: Dict) -> None:
+        query_idx, owners, _ = self.index.query(hashes)
+        other = owners != key
+        if not other.any():
+            return
+
+        # Distinct photos of this listing matching each earlier listing
+        pairs = np.unique(np.stack([owners[other], query_idx[other]]), axis=1)
+        candidates, counts = np.unique(pairs[0], return_counts=True)
+        best = int(np.argmax(counts))
+        if counts[best] < self.config.repost_min_matches:
+            return
+
+        original = str(int(candidates[best]))
+        original = self.flags.get(original, {}).get("repost_of", original)
+        self.flags[str(key)] = {
+            "url": record.get("url"),
+            "repost_of": original,
+            "matched_images": int(counts[best]),
+            "images": len(hashes),
+            "flagged_at": datetime.now().isoformat(),
+        }
+        stats["flagged"] += 1
+
+    def _stored_images(self) -> Dict[str, Tuple[str, str]]:
+        """Image URL -> (sha256, path) of every downloaded image"""
+        stored = {}
+        path = os.path.join(self.config.images_dir, self.config.image_manifest_file)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("status") == "ok":
+                        stored[entry["url"]] = (entry["sha256"], entry["path"])
+                    else:
+                        stored.pop(entry.get("url"), None)
+        except FileNotFoundError:
+            self.logger.warning(f"No image manifest at {path} - run the images stage first")
+        return stored
+
+    def _load_flags(self) -> Dict[str, Dict]:
+        try:
+            with open(self.flags_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _load_index(self) -> None:
+        try:
+            with np.load(self.index_path) as state:
+                self.index.add(state["hashes"], state["owners"])
+                self.listings = set(state["listings"].tolist())
+                self.sha_hashes = dict(zip(state["shas"].astype(str).tolist(), state["sha_hashes"].tolist()))
+        except FileNotFoundError:
+            pass
+
+    def _save(self) -> None:
+        os.makedirs(self.config.output_dir, exist_ok=True)
+
+        tmp_path = f"{self.index_path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            hashes=self.index.hashes,
+            owners=self.index.owners,
+            listings=np.array(sorted(self.listings), dtype=np.int64),
+            shas=np.array(list(self.sha_hashes), dtype="S64"),
+            sha_hashes=np.array(list(self.sha_hashes.values()), dtype=np.uint64),
+        )
+        os.replace(tmp_path, self.index_path)
+
+        tmp_path = f"{self.flags_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.flags, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.flags_path)
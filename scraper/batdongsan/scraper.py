@@ -9,13 +9,33 @@ import json
 import time
 import random
 import re
+import hashlib
 import os
+import copy
 import logging
-from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, date, timedelta
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Optional, Set
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, date
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+from .bandwidth import BandwidthMeter, FetchStopped, accept_encoding, wire_bytes
+from .canonical import canonical_url, key_str, listing_key, url_key
+from .concurrency import ConcurrencyController
 from .config import BatDongSanConfig
+from .dates import PostDateParser
+from .ledger import FailureLedger
+from .logger import setup_logger
+from .metrics import PipelineMetrics
+from .priority import DetailPrioritizer, repost_keys
+from .recrawl import RecrawlScheduler
+from .ratelimit import HostRateLimiter
+from .singleflight import SingleFlight
+from .sitemap import as_utc, iter_sitemap, parse_lastmod
+from .streaming import MarkerCutoff, ResponseTooLarge
+from .tombstones import TombstoneStore, dead_reason, suspect_reason
+from .watchdog import FetchWatchdog
 
 
 class BatDongSanScraper:
@@ -24,24 +44,89 @@ class BatDongSanScraper:
     def __init__(self, config: Optional[BatDongSanConfig] = None):
         self.config = config or BatDongSanConfig()
         self.logger = self._setup_logger()
-        self.today = date.today()
+        self.date_parser = PostDateParser(reference=lambda: self.today)
+        self._today: Optional[date] = None
         
-    def _setup_logger(self) -> logging.Logger:
-        """Setup logger with console output"""
-        logger = logging.getLogger(self.__class__.__name__)
-        if logger.handlers:
-            return logger
-            
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%H:%M:%S'
+        # One session (connection pool) and one per-host budget for all workers
+        self.session = requests.Session()
+        self.session.headers.update(self.config.headers)
+        self.session.headers["Accept-Encoding"] = self.config.headers.get("Accept-Encoding") or accept_encoding()
+        self.rate_limiter = HostRateLimiter(self.config.host_rate_limit, self.config.host_burst)
+        self.prioritizer = DetailPrioritizer(self.config)
+        self.recrawl_scheduler = RecrawlScheduler(self.config)
+        self.tombstones = TombstoneStore(self.config)
+        self.ledger = FailureLedger(self.config)
+        
+        # Set by request_stop(): queued fetches are skipped, pending records saved
+        self._stop_event = threading.Event()
+        
+        # path -> ((mtime_ns, size), data) when config.keep_files_in_memory
+        self._file_cache: Dict[str, tuple] = {}
+        
+        # Concurrent fetches of the same page/listing share one request
+        self._inflight = SingleFlight()
+        
+        # Per-stage worker limits (fixed at max_workers unless auto-tuned)
+        self.concurrency = ConcurrencyController(self.config)
+        
+        # Bytes moved per stage/host and the per-run budget (reset by run_full_pipeline)
+        self.bandwidth = BandwidthMeter(
+            self.config.bandwidth_budget_bytes,
+            self.config.bandwidth_budget_action,
+            self.config.bandwidth_window_seconds,
         )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
         
-        return logger
+        # Total fetch deadline and hung-worker replacement
+        self.watchdog = FetchWatchdog(
+            self.config.request_deadline,
+            self.config.watchdog_stuck_seconds,
+            path=os.path.join(self.config.output_dir, self.config.watchdog_file),
+            on_stuck=lambda stage: self.metrics.count(stage, "hung"),
+        ).start()
+        
+        # Per-stage timings and counters (reset by run_full_pipeline)
+        self.metrics = PipelineMetrics()
+        self.metrics_server = None
+        if self.config.metrics_port is not None:
+            from .metrics_server import MetricsServer
+            self.metrics_server = MetricsServer(
+                self, self.config.metrics_host, self.config.metrics_port
+            ).start()
+
+    @property
+    def today(self) -> date:
+        """Reference date for filtering - follows the clock unless pinned"""
+        return self._today or date.today()
+
+    @today.setter
+    def today(self, value: Optional[date]) -> None:
+        self._today = value
+        
+    def request_stop(self) -> None:
+        """Finish in-flight fetches, skip queued ones and let crawls save"""
+        self._stop_event.set()
+    
+    @property
+    def stopping(self) -> bool:
+        return self._stop_event.is_set()
+    
+    def close(self) -> None:
+        """Stop the watchdog and metrics threads and close the connection pool"""
+        self.watchdog.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        self.session.close()
+    
+    def __enter__(self) -> "BatDongSanScraper":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _setup_logger(self) -> logging.Logger:
+        """Setup logger with console output"""
+        return setup_logger(self.__class__.__name__)
     
     # ========================================================================
     # PUBLIC API - LISTING CRAWLING
@@ -52,41 +137,59 @@ class BatDongSanScraper:
         start_page: int = 1, 
         end_page: int = 50, 
         resume: bool = True,
-        only_today: bool = True
+        only_today: bool = True,
+        roots: Optional[List[str]] = None
     ) -> List[Dict]:
         """
         Crawl listing pages to collect property URLs
         
+        Pages of every listing root are crawled by one worker pool under the
+        shared per-host rate budget and merged into one deduplicated links file.
+        
         Args:
             start_page: Starting page number (1-based)
             end_page: Ending page number (inclusive)
             resume: If True, skip URLs that already exist in file
             only_today: If True, only collect listings posted today
+            roots: Listing roots to crawl (default: config.listing_roots)
             
         Returns:
-            List of newly collected URL dictionaries (today only)
+            List of newly collected URL dictionaries (today only). In card
+            mode, existing URLs whose card changed are returned too
         """
-        self.logger.info(f"Starting listings crawl: pages {start_page}-{end_page}")
+        roots = roots or self.config.listing_roots
+        self.logger.info(
+            f"Starting listings crawl: pages {start_page}-{end_page} "
+            f"x {len(roots)} root(s)"
+        )
         if only_today:
             self.logger.info(f"Filter: Only listings from {self.today}")
         
         links_path = self._get_filepath(self.config.links_file)
         
         existing_data = []
-        crawled_urls = set()
+        seen_keys = set()
         
         if resume and os.path.exists(links_path):
             existing_data = self._load_json(links_path)
-            crawled_urls = {item["url"] for item in existing_data if "url" in item}
-            self.logger.info(f"Loaded {len(crawled_urls)} existing URLs")
+            seen_keys = {url_key(item["url"]) for item in existing_data if "url" in item}
+            self.logger.info(f"Loaded {len(seen_keys)} existing URLs")
+        
+        # Card mode: index existing records so changed cards can be updated
+        existing_by_key = {}
+        if self.config.card_mode:
+            existing_by_key = {url_key(item["url"]): item for item in existing_data if "url" in item}
         
         all_results = []
+        changed_items = []
         found_old_post = False
         
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=self.concurrency.pool_size("listing")) as executor:
+            # Interleave roots so every section advances at the same pace
             futures = {
-                executor.submit(self._crawl_single_listing_page, page, only_today): page
+                self._submit(executor, "listing", self._crawl_single_listing_page, page, only_today, root): page
                 for page in range(start_page, end_page + 1)
+                for root in roots
             }
             
             for future in as_completed(futures):
@@ -94,13 +197,21 @@ class BatDongSanScraper:
                 try:
                     page_data, has_old_posts = future.result()
                     
-                    new_items = [
-                        item for item in page_data 
-                        if item["url"] not in crawled_urls
-                    ]
+                    new_items = []
+                    with self.metrics.timer("listing", "dedupe"):
+                        for item in page_data:
+                            key = url_key(item["url"])
+                            if key in seen_keys or item["url"] in self.tombstones:
+                                continue
+                            seen_keys.add(key)
+                            new_items.append(item)
                     
                     all_results.extend(new_items)
-                    crawled_urls.update(item["url"] for item in new_items)
+                    
+                    if existing_by_key:
+                        changed_items.extend(
+                            self._update_changed_cards(page_data, existing_by_key)
+                        )
                     
                     if has_old_posts and only_today:
                         found_old_post = True
@@ -108,20 +219,154 @@ class BatDongSanScraper:
                 except Exception as e:
                     self.logger.error(f"[Page {page}] Failed: {e}")
         
-        if all_results:
+        self.ledger.save()
+        self.concurrency.save()
+        
+        if all_results or changed_items:
             combined_data = existing_data + all_results
-            self._save_json(combined_data, links_path)
+            with self.metrics.timer("listing", "save"):
+                self._save_json(combined_data, links_path)
             self.logger.info(
                 f"Collected {len(all_results)} new URLs (today) | "
                 f"Total: {len(combined_data)}"
             )
+            if changed_items:
+                self.logger.info(f"Cards changed since last seen: {len(changed_items)}")
         else:
             self.logger.info("No new URLs found today")
         
+        if self.config.card_mode:
+            pending = sum(1 for item in all_results + changed_items if item.get("needs_detail"))
+            self.logger.info(
+                f"Card mode: {pending}/{len(all_results) + len(changed_items)} "
+                f"URLs still need a detail fetch"
+            )
+        
         if found_old_post and only_today:
             self.logger.info("Found old posts - stopping crawl (reached yesterday's listings)")
         
-        return all_results
+        return all_results + changed_items
+    
+    # ========================================================================
+    # PUBLIC API - SITEMAP DISCOVERY
+    # ========================================================================
+    
+    def discover_from_sitemaps(
+        self,
+        sitemap_url: Optional[str] = None,
+        since: Optional[datetime] = None,
+        resume: bool = True
+    ) -> List[Dict]:
+        """
+        Collect listing URLs from the XML sitemaps instead of listing pages
+        
+        Sitemap indexes are followed recursively. Only entries whose lastmod
+        is newer than the high-water mark are kept; the mark is advanced
+        after a run without errors. Sitemaps are fetched like pages: shared
+        session, per-host rate budget, fetch deadline and bandwidth budget.
+        
+        Args:
+            sitemap_url: Root sitemap or sitemap index (default: config.sitemap_url)
+            since: Override the stored high-water mark (naive = UTC)
+            resume: If True, skip URLs that already exist in the links file
+            
+        Returns:
+            List of newly collected URL dictionaries
+        """
+        sitemap_url = sitemap_url or self.config.sitemap_url
+        links_path = self._get_filepath(self.config.links_file)
+        state_path = self._get_filepath(self.config.sitemap_state_file)
+        
+        state = (self._load_json(state_path) or {}) if os.path.exists(state_path) else {}
+        high_water = as_utc(since) or parse_lastmod(state.get("high_water"))
+        self.logger.info(f"Sitemap discovery from {sitemap_url} (since: {high_water})")
+        
+        existing_data = []
+        seen_keys = set()
+        
+        if resume and os.path.exists(links_path):
+            existing_data = self._load_json(links_path)
+            seen_keys = {url_key(item["url"]) for item in existing_data if "url" in item}
+            self.logger.info(f"Loaded {len(seen_keys)} existing URLs")
+        
+        listing_re = re.compile(self.config.sitemap_listing_pattern)
+        stats = {"bytes": 0}
+        pending = [sitemap_url]
+        sitemaps_read = 0
+        failed = False
+        newest = high_water
+        new_items = []
+        
+        def is_new(lastmod: Optional[datetime]) -> bool:
+            return high_water is None or lastmod is None or lastmod > high_water
+        
+        while pending:
+            if self.stopping or self.bandwidth.exhausted:
+                failed = True
+                break
+            url = pending.pop()
+            sitemap_stats = {}
+            try:
+                for entry in iter_sitemap(url, stats=sitemap_stats, open_url=self._open_sitemap):
+                    if entry.kind == "sitemap":
+                        if is_new(entry.lastmod):
+                            pending.append(entry.loc)
+                        continue
+                    
+                    if entry.lastmod and (newest is None or entry.lastmod > newest):
+                        newest = entry.lastmod
+                    
+                    key = url_key(entry.loc)
+                    if not is_new(entry.lastmod) or key in seen_keys:
+                        continue
+                    if entry.loc in self.tombstones:
+                        continue
+                    if not listing_re.search(entry.loc):
+                        continue
+                    
+                    seen_keys.add(key)
+                    new_items.append({
+                        "url": entry.loc,
+                        "source": "sitemap",
+                        "lastmod": entry.lastmod.isoformat() if entry.lastmod else None,
+                        "collected_at": datetime.now().isoformat()
+                    })
+                sitemaps_read += 1
+            except Exception as e:
+                failed = True
+                self.logger.error(f"[SITEMAP] Error for {url}: {e}")
+            finally:
+                wire = sitemap_stats.get("bytes", 0)
+                decoded = sitemap_stats.get("decoded_bytes", 0)
+                if wire:
+                    self.bandwidth.record("sitemap", url, wire, decoded)
+                    self.metrics.count("sitemap", "bytes", decoded)
+                    self.metrics.count("sitemap", "wire_bytes", wire)
+                stats["bytes"] += wire
+        
+        if new_items:
+            combined_data = existing_data + new_items
+            self._save_json(combined_data, links_path)
+            self.logger.info(
+                f"Collected {len(new_items)} new URLs from sitemaps | "
+                f"Total: {len(combined_data)}"
+            )
+        else:
+            self.logger.info("No new URLs found in sitemaps")
+        
+        self.logger.info(f"Read {sitemaps_read} sitemaps ({stats['bytes'] / 1024:.1f} KB)")
+        
+        if failed:
+            self.logger.warning("Sitemap errors - high-water mark not advanced")
+        elif newest and newest != high_water:
+            self._save_json({"high_water": newest.isoformat()}, state_path)
+        
+        return new_items
+    
+    @contextmanager
+    def _open_sitemap(self, url: str) -> Iterator[requests.Response]:
+        with self._stream(url, "sitemap") as (response, _):
+            yield response
     
     # ========================================================================
     # PUBLIC API - DETAIL CRAWLING
@@ -130,14 +375,21 @@ class BatDongSanScraper:
     def crawl_details(
         self, 
         urls: Optional[List[str]] = None, 
-        resume: bool = True
+        resume: bool = True,
+        max_requests: Optional[int] = None
     ) -> List[Dict]:
         """
         Crawl detail pages for property information
         
+        With config.detail_priority, URLs are fetched highest priority first
+        (see DetailPrioritizer).
+        
         Args:
             urls: List of URLs to crawl. If None, loads from links file
-            resume: If True, skip URLs already in details file
+                (skipping card-mode records marked needs_detail=False)
+            resume: If True, skip URLs already in details file, unless
+                their card changed after that fetch (card mode)
+            max_requests: Request budget - only this many URLs are fetched
             
         Returns:
             List of newly crawled property detail dictionaries
@@ -145,9 +397,13 @@ class BatDongSanScraper:
         links_path = self._get_filepath(self.config.links_file)
         details_path = self._get_filepath(self.config.details_file)
 
+        raw_data = None
         if urls is None:
             raw_data = self._load_json(links_path)
-            urls = [item["url"] for item in raw_data if "url" in item]
+            urls = [
+                item["url"] for item in raw_data
+                if "url" in item and item.get("needs_detail", True)
+            ]
         
         if not urls:
             self.logger.warning("No URLs to crawl!")
@@ -156,14 +412,48 @@ class BatDongSanScraper:
         self.logger.info(f"Total URLs available: {len(urls)}")
         
         existing_data = []
-        crawled_urls = set()
+        crawled_keys = set()
         
         if resume and os.path.exists(details_path):
             existing_data = self._load_json(details_path)
-            crawled_urls = {item["url"] for item in existing_data if "url" in item}
-            self.logger.info(f"Already crawled: {len(crawled_urls)} URLs")
+            crawled_keys = {url_key(item["url"]) for item in existing_data if "url" in item}
+            self.logger.info(f"Already crawled: {len(crawled_keys)} URLs")
+            
+            # Cards that changed after their detail fetch need a new one
+            if self.config.card_mode and crawled_keys:
+                if raw_data is None:
+                    raw_data = self._load_json(links_path)
+                stale_keys = self._changed_since_crawled(raw_data, existing_data)
+                if stale_keys:
+                    crawled_keys -= stale_keys
+                    self.logger.info(f"Cards changed since their detail fetch: {len(stale_keys)}")
 
-        urls_to_crawl = [url for url in urls if url not in crawled_urls]
+        dedupe_start = time.perf_counter()
+        
+        # One fetch per listing even if `urls` repeats it
+        unique_urls = {}
+        for url in urls:
+            key = url_key(url)
+            if key not in crawled_keys:
+                unique_urls.setdefault(key, url)
+        urls_to_crawl = self.tombstones.filter_alive(unique_urls.values())
+        
+        if self.config.detail_priority and urls_to_crawl:
+            if raw_data is None:
+                raw_data = self._load_json(links_path)
+            records = {url_key(item["url"]): item for item in raw_data if "url" in item}
+            crawled_before = self.prioritizer.crawled_before()
+            self.prioritizer.mark_crawled(crawled_keys)
+            urls_to_crawl = self.prioritizer.order(
+                urls_to_crawl,
+                records,
+                crawled_before,
+                limit=max_requests,
+            )
+        elif max_requests is not None:
+            urls_to_crawl = urls_to_crawl[:max_requests]
+        
+        self.metrics.observe("detail", "dedupe", time.perf_counter() - dedupe_start)
         self.logger.info(f"URLs to crawl: {len(urls_to_crawl)}")
         
         if not urls_to_crawl:
@@ -173,9 +463,9 @@ class BatDongSanScraper:
         new_details = []
         total = len(urls_to_crawl)
         
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=self.concurrency.pool_size("detail")) as executor:
             futures = [
-                executor.submit(self._crawl_single_detail_page, url) 
+                self._submit(executor, "detail", self._crawl_single_detail_page, url)
                 for url in urls_to_crawl
             ]
 
@@ -194,107 +484,418 @@ class BatDongSanScraper:
                 except Exception as e:
                     self.logger.error(f"Future error: {e}")
         
+        self.tombstones.save()
+        self.ledger.save()
+        self.concurrency.save()
+        
         if new_details:
-            all_details = existing_data + new_details
-            self._save_json(all_details, details_path)
+            # A re-fetched listing replaces its older record
+            new_keys = {url_key(item["url"]) for item in new_details if "url" in item}
+            all_details = [
+                item for item in existing_data
+                if "url" not in item or url_key(item["url"]) not in new_keys
+            ] + new_details
+            with self.metrics.timer("detail", "save"):
+                self._save_json(all_details, details_path)
             self.logger.info(
                 f"Crawled {len(new_details)} new details | "
                 f"Total: {len(all_details)}"
             )
+            self.prioritizer.mark_crawled(
+                url_key(item["url"]) for item in new_details if "url" in item
+            )
+            
+            if self.config.recrawl_tracking:
+                self.recrawl_scheduler.observe_many(new_details)
+                self.recrawl_scheduler.save()
         else:
             self.logger.warning("No new details collected")
         
         return new_details
     
+    # ========================================================================
+    # PUBLIC API - RECRAWL
+    # ========================================================================
+    
+    def recrawl(self, max_requests: Optional[int] = None) -> List[Dict]:
+        """
+        Revisit listings whose scheduled next visit has passed
+        
+        Visits feed the change history in RecrawlScheduler, which moves
+        frequently changing listings to shorter revisit intervals. Changed
+        records are appended to the changes file.
+        
+        Args:
+            max_requests: Request budget (most overdue URLs first)
+            
+        Returns:
+            List of detail dictionaries that changed since the last visit
+        """
+        reposts = repost_keys(self.config) if self.config.repost_skip_recrawl else set()
+        for url in self.recrawl_scheduler.due():
+            if url in self.tombstones or key_str(url) in reposts:
+                self.recrawl_scheduler.forget(url)
+        
+        due_urls = self.recrawl_scheduler.due(limit=max_requests)
+        self.logger.info(
+            f"Recrawl: {len(due_urls)} due of {len(self.recrawl_scheduler)} tracked listings"
+        )
+        if not due_urls:
+            return []
+        
+        changed = []
+        visited = 0
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency.pool_size("detail")) as executor:
+            futures = {
+                self._submit(executor, "detail", self._crawl_single_detail_page, url): url
+                for url in due_urls
+            }
+            
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    self.logger.error(f"[RECRAWL] Error for {url}: {e}")
+                    data = None
+                
+                if url in self.tombstones:
+                    self.recrawl_scheduler.forget(url)
+                    continue
+                
+                if not data:
+                    # Back off, or a few failing listings take the whole budget
+                    # every run (skipped fetches after a stop are not failures)
+                    if not (self.stopping or self.bandwidth.exhausted):
+                        self.recrawl_scheduler.observe_failure(url)
+                    continue
+                
+                visited += 1
+                if self.recrawl_scheduler.observe(url, data):
+                    changed.append(data)
+        
+        self.recrawl_scheduler.save()
+        self.tombstones.save()
+        self.ledger.save()
+        
+        if changed:
+            changes_path = self._get_filepath(self.config.changes_file)
+            self._save_json(self._load_json(changes_path) + changed, changes_path)
+        
+        self.logger.info(f"Recrawl: {visited}/{len(due_urls)} visited, {len(changed)} changed")
+        return changed
+    
+    # ========================================================================
+    # PUBLIC API - FAILURE RECOVERY
+    # ========================================================================
+    
+    def retry_failures(self, stage: Optional[str] = None) -> Dict:
+        """
+        Retry only the fetches recorded in the failure ledger
+        
+        Entries are retried once their exponential backoff has elapsed
+        (retry_backoff_seconds * 2 ** (attempts - 1)) and until
+        retry_max_attempts is reached. Recovered listing items and details
+        are appended to today's links/details files.
+        
+        Args:
+            stage: "listing", "detail" or None for both
+            
+        Returns:
+            Counts of retried, recovered and still failing entries
+        """
+        due = self.ledger.due(stage)
+        self.logger.info(f"Retrying {len(due)} of {len(self.ledger)} failed fetches")
+        
+        new_links = []
+        new_details = []
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency.pool_size("listing", "detail")) as executor:
+            futures = {}
+            for entry in due:
+                if entry["stage"] == "listing":
+                    future = self._submit(
+                        executor, "listing", self._crawl_single_listing_page,
+                        entry.get("page", 1), entry.get("only_today", True), entry.get("root")
+                    )
+                else:
+                    future = self._submit(executor, "detail", self._crawl_single_detail_page, entry["url"])
+                futures[future] = entry
+            
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.logger.error(f"[RETRY] Error for {entry['url']}: {e}")
+                    continue
+                
+                if entry["stage"] == "listing":
+                    new_links.extend(result[0])
+                elif result:
+                    new_details.append(result)
+        
+        if new_links:
+            links_path = self._get_filepath(self.config.links_file)
+            existing = self._load_json(links_path)
+            known = {url_key(item["url"]) for item in existing if "url" in item}
+            new_links = [
+                item for key, item in {url_key(item["url"]): item for item in new_links}.items()
+                if key not in known
+            ]
+            if new_links:
+                self._save_json(existing + new_links, links_path)
+        
+        if new_details:
+            details_path = self._get_filepath(self.config.details_file)
+            self._save_json(self._load_json(details_path) + new_details, details_path)
+            self.prioritizer.mark_crawled(
+                url_key(item["url"]) for item in new_details if "url" in item
+            )
+            if self.config.recrawl_tracking:
+                self.recrawl_scheduler.observe_many(new_details)
+                self.recrawl_scheduler.save()
+        
+        self.tombstones.save()
+        self.ledger.save()
+        
+        still_failing = {(entry["stage"], entry["url"]) for entry in self.ledger.entries(stage)}
+        recovered = sum(1 for entry in due if (entry["stage"], entry["url"]) not in still_failing)
+        self.logger.info(
+            f"Retry done: {recovered}/{len(due)} recovered | "
+            f"{len(still_failing)} still in ledger"
+        )
+        
+        return {
+            "retried": len(due),
+            "recovered": recovered,
+            "new_links": len(new_links),
+            "new_details": len(new_details),
+            "remaining": len(still_failing),
+        }
+    
     # ========================================================================
     # PRIVATE - LISTING PAGE CRAWLING
     # ========================================================================
     
-    def _crawl_single_listing_page(self, page: int, only_today: bool = True) -> tuple:
+    def _crawl_single_listing_page(
+        self,
+        page: int,
+        only_today: bool = True,
+        root: Optional[str] = None
+    ) -> tuple:
+        """Crawl one listing page (concurrent calls for the same page share one fetch)"""
+        root = root or self.config.base_url
+        key = ("listing", url_key(self._listing_page_url(root, page)), only_today)
+        items, has_old_posts = self._inflight.do(
+            key, self._crawl_listing_page_once, page, only_today, root
+        )
+        return copy.deepcopy(items), has_old_posts
+    
+    def _crawl_listing_page_once(
+        self,
+        page: int,
+        only_today: bool = True,
+        root: Optional[str] = None
+    ) -> tuple:
         """
         Crawl a single listing page
         
         Args:
             page: Page number (1-based)
             only_today: If True, only collect today's listings
+            root: Listing root URL (default: config.base_url)
             
         Returns:
             Tuple of (list of items, has_old_posts flag)
         """
-        if page == 1:
-            url = f"{self.config.base_url}?sortValue=1"
-        else:
-            url = f"{self.config.base_url}/p{page}?sortValue=1"
+        if self.stopping or self.bandwidth.exhausted:
+            return [], False
+        
+        root = root or self.config.base_url
+        url = self._listing_page_url(root, page)
+        tag = f"[Page {page}]" if root == self.config.base_url else f"[{urlsplit(root).path} p{page}]"
         
-        self.logger.debug(f"[Page {page}] Requesting {url}")
+        self.logger.debug(f"{tag} Requesting {url}")
         
         try:
-            response = requests.get(
-                url, 
-                headers=self.config.headers,
-                timeout=self.config.request_timeout
-            )
+            response = self._fetch(url, "listing")
             
             if response.status_code != 200:
-                self.logger.warning(f"[Page {page}] HTTP {response.status_code}")
+                self.logger.warning(f"{tag} HTTP {response.status_code}")
+                self.ledger.record_failure(
+                    "listing", url, "HTTPError", response.status_code,
+                    root=root, page=page, only_today=only_today
+                )
                 return [], False
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            parse_start = time.perf_counter()
+            soup = BeautifulSoup(response.text, self.config.html_parser)
             items = []
             has_old_posts = False
+            today = self.today
             
             # FIXED: Find <a class="card-cm"> directly (not div.card-container)
-            cards = soup.find_all("a", class_="card-cm")
+            # Card itself is <a> tag, get href directly
+            cards = [
+                card for card in soup.find_all("a", class_="card-cm")
+                if (card.get("href") or "").startswith("http")
+            ]
             
-            for card in cards:
-                # Card itself is <a> tag, get href directly
-                href = card.get("href")
-                if not href or not href.startswith("http"):
-                    continue
-                
-                # Extract post date
-                post_date_str = self._extract_post_date(card)
-                post_date = self._parse_post_date(post_date_str)
-                
+            # Extract and parse post dates for the whole page at once
+            post_date_strs = [self._extract_post_date(card) for card in cards]
+            post_dates = self.date_parser.parse_many(post_date_strs, today)
+            
+            for card, post_date_str, post_date in zip(cards, post_date_strs, post_dates):
                 # Filter by date if only_today=True
                 if only_today:
                     if post_date is None:
                         self.logger.debug(f"Could not parse date: '{post_date_str}'")
                         continue
                     
-                    if post_date < self.today:
+                    if post_date < today:
                         has_old_posts = True
-                        self.logger.debug(f"[Page {page}] Old post: {post_date}")
+                        self.logger.debug(f"{tag} Old post: {post_date}")
                         continue
-                    elif post_date > self.today:
+                    elif post_date > today:
                         # Future date? Skip
                         continue
                 
                 # Add to results
-                items.append({
-                    "url": href,
+                item = {
+                    "url": card.get("href"),
+                    "root": root,
                     "page": page,
                     "post_date": post_date_str,
                     "parsed_date": str(post_date) if post_date else None,
                     "collected_at": datetime.now().isoformat()
-                })
+                }
+                
+                if self.config.card_mode:
+                    item.update(self._extract_card_fields(card))
+                
+                items.append(item)
+            
+            self.metrics.observe("listing", "parse", time.perf_counter() - parse_start)
+            self.metrics.count("listing", "pages")
             
             if only_today:
-                self.logger.info(f"[Page {page}] Found {len(items)} URLs (today only)")
+                self.logger.info(f"{tag} Found {len(items)} URLs (today only)")
             else:
-                self.logger.info(f"[Page {page}] Found {len(items)} URLs")
+                self.logger.info(f"{tag} Found {len(items)} URLs")
             
-            time.sleep(random.uniform(*self.config.page_delay))
+            self._polite_wait("listing", self.config.page_delay)
+            
+            self.ledger.resolve("listing", url)
             
             return items, has_old_posts
             
+        except FetchStopped:
+            return [], False
         except requests.exceptions.Timeout:
-            self.logger.error(f"[Page {page}] Request timeout")
+            self.logger.error(f"{tag} Request timeout")
+            self.ledger.record_failure("listing", url, "Timeout", root=root, page=page, only_today=only_today)
             return [], False
         except Exception as e:
-            self.logger.error(f"[Page {page}] Error: {e}")
+            self.logger.error(f"{tag} Error: {e}")
+            self.ledger.record_failure("listing", url, type(e).__name__, root=root, page=page, only_today=only_today)
             return [], False
     
+    def _listing_page_url(self, root: str, page: int) -> str:
+        """
+        Build the URL of a listing page
+        
+        "https://batdongsan.vn/ban-nha-dat", 2 -> ".../ban-nha-dat/p2?sortValue=1".
+        Query filters on the root are kept.
+        """
+        parts = urlsplit(root)
+        path = parts.path.rstrip("/")
+        if page > 1:
+            path = f"{path}/p{page}"
+        
+        query = parse_qsl(parts.query)
+        if not any(key == "sortValue" for key, _ in query):
+            query.append(("sortValue", "1"))
+        
+        return urlunsplit((parts.scheme, parts.netloc, path, urlencode(query), ""))
+    
+    def _extract_card_fields(self, card_soup: BeautifulSoup) -> Dict:
+        """
+        Extract the fields shown on a listing card (card mode)
+        
+        Args:
+            card_soup: BeautifulSoup of a single card (<a> tag)
+            
+        Returns:
+            Dict with the configured card fields, card_hash and needs_detail
+        """
+        fields = {}
+        for name, selector in self.config.card_selectors.items():
+            elem = card_soup.select_one(selector)
+            fields[name] = re.sub(r"\s+", " ", elem.get_text(" ", strip=True)) if elem else ""
+        
+        digest = hashlib.sha1(
+            "|".join(fields[name] for name in sorted(fields)).encode("utf-8")
+        ).hexdigest()
+        
+        fields["card_hash"] = digest[:16]
+        fields["needs_detail"] = not all(
+            fields.get(name) for name in self.config.card_required_fields
+        )
+        return fields
+    
+    def _update_changed_cards(self, page_data: List[Dict], existing_by_key: Dict) -> List[Dict]:
+        """
+        Update existing link records whose card content changed
+        
+        A changed card (e.g. new price) marks the record for a detail fetch.
+        
+        Returns:
+            The updated records
+        """
+        changed = []
+        for item in page_data:
+            previous = existing_by_key.get(url_key(item["url"]))
+            if previous is None or previous is item:
+                continue
+            
+            if previous.get("card_hash") == item.get("card_hash"):
+                continue
+            
+            # Records from a non-card run only get their card fields filled in
+            backfill = "card_hash" not in previous
+            
+            for key in self.config.card_selectors:
+                previous[key] = item.get(key, "")
+            previous["card_hash"] = item.get("card_hash")
+            if backfill:
+                previous["needs_detail"] = item.get("needs_detail", True)
+            else:
+                previous["card_changed_at"] = item["collected_at"]
+                previous["needs_detail"] = True
+            changed.append(previous)
+        
+        return changed
+    
+    def _changed_since_crawled(self, links: List[Dict], details: List[Dict]) -> Set:
+        """url_keys whose card changed after their latest detail record was crawled"""
+        crawled_at = {}
+        for item in details:
+            if "url" in item:
+                key = url_key(item["url"])
+                crawled_at[key] = max(crawled_at.get(key, ""), item.get("crawled_at") or "")
+        
+        stale = set()
+        for item in links:
+            changed_at = item.get("card_changed_at")
+            if not changed_at or "url" not in item:
+                continue
+            key = url_key(item["url"])
+            if key in crawled_at and changed_at > crawled_at[key]:
+                stale.add(key)
+        return stale
+    
     def _extract_post_date(self, card_soup: BeautifulSoup) -> str:
         """
         Extract post date from listing card
@@ -322,88 +923,231 @@ class BatDongSanScraper:
         Returns:
             date object or None if cannot parse
         """
-        if not date_str:
-            return None
-        
-        today = self.today
-        
-        # "Hôm nay"
-        if "hôm nay" in date_str.lower():
-            return today
-        
-        # "Hôm qua"
-        if "hôm qua" in date_str.lower():
-            return today - timedelta(days=1)
-        
-        # "X giờ trước" - still today
-        if re.search(r"\d+\s*giờ\s*trước", date_str, re.IGNORECASE):
-            return today
-        
-        # "X ngày trước"
-        match = re.search(r"(\d+)\s*ngày\s*trước", date_str, re.IGNORECASE)
-        if match:
-            days_ago = int(match.group(1))
-            return today - timedelta(days=days_ago)
-        
-        # "X tháng trước"
-        match = re.search(r"(\d+)\s*tháng\s*trước", date_str, re.IGNORECASE)
-        if match:
-            months_ago = int(match.group(1))
-            # Approximate: 1 month = 30 days
-            return today - timedelta(days=months_ago * 30)
-        
-        # "X năm trước"
-        match = re.search(r"(\d+)\s*năm\s*trước", date_str, re.IGNORECASE)
-        if match:
-            years_ago = int(match.group(1))
-            # Approximate: 1 year = 365 days
-            return today - timedelta(days=years_ago * 365)
-        
-        # "DD/MM/YYYY"
-        match = re.search(r"(\d{1,2})/(\d{1,2})/(\d{4})", date_str)
-        if match:
-            day, month, year = map(int, match.groups())
-            try:
-                return date(year, month, day)
-            except ValueError:
-                return None
-        
-        return None
+        return self.date_parser.parse(date_str, self.today)
     
     # ========================================================================
     # PRIVATE - DETAIL PAGE CRAWLING
     # ========================================================================
     
     def _crawl_single_detail_page(self, url: str) -> Optional[Dict]:
-        """Crawl a single detail page"""
+        """
+        Crawl a single detail page
+        
+        Concurrent calls for one listing share one fetch, whatever page or
+        URL spelling they came from: the key is the listing id (r<id>), or
+        the canonical URL for URLs without one. Every caller gets its own
+        deep copy, so nested detail_info/images are never shared.
+        """
+        key = listing_key(url)
+        data = self._inflight.do(
+            ("detail", key if key is not None else canonical_url(url)), self._crawl_detail_page_once, url
+        )
+        return copy.deepcopy(data)
+    
+    def _crawl_detail_page_once(self, url: str) -> Optional[Dict]:
+        if self.stopping or self.bandwidth.exhausted:
+            return None
+        
         try:
-            response = requests.get(
-                url,
-                headers=self.config.headers,
-                timeout=self.config.request_timeout
-            )
+            cutoff = None
+            if self.config.detail_stream_cutoff:
+                cutoff = MarkerCutoff(self.config.detail_cutoff_markers, self.config.detail_cutoff_margin)
+            response = self._fetch(url, "detail", cutoff)
             
             if response.status_code != 200:
+                if self._check_dead(url, response):
+                    return None
                 self.logger.warning(f"[DETAIL] HTTP {response.status_code} for {url}")
+                self.ledger.record_failure("detail", url, "HTTPError", response.status_code)
                 return None
             
-            soup = BeautifulSoup(response.text, "html.parser")
-            data = self._parse_detail_page(soup)
+            with self.metrics.timer("detail", "parse"):
+                soup = BeautifulSoup(response.text, self.config.html_parser)
+                data = self._parse_detail_page(soup)
+            
+            if self._check_dead(url, response):
+                return None
+            
+            suspect = suspect_reason(url, response.status_code, response.url, bool(response.history), data)
+            if suspect:
+                self._record_suspect(url, response, suspect)
+                return None
             
             data["url"] = url
             data["crawled_at"] = datetime.now().isoformat()
+            self.ledger.resolve("detail", url)
+            self.metrics.count("detail", "pages")
 
-            time.sleep(random.uniform(*self.config.detail_delay))
+            self._polite_wait("detail", self.config.detail_delay)
             
             return data
             
+        except FetchStopped:
+            return None
         except requests.exceptions.Timeout:
             self.logger.error(f"[DETAIL] Timeout for {url}")
+            self.ledger.record_failure("detail", url, "Timeout")
             return None
         except Exception as e:
             self.logger.error(f"[DETAIL] Error for {url}: {e}")
+            self.ledger.record_failure("detail", url, type(e).__name__)
             return None
     
+    def _check_dead(self, url: str, response: requests.Response) -> bool:
+        """Tombstone url if the response proves the listing was removed"""
+        reason = dead_reason(
+            response.status_code,
+            response.text if response.status_code == 200 else "",
+            self.config.soft_404_markers,
+        )
+        if reason is None:
+            return False
+        
+        self.tombstones.add(url, reason, response.status_code, response.url)
+        self.ledger.resolve("detail", url)
+        self.logger.info(f"[DETAIL] Listing removed ({reason}): {url}")
+        return True
+    
+    def _record_suspect(self, url: str, response: requests.Response, reason: str) -> None:
+        """
+        Maybe removed, maybe a login/anti-bot page: a ledger failure retried
+        by retry-failures, tombstoned once it stays suspect long enough
+        """
+        previous = self.ledger.get("detail", url) or {}
+        streak = previous.get("suspect_streak", 0) + 1
+        since = previous.get("suspect_since") or datetime.now().isoformat()
+        hours = (datetime.now() - datetime.fromisoformat(since)).total_seconds() / 3600
+        
+        if streak >= self.config.suspect_tombstone_after and hours >= self.config.suspect_tombstone_min_hours:
+            self.tombstones.add(url, f"repeated_{reason}", response.status_code, response.url)
+            self.ledger.resolve("detail", url)
+            self.logger.info(f"[DETAIL] Listing removed ({reason} {streak} times in {hours:.0f}h): {url}")
+            return
+        
+        self.logger.warning(f"[DETAIL] Suspicious response ({reason}): {url} -> {response.url}")
+        self.ledger.record_failure(
+            "detail", url, reason, response.status_code, suspect_streak=streak, suspect_since=since
+        )
+    
+    # ========================================================================
+    # PRIVATE - HTTP
+    # ========================================================================
+    
+    def _fetch(self, url: str, stage: str = "other", cutoff: Optional[MarkerCutoff] = None) -> requests.Response:
+        """
+        GET a URL through the shared session and per-host rate budget
+        
+        With a cutoff the download stops (and the connection is dropped)
+        once the cutoff has seen everything the parser needs
+        """
+        with self._stream(url, stage) as (response, watch):
+            self._read_body(response, watch, cutoff)
+        
+        wire = wire_bytes(response)
+        self.bandwidth.record(stage, url, wire, len(response.content))
+        self.metrics.count(stage, "bytes", len(response.content))
+        self.metrics.count(stage, "wire_bytes", wire)
+        if cutoff is not None and cutoff.cut_at is not None:
+            self.metrics.count(stage, "cutoff")
+        return response
+    
+    @contextmanager
+    def _stream(self, url: str, stage: str = "other") -> Iterator[tuple]:
+        """
+        Streaming GET under the shared session, per-host rate budget,
+        bandwidth budget and fetch deadline; the caller reads the body
+        inside the block and records its bytes with self.bandwidth
+        
+        Yields:
+            (response, watchdog entry)
+        
+        Raises:
+            FetchStopped: the run was stopped while waiting for budget
+        """
+        waited = self.bandwidth.wait(self._stop_event) + self.rate_limiter.acquire(url)
+        if waited:
+            self.metrics.observe(stage, "wait", waited)
+        if self.stopping:
+            raise FetchStopped(f"Run stopped before fetching {url}")
+        
+        metrics = self.metrics
+        tuner = self.concurrency[stage]
+        metrics.add_gauge(stage, "in_flight", 1)
+        try:
+            with metrics.timer(stage, "fetch"), self.watchdog.fetch(stage, url) as watch:
+                response = self.session.get(url, timeout=self.config.request_timeout, stream=True)
+                watch.response = response
+                try:
+                    yield response, watch
+                finally:
+                    response.close()
+        except requests.exceptions.RequestException:
+            if tuner:
+                tuner.record(False)
+            raise
+        finally:
+            metrics.add_gauge(stage, "in_flight", -1)
+        
+        status = response.status_code
+        if tuner and (status == 200 or status == 429 or status >= 500):
+            tuner.record(status == 200)
+        self.metrics.count(stage, f"status_{status}")
+    
+    def _read_body(self, response: requests.Response, watch, cutoff: Optional[MarkerCutoff] = None) -> None:
+        """
+        Download the body under the fetch deadline (the watchdog aborts
+        reads that block past it), the size limit and the early cut-off,
+        then release the connection
+        """
+        limit = self.config.max_body_bytes
+        length = response.headers.get("Content-Length", "")
+        if limit and length.isdigit() and int(length) > limit:
+            response.close()
+            raise ResponseTooLarge(f"Content-Length {length} > {limit} bytes: {response.url}")
+        
+        chunks = []
+        size = 0
+        complete = False
+        try:
+            for chunk in response.iter_content(16 * 1024 if cutoff else 64 * 1024):
+                keep = cutoff.feed(chunk) if cutoff else None
+                if keep is not None:
+                    chunks.append(chunk[:keep])
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+                if limit and size > limit:
+                    raise ResponseTooLarge(f"Body over {limit} bytes: {response.url}")
+                if watch.expired:
+                    break
+            else:
+                complete = True
+        finally:
+            if not complete:
+                # Unread body: drop the connection instead of draining it
+                response.close()
+        response._content = b"".join(chunks)
+        response._content_consumed = True
+        response.close()
+    
+    def _submit(self, executor: ThreadPoolExecutor, stage: str, fn, *args) -> Future:
+        """executor.submit that keeps the stage's queue-depth gauge and worker limit"""
+        metrics = self.metrics
+        metrics.add_gauge(stage, "queued", 1)
+        tuner = self.concurrency[stage]
+        
+        def run():
+            with tuner.slot() as release, self.watchdog.task(release):
+                metrics.add_gauge(stage, "queued", -1)
+                return fn(*args)
+        
+        return executor.submit(run)
+    
+    def _polite_wait(self, stage: str, delay: tuple) -> None:
+        """Random politeness delay, cut short by request_stop()"""
+        with self.metrics.timer(stage, "wait"):
+            self._stop_event.wait(random.uniform(*delay))
+    
     # ========================================================================
     # PRIVATE - HTML PARSING
     # ========================================================================
@@ -418,7 +1162,7 @@ class BatDongSanScraper:
 
             footer = soup.select_one("div.footer")
             if footer:
-                address_text = footer.find(text=True, recursive=False)
+                address_text = footer.find(string=True, recursive=False)
                 data["address"] = address_text.strip() if address_text else ""
                 
                 for box in footer.select("div.box-text"):
@@ -543,10 +1287,21 @@ class BatDongSanScraper:
         return os.path.join(self.config.output_dir, filename)
     
     def _load_json(self, filepath: str) -> List[Dict]:
-        """Load JSON file"""
+        """Load JSON file (served from memory while unchanged on disk if enabled)"""
         try:
+            if self.config.keep_files_in_memory:
+                stat = os.stat(filepath)
+                cached = self._file_cache.get(filepath)
+                if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+                    return copy.copy(cached[1])
+            
             with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
+            
+            if self.config.keep_files_in_memory:
+                self._file_cache[filepath] = ((stat.st_mtime_ns, stat.st_size), data)
+                return copy.copy(data)
+            return data
         except FileNotFoundError:
             return []
         except json.JSONDecodeError as e:
@@ -562,6 +1317,10 @@ class BatDongSanScraper:
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             self.logger.debug(f"Saved to {filepath}")
+            
+            if self.config.keep_files_in_memory:
+                stat = os.stat(filepath)
+                self._file_cache[filepath] = ((stat.st_mtime_ns, stat.st_size), copy.copy(data))
         except Exception as e:
             self.logger.error(f"Error saving to {filepath}: {e}")
             raise
@@ -574,15 +1333,32 @@ class BatDongSanScraper:
         self, 
         start_page: int = 1, 
         end_page: int = 50,
-        only_today: bool = True
+        only_today: bool = True,
+        profile: Optional[str] = None
     ) -> Dict:
-        """Run full pipeline - only today's listings"""
+        """
+        Run full pipeline - only today's listings
+        
+        Args:
+            profile: Output prefix - profile every thread of the run and write
+                <profile>.collapsed (flamegraph) and <profile>.top.txt
+        """
+        if profile:
+            from .profiling import PipelineProfiler
+            profiler = PipelineProfiler(profile)
+            with profiler:
+                result = self.run_full_pipeline(start_page, end_page, only_today)
+            result["profile"] = profiler.outputs
+            return result
+        
         self.logger.info("=" * 70)
         self.logger.info("STARTING BATDONGSAN.VN SCRAPING PIPELINE")
         self.logger.info(f"Date: {self.today}")
         self.logger.info("=" * 70)
         
         start_time = datetime.now()
+        self.metrics = PipelineMetrics()
+        self.bandwidth.reset()
         
         self.logger.info("\nSTEP 1: Crawling Listings (Today Only)")
         new_listings = self.crawl_listings(
@@ -594,6 +1370,23 @@ class BatDongSanScraper:
         self.logger.info("\nSTEP 2: Crawling Details")
         new_details = self.crawl_details()
         
+        images = None
+        if self.config.download_images and new_details and not self.stopping:
+            from .images import ImageDownloader
+            
+            self.logger.info("\nSTEP 3: Downloading Images")
+            downloader = ImageDownloader(self.config, bandwidth=self.bandwidth, stop_event=self._stop_event)
+            images = downloader.download(
+                url for record in new_details for url in record.get("images") or ()
+            )
+        
+        reposts = None
+        if self.config.detect_reposts and images and not self.stopping:
+            from .reposts import RepostDetector
+            
+            self.logger.info("\nSTEP 4: Detecting Reposts")
+            reposts = RepostDetector(self.config).update()
+        
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
@@ -604,6 +1397,27 @@ class BatDongSanScraper:
         self.logger.info(f"New listings (today): {len(new_listings)}")
         self.logger.info(f"New details: {len(new_details)}")
         
+        bandwidth = self.bandwidth.totals()
+        self.logger.info(
+            f"Bandwidth: {bandwidth['wire_bytes'] / 1e6:.1f} MB transferred, "
+            f"{bandwidth['decoded_bytes'] / 1e6:.1f} MB decoded"
+            + (" (budget spent)" if bandwidth["budget_exhausted"] else "")
+        )
+        
+        metrics = self.metrics.snapshot()
+        for stage, stage_metrics in metrics.items():
+            timings = ", ".join(
+                f"{op} {t['total_seconds']:.1f}s" for op, t in stage_metrics["timings"].items()
+            )
+            self.logger.info(f"[{stage}] {timings}")
+        
+        if self.config.metrics_file_pattern:
+            metrics_path = self._get_filepath(
+                self.config.metrics_file_pattern.format(time=start_time.strftime("%Y-%m-%d_%H%M%S"))
+            )
+            self.metrics.save(metrics_path)
+            self.logger.info(f"Metrics saved to {metrics_path}")
+        
         return {
             "status": "success",
             "date": str(self.today),
@@ -611,12 +1425,17 @@ class BatDongSanScraper:
             "new_details": len(new_details),
             "duration_seconds": duration,
             "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat()
+            "end_time": end_time.isoformat(),
+            "metrics": metrics,
+            "bandwidth": bandwidth,
+            "images": images,
+            "reposts": reposts,
+            "concurrency": {stage: tuner.limit for stage, tuner in self.concurrency.tuners.items()},
         }
 
 
 if __name__ == "__main__":
-    scraper = BatDongSanScraper()
-    result = scraper.run_full_pipeline(start_page=1, end_page=5, only_today=True)
+    with BatDongSanScraper() as scraper:
+        result = scraper.run_full_pipeline(start_page=1, end_page=5, only_today=True)
     print(f"Date: {result['date']}")
     print(f"New listings: {result['new_listings']}")
\ No newline at end of file
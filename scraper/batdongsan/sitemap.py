@@ -0,0 +1,148 @@
+"""
+BatDongSan.vn sitemap streaming
+Incrementally parses XML sitemaps and sitemap indexes (plain or gzip)
+without holding the document in memory
+"""
+
+import gzip
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from typing import Callable, ContextManager, Dict, Iterator, Optional
+
+import requests
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass
+class SitemapEntry:
+    """A <sitemap> (kind="sitemap") or <url> (kind="url") element"""
+
+    kind: str
+    loc: str
+    lastmod: Optional[datetime] = None
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timezone-aware copy of value; naive datetimes are taken as UTC"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a W3C datetime ("2026-01-02", "2026-01-02T13:40:06+07:00", "...Z")
+
+    Values without a timezone are taken as UTC so every lastmod is comparable.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+    return as_utc(parsed)
+
+
+class _PeekableReader:
+    """File-like wrapper that can look ahead at the first bytes"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._pushback = b""
+        self.bytes_read = 0
+
+    def peek(self, size: int) -> bytes:
+        """Look at the next bytes without consuming them"""
+        if len(self._pushback) < size:
+            self._pushback += self._read_raw(size - len(self._pushback))
+        return self._pushback[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        if self._pushback:
+            if size < 0:
+                data, self._pushback = self._pushback + self._read_raw(-1), b""
+            else:
+                data, self._pushback = self._pushback[:size], self._pushback[size:]
+            return data
+        return self._read_raw(size)
+
+    def _read_raw(self, size: int) -> bytes:
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace: '{http://...}loc' -> 'loc'"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: int = 20,
+    stats: Optional[Dict[str, int]] = None,
+    open_url: Optional[Callable[[str], ContextManager[requests.Response]]] = None,
+) -> Iterator[SitemapEntry]:
+    """
+    Stream the entries of one sitemap or sitemap index
+
+    Args:
+        url: Sitemap URL (.xml or .xml.gz)
+        headers: HTTP headers (ignored with open_url)
+        timeout: Request timeout in seconds (ignored with open_url)
+        stats: Optional dict; "bytes" is incremented by the bytes downloaded,
+            "decoded_bytes" by the bytes after Content-Encoding decoding
+        open_url: Opens a streaming GET, e.g. the scraper's session under its
+            rate budget and deadline (default: a bare requests.get)
+
+    Yields:
+        SitemapEntry for every <url> and <sitemap> element, in document order
+    """
+    open_url = open_url or partial(requests.get, headers=headers, timeout=timeout, stream=True)
+    with open_url(url) as response:
+        response.raise_for_status()
+
+        # Content-Encoding: gzip is undone by urllib3; a gzipped body
+        # (sitemap.xml.gz) is detected by its magic bytes
+        response.raw.decode_content = True
+        reader = _PeekableReader(response.raw)
+        source = reader
+
+        if reader.peek(2) == GZIP_MAGIC:
+            source = gzip.GzipFile(fileobj=reader)
+
+        try:
+            root = None
+            loc = lastmod = None
+            for event, elem in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+
+                name = _local_name(elem.tag)
+
+                if name == "loc":
+                    loc = (elem.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = parse_lastmod(elem.text)
+                elif name in ("url", "sitemap"):
+                    if loc:
+                        yield SitemapEntry(kind=name, loc=loc, lastmod=lastmod)
+                    loc = lastmod = None
+                    # Drop finished elements so memory stays flat
+                    root.clear()
+        finally:
+            if stats is not None:
+                # tell() counts bytes off the wire, before Content-Encoding decoding
+                stats["bytes"] = stats.get("bytes", 0) + response.raw.tell()
+                stats["decoded_bytes"] = stats.get("decoded_bytes", 0) + reader.bytes_read
@@ -0,0 +1,66 @@
+"""
+Streaming body limits
+Early cut-off for detail pages (stop once the fields the parser reads have
+arrived) and a maximum body size for every fetch
+"""
+
+from typing import Iterable, Optional
+
+import requests
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """The body is larger than config.max_body_bytes"""
+
+
+class MarkerCutoff:
+    """
+    Finds where a page can be cut: `margin` bytes past the first occurrence
+    of the last of `markers` to arrive
+
+    BeautifulSoup cannot parse incrementally, so the stream is scanned for
+    byte markers instead and the truncated document is parsed once; the
+    margin keeps the elements that close around the markers (the value
+    next to "Ngày đăng", the rest of the div.line table).
+    """
+
+    def __init__(self, markers: Iterable[str], margin: int = 8192):
+        self.markers = [marker.encode("utf-8") for marker in markers]
+        self.margin = margin
+        self._pending = set(self.markers)
+        self._overlap = max((len(marker) for marker in self.markers), default=1) - 1
+        self._tail = b""
+        self._received = 0
+        self._last_end = 0
+        self.cut_at: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> Optional[int]:
+        """
+        Scan the next chunk of the body
+
+        Returns:
+            None to keep reading, else how many bytes of this chunk to keep
+            before closing the connection
+        """
+        if self.cut_at is None:
+            window = self._tail + chunk
+            base = self._received - len(self._tail)
+            for marker in list(self._pending):
+                pos = window.find(marker)
+                if pos >= 0:
+                    self._last_end = max(self._last_end, base + pos + len(marker))
+                    self._pending.discard(marker)
+            if not self._pending:
+                self.cut_at = self._last_end + self.margin
+            self._tail = window[-self._overlap:] if self._overlap else b""
+
+        self._received += len(chunk)
+        if self.cut_at is not None and self._received >= self.cut_at:
+            return len(chunk) - (self._received - self.cut_at)
+        return None
+
+    @classmethod
+    def cut(cls, body: bytes, markers: Iterable[str], margin: int = 8192) -> bytes:
+        """body as an early cut-off would have kept it"""
+        keep = cls(markers, margin).feed(body)
+        return body if keep is None else body[:keep]
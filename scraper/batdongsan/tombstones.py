@@ -0,0 +1,145 @@
+"""
+Tombstones for removed listings
+Expired batdongsan.vn listings return 404/410 or render a "listing does not
+exist" page; once detected they are never fetched again. Redirects away
+from the listing and empty records are only suspicious (a login wall,
+anti-bot page or layout change looks the same) and are retried instead,
+until they have stayed suspect for config.suspect_tombstone_min_hours
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .canonical import key_str, listing_key
+from .config import BatDongSanConfig
+from .jsonfiles import update_json_file
+
+
+# Reasons older versions tombstoned that are no longer proof of removal
+SUSPECT_REASONS = ("redirect", "empty_page")
+
+
+def dead_reason(status_code: int, html: str, markers: Iterable[str]) -> Optional[str]:
+    """
+    Decide whether a detail response proves the listing is gone
+
+    Returns:
+        "http_<status>" for 404/410, "soft_404" when a 200 page shows one
+        of the markers; None otherwise
+    """
+    if status_code in (404, 410):
+        return f"http_{status_code}"
+
+    if status_code != 200:
+        return None
+
+    lowered = html.lower()
+    if any(marker.lower() in lowered for marker in markers):
+        return "soft_404"
+
+    return None
+
+
+def suspect_reason(
+    url: str,
+    status_code: int,
+    final_url: str,
+    redirected: bool,
+    data: Optional[Dict],
+) -> Optional[str]:
+    """
+    Signs of a removed listing that are not proof of it
+
+    Returns:
+        "redirect" (landed on another listing or page) or "empty_page" (no
+        title, details or price parsed); None if the record looks fine
+    """
+    # Slug edits redirect to the same r<id>
+    if redirected and listing_key(final_url) != listing_key(url):
+        return "redirect"
+
+    if status_code == 200 and data is not None and not data.get("title") \
+            and not data.get("detail_info") and not data.get("price"):
+        return "empty_page"
+
+    return None
+
+
+class TombstoneStore:
+    """
+    Listing key -> {url, died_at, reason, status, final_url}, persisted as JSON
+
+    save() merges with the file under a lock, so processes sharing the
+    output dir (queue workers) keep each other's tombstones.
+    """
+
+    def __init__(self, config: BatDongSanConfig):
+        self.path = os.path.join(config.output_dir, config.tombstones_file)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._tombstones: Dict[str, Dict] = self._load()
+
+    def __contains__(self, url: str) -> bool:
+        return key_str(url) in self._tombstones
+
+    def __len__(self) -> int:
+        return len(self._tombstones)
+
+    def add(self, url: str, reason: str, status: int, final_url: str = "") -> None:
+        """Bury url (keeps the first recorded death)"""
+        key = key_str(url)
+        with self._lock:
+            if key in self._tombstones:
+                return
+            self._tombstones[key] = {
+                "url": url,
+                "died_at": datetime.now().isoformat(),
+                "reason": reason,
+                "status": status,
+                "final_url": final_url,
+            }
+            self._dirty = True
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self._tombstones.get(key_str(url))
+
+    def filter_alive(self, urls: Iterable[str]) -> List[str]:
+        return [url for url in urls if key_str(url) not in self._tombstones]
+
+    def save(self) -> None:
+        """Persist if anything was added since the last save, keeping other processes' entries"""
+        with self._lock:
+            if not self._dirty:
+                return
+
+        def merge(stored: Optional[Dict]) -> Dict[str, Dict]:
+            with self._lock:
+                merged = self._parse(stored or {})
+                for key, entry in self._tombstones.items():
+                    merged.setdefault(key, entry)
+                self._tombstones = merged
+                self._dirty = False
+                return dict(merged)
+
+        update_json_file(self.path, merge, indent=2)
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return self._parse(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _parse(stored: Dict) -> Dict[str, Dict]:
+        # Older files were keyed by raw URL and buried redirects for good
+        tombstones = {}
+        for key, entry in stored.items():
+            if entry.get("reason") in SUSPECT_REASONS:
+                continue
+            url = entry.setdefault("url", key)
+            tombstones.setdefault(key_str(url), entry)
+        return tombstones
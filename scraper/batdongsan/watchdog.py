@@ -0,0 +1,210 @@
+"""
+Fetch deadlines and hung-worker watchdog
+requests' timeout bounds each socket read, not the whole download, so a
+server trickling bytes can hold a worker for minutes. The watchdog enforces
+a total deadline per fetch and hands the slot of a stuck worker to a spare
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from .logger import setup_logger
+
+
+class FetchDeadlineExceeded(requests.exceptions.Timeout):
+    """The fetch (connect, headers and body) took longer than the deadline"""
+
+
+class _Fetch:
+    __slots__ = ("stage", "url", "thread", "started", "deadline", "response", "expired", "stuck")
+
+    def __init__(self, stage: str, url: str, deadline: Optional[float]):
+        self.stage = stage
+        self.url = url
+        self.thread = threading.get_ident()
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline if deadline else None
+        self.response: Optional[requests.Response] = None
+        self.expired = False
+        self.stuck = False
+
+
+def _abort(response: Optional[requests.Response]) -> None:
+    """Wake a thread blocked reading response's body (close() alone does not)"""
+    if response is None:
+        return
+    try:
+        sock = response.raw._fp.fp.raw._sock
+        sock.shutdown(socket.SHUT_RDWR)
+    except (AttributeError, OSError):
+        pass
+
+
+class FetchWatchdog:
+    """
+    Tracks every in-flight fetch from a background thread
+
+    - Past `deadline` seconds the fetch's socket is shut down, so the
+      worker's read fails at once and _fetch raises FetchDeadlineExceeded.
+    - Past `stuck_seconds` (e.g. still connecting or sending headers, which
+      cannot be aborted) the fetch is recorded with the worker's stack in
+      the diagnostics file and the worker's slot is released, so a spare
+      executor thread takes over its share of the work.
+    """
+
+    def __init__(
+        self,
+        deadline: Optional[float],
+        stuck_seconds: Optional[float],
+        path: Optional[str] = None,
+        on_stuck: Optional[Callable[[str], None]] = None,
+        max_entries: int = 500,
+    ):
+        """
+        Args:
+            deadline: Total seconds per fetch (None = no deadline)
+            stuck_seconds: Seconds after which a worker counts as hung (None = off)
+            path: JSON file the hung fetches are appended to
+            on_stuck: Called with the stage of every hung fetch (metrics)
+            max_entries: Diagnostics entries kept in the file
+        """
+        self.deadline = deadline
+        self.stuck_seconds = stuck_seconds
+        self.path = path
+        self.on_stuck = on_stuck
+        self.max_entries = max_entries
+        self.logger = setup_logger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._fetches: Dict[int, _Fetch] = {}
+        self._releases: Dict[int, Callable[[], None]] = {}
+        self.hung: List[Dict] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.deadline or self.stuck_seconds)
+
+    # ========================================================================
+    # PUBLIC API
+    # ========================================================================
+
+    def start(self) -> "FetchWatchdog":
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="fetch-watchdog", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @contextmanager
+    def task(self, release: Callable[[], None]) -> Iterator[None]:
+        """Register how to free the current worker's slot if it hangs"""
+        ident = threading.get_ident()
+        with self._lock:
+            self._releases[ident] = release
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._releases.pop(ident, None)
+
+    @contextmanager
+    def fetch(self, stage: str, url: str) -> Iterator[_Fetch]:
+        """
+        Watch one fetch; set .response once headers arrive so the body
+        download can be aborted
+        """
+        entry = _Fetch(stage, url, self.deadline)
+        with self._lock:
+            self._fetches[entry.thread] = entry
+        try:
+            yield entry
+            if entry.expired:
+                raise FetchDeadlineExceeded(f"No complete response within {self.deadline:g}s: {url}")
+        except requests.exceptions.RequestException as e:
+            if entry.expired and not isinstance(e, FetchDeadlineExceeded):
+                raise FetchDeadlineExceeded(f"No complete response within {self.deadline:g}s: {url}") from e
+            raise
+        finally:
+            with self._lock:
+                self._fetches.pop(entry.thread, None)
+
+    def check(self, now: Optional[float] = None) -> None:
+        """Enforce deadlines and flag hung workers (run by the watchdog thread)"""
+        now = now or time.monotonic()
+        with self._lock:
+            fetches = list(self._fetches.values())
+
+        for entry in fetches:
+            if entry.deadline is not None and now > entry.deadline and not entry.expired:
+                entry.expired = True
+                _abort(entry.response)
+
+            if self.stuck_seconds and now - entry.started > self.stuck_seconds and not entry.stuck:
+                entry.stuck = True
+                self._report_stuck(entry, now)
+
+    # ========================================================================
+    # PRIVATE
+    # ========================================================================
+
+    def _loop(self) -> None:
+        interval = min(filter(None, (self.deadline, self.stuck_seconds))) / 10
+        while not self._stop.wait(max(0.05, min(1.0, interval))):
+            self.check()
+
+    def _report_stuck(self, entry: _Fetch, now: float) -> None:
+        frame = sys._current_frames().get(entry.thread)
+        record = {
+            "at": datetime.now().isoformat(),
+            "stage": entry.stage,
+            "url": entry.url,
+            "stuck_seconds": round(now - entry.started, 1),
+            "phase": "body" if entry.response is not None else "connect/headers",
+            "stack": traceback.format_stack(frame)[-8:] if frame else [],
+        }
+        self.logger.warning(
+            f"[{entry.stage}] Worker stuck for {record['stuck_seconds']}s "
+            f"({record['phase']}), replacing it: {entry.url}"
+        )
+
+        _abort(entry.response)
+        with self._lock:
+            release = self._releases.pop(entry.thread, None)
+            self.hung.append(record)
+        if release is not None:
+            release()
+        if self.on_stuck is not None:
+            self.on_stuck(entry.stage)
+        self._save(record)
+
+    def _save(self, record: Dict) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entries = []
+        entries = (entries + [record])[-self.max_entries:]
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,271 @@
+"""
+Shared work queue for distributed detail crawling
+Several worker processes lease URLs, crawl them with the normal
+crawl_details and acknowledge the result. SQLiteWorkQueue serves the
+processes of one host; workers on several machines need a WorkQueue
+implementation over a networked broker
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from .canonical import key_str, url_key
+from .logger import setup_logger
+
+
+class WorkQueue(ABC):
+    """Lease-based URL queue; implement this for another broker"""
+
+    @abstractmethod
+    def put(self, urls: Iterable[str]) -> int:
+        """Enqueue URLs (duplicates ignored). Returns number added"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, count: int, lease_seconds: float) -> List[str]:
+        """Take up to count URLs; they return to the queue if not acked in time"""
+
+    @abstractmethod
+    def ack(self, urls: Iterable[str]) -> None:
+        """Mark leased URLs as done"""
+
+    @abstractmethod
+    def nack(self, urls: Iterable[str], error: str = "") -> None:
+        """Return leased URLs to the queue, dead-lettering them after max_attempts"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Number of URLs per state"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    WorkQueue stored in a SQLite file on local disk
+
+    Single host only: WAL mode relies on shared memory and file locks that
+    network filesystems (NFS, SMB) do not provide, so the database must not
+    be shared between machines.
+
+    States: pending -> leased -> done | pending (nack / lease expired) | dead
+
+    URLs are deduplicated by their canonical key, so the same listing under
+    a different spelling is only queued once.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS queue (
+            url TEXT PRIMARY KEY,
+            key TEXT,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            updated_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS queue_state ON queue (state, lease_expires);
+    """
+
+    KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS queue_key ON queue (key)"
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+
+    def put(self, urls: Iterable[str]) -> int:
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO queue (url, key, updated_at) VALUES (?, ?, ?)",
+                ((url, key_str(url), now) for url in urls),
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    def lease(self, worker_id: str, count: int, lease_seconds: float) -> List[str]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases count as a failed attempt
+                self._conn.execute(
+                    "UPDATE queue SET state = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END, "
+                    "last_error = 'lease expired', lease_owner = NULL, updated_at = ? "
+                    "WHERE state = 'leased' AND lease_expires < ?",
+                    (self.max_attempts, now, now),
+                )
+                rows = self._conn.execute(
+                    "SELECT url FROM queue WHERE state = 'pending' ORDER BY rowid LIMIT ?",
+                    (count,),
+                ).fetchall()
+                urls = [row[0] for row in rows]
+                self._conn.executemany(
+                    "UPDATE queue SET state = 'leased', attempts = attempts + 1, "
+                    "lease_owner = ?, lease_expires = ?, updated_at = ? WHERE url = ?",
+                    ((worker_id, now + lease_seconds, now, url) for url in urls),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return urls
+
+    def ack(self, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "UPDATE queue SET state = 'done', lease_owner = NULL, updated_at = ? "
+                "WHERE url = ? AND state = 'leased'",
+                ((now, url) for url in urls),
+            )
+            self._conn.execute("COMMIT")
+
+    def nack(self, urls: Iterable[str], error: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "UPDATE queue SET state = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END, "
+                "lease_owner = NULL, last_error = ?, updated_at = ? "
+                "WHERE url = ? AND state = 'leased'",
+                ((self.max_attempts, error, now, url) for url in urls),
+            )
+            self._conn.execute("COMMIT")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM queue GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def dead_letters(self) -> List[Dict]:
+        """URLs that exhausted max_attempts"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, attempts, last_error, updated_at FROM queue WHERE state = 'dead'"
+            ).fetchall()
+        return [
+            {"url": url, "attempts": attempts, "last_error": error, "updated_at": updated}
+            for url, attempts, error, updated in rows
+        ]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _migrate(self) -> None:
+        """Add and fill the key column on queues created before it existed"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(queue)")}
+        if "key" not in columns:
+            self._conn.execute("ALTER TABLE queue ADD COLUMN key TEXT")
+        self._conn.execute(self.KEY_INDEX)
+
+        rows = self._conn.execute("SELECT url FROM queue WHERE key IS NULL").fetchall()
+        if rows:
+            # Later duplicates of a listing keep a NULL key
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "UPDATE OR IGNORE queue SET key = ? WHERE url = ?",
+                ((key_str(url), url) for (url,) in rows),
+            )
+            self._conn.execute("COMMIT")
+
+
+class QueueWorker:
+    """Run crawl_details against batches leased from a WorkQueue"""
+
+    def __init__(
+        self,
+        scraper,
+        queue: WorkQueue,
+        worker_id: Optional[str] = None,
+        batch_size: int = 20,
+        lease_seconds: float = 600,
+    ):
+        """
+        Args:
+            scraper: BatDongSanScraper used for the crawl
+            queue: Shared queue
+            worker_id: Unique name; defaults to "<hostname>-<pid>"
+            batch_size: URLs leased per crawl_details call
+            lease_seconds: Lease timeout - keep above the time a batch takes
+        """
+        self.scraper = scraper
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.logger = setup_logger(self.__class__.__name__)
+
+        # Each worker writes its own details file so workers never overwrite
+        # each other: batdongsan_details_{date}.<worker_id>.json. The shared
+        # state files (tombstones, failures, recrawl and concurrency state)
+        # are merged with the file under a lock on every save
+        config = scraper.config
+        root, ext = os.path.splitext(config.details_file_pattern)
+        if not root.endswith(f".{self.worker_id}"):
+            config.details_file_pattern = f"{root}.{self.worker_id}{ext}"
+        config.set_date(date.today().strftime(config.date_format))
+
+        details_path = config.get_details_path()
+        self._done = {
+            url_key(item["url"]) for item in scraper._load_json(details_path) if "url" in item
+        } if os.path.exists(details_path) else set()
+
+    def run(self, stop_when_empty: bool = True, idle_sleep: float = 5.0) -> Dict[str, int]:
+        """
+        Lease, crawl and acknowledge until the queue is drained
+
+        Returns:
+            Counts of acked and nacked URLs
+        """
+        acked = nacked = 0
+        self.logger.info(f"Worker {self.worker_id} started")
+
+        while True:
+            batch = self.queue.lease(self.worker_id, self.batch_size, self.lease_seconds)
+            if not batch:
+                if stop_when_empty:
+                    break
+                time.sleep(idle_sleep)
+                continue
+
+            try:
+                details = self.scraper.crawl_details(urls=batch, resume=True)
+            except Exception as e:
+                self.logger.error(f"Batch failed: {e}")
+                self.queue.nack(batch, error=f"{type(e).__name__}: {e}")
+                nacked += len(batch)
+                continue
+
+            self._done.update(url_key(item["url"]) for item in details)
+
+            # URLs skipped by resume were crawled earlier by this worker;
+            # removed (tombstoned) listings are done too
+            tombstones = self.scraper.tombstones
+            succeeded = [url for url in batch if url_key(url) in self._done or url in tombstones]
+            failed = [url for url in batch if url_key(url) not in self._done and url not in tombstones]
+
+            self.queue.ack(succeeded)
+            if failed:
+                self.queue.nack(failed, error="detail fetch failed")
+
+            acked += len(succeeded)
+            nacked += len(failed)
+            self.logger.info(f"Batch done: {len(succeeded)} acked, {len(failed)} nacked | {self.queue.stats()}")
+
+        self.logger.info(f"Worker {self.worker_id} finished: {acked} acked, {nacked} nacked")
+        return {"acked": acked, "nacked": nacked}
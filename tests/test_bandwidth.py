@@ -0,0 +1,39 @@
+import threading
+import time
+
+from scraper.batdongsan.bandwidth import BandwidthMeter
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.scraper import BatDongSanScraper
+
+
+URL = "https://batdongsan.vn/ban-nha-quan-1-r123456"
+
+
+def test_pause_wait_returns_on_stop():
+    meter = BandwidthMeter(budget_bytes=100, action="pause", window_seconds=60)
+    meter.record("detail", URL, 100, 100)
+    stop = threading.Event()
+    threading.Timer(0.05, stop.set).start()
+
+    started = time.monotonic()
+    waited = meter.wait(stop)
+    assert time.monotonic() - started < 5
+    assert 0.0 < waited < 5
+
+
+def test_stop_during_pause_skips_the_fetch(tmp_path):
+    config = BatDongSanConfig(
+        output_dir=str(tmp_path),
+        bandwidth_budget_bytes=100,
+        bandwidth_budget_action="pause",
+        bandwidth_window_seconds=60,
+    )
+    with BatDongSanScraper(config) as scraper:
+        scraper.bandwidth.record("detail", URL, 100, 100)
+        requested = []
+        scraper.session.get = lambda url, **kwargs: requested.append(url)
+        threading.Timer(0.05, scraper.request_stop).start()
+
+        assert scraper._crawl_detail_page_once(URL) is None
+        assert requested == []
+        assert scraper.ledger.get("detail", URL) is None
@@ -0,0 +1,25 @@
+import pytest
+
+from scraper.batdongsan.canonical import SITE_ALONHADAT, SITE_SHIFT, canonical_url, listing_key, url_key
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://batdongsan.vn/ban-nha-quan-12-r197474/?utm_source=x", 197474),
+    ("http://www.batdongsan.vn/slug-sua-lai-r197474", 197474),
+    ("https://m.batdongsan.vn/ban-nha-r197474", 197474),
+    ("https://alonhadat.com.vn/ban-nha-15234567.html", (SITE_ALONHADAT << SITE_SHIFT) | 15234567),
+    ("https://batdongsan.vn/ban-nha-dat", None),
+    # Other hosts have no site id, whatever their paths look like
+    ("https://example.com/ban-nha-r197474", None),
+    ("https://notbatdongsan.vn/ban-nha-r197474", None),
+    ("https://batdongsan.vn.example.com/ban-nha-r197474", None),
+    ("/ban-nha-r197474", None),
+])
+def test_listing_key(url, expected):
+    assert listing_key(url) == expected
+
+
+def test_unknown_hosts_dedupe_by_canonical_url():
+    url = "https://example.com/ban-nha-r197474/?utm_source=x"
+    assert url_key(url) == canonical_url(url) == "https://example.com/ban-nha-r197474"
+    assert url_key(url) != url_key("https://batdongsan.vn/ban-nha-r197474")
@@ -0,0 +1,45 @@
+import json
+import os
+
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.scraper import BatDongSanScraper
+
+
+CHANGED = "https://batdongsan.vn/nha-r1"
+UNCHANGED = "https://batdongsan.vn/nha-r2"
+
+
+def write(config, filename, records):
+    with open(os.path.join(config.output_dir, filename), "w", encoding="utf-8") as f:
+        json.dump(records, f)
+
+
+def test_card_changed_after_detail_fetch_is_fetched_again(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path), card_mode=True)
+    write(config, config.links_file, [
+        {"url": CHANGED, "needs_detail": True, "card_changed_at": "2026-01-01T12:00:00"},
+        {"url": UNCHANGED, "needs_detail": True, "card_changed_at": "2026-01-01T08:00:00"},
+    ])
+    write(config, config.details_file, [
+        {"url": CHANGED, "price": "1 tỷ", "crawled_at": "2026-01-01T10:00:00"},
+        {"url": UNCHANGED, "price": "1 tỷ", "crawled_at": "2026-01-01T10:00:00"},
+    ])
+
+    with BatDongSanScraper(config) as scraper:
+        fetched = []
+
+        def fetch(url):
+            fetched.append(url)
+            return {"url": url, "price": "2 tỷ", "crawled_at": "2026-01-01T13:00:00"}
+
+        scraper._crawl_single_detail_page = fetch
+        scraper.crawl_details()
+        assert fetched == [CHANGED]
+
+        # Once re-fetched it is up to date again
+        scraper.crawl_details()
+        assert fetched == [CHANGED]
+
+    with open(os.path.join(config.output_dir, config.details_file), encoding="utf-8") as f:
+        details = {item["url"]: item["price"] for item in json.load(f)}
+    assert details == {CHANGED: "2 tỷ", UNCHANGED: "1 tỷ"}
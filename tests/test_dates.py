@@ -0,0 +1,54 @@
+import unicodedata
+from datetime import date
+
+import pytest
+
+from scraper.batdongsan.dates import PostDateParser
+
+
+TODAY = date(2026, 1, 2)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Hôm nay", TODAY),
+    ("hôm qua", date(2026, 1, 1)),
+    ("30 giây trước", TODAY),
+    ("5 phút trước", TODAY),
+    ("10 giờ trước", TODAY),
+    ("1 ngày trước", date(2026, 1, 1)),
+    ("3ngày trước", date(2025, 12, 30)),
+    ("2 tuần trước", date(2025, 12, 19)),
+    ("1 tháng trước", date(2025, 12, 3)),
+    ("1 năm trước", date(2025, 1, 2)),
+    ("01/01/2026", date(2026, 1, 1)),
+    ("Đăng 5/3/2025", date(2025, 3, 5)),
+])
+def test_parse(text, expected):
+    assert PostDateParser().parse(text, TODAY) == expected
+
+
+@pytest.mark.parametrize("text", ["", "Tin VIP", "31/02/2026", "trước"])
+def test_parse_unknown(text):
+    assert PostDateParser().parse(text, TODAY) is None
+
+
+def test_parse_decomposed_unicode():
+    # NFD text (combining diacritics) as some pages serve it
+    assert PostDateParser().parse(unicodedata.normalize("NFD", "Hôm qua"), TODAY) == date(2026, 1, 1)
+
+
+def test_reference_is_evaluated_per_call():
+    reference = [TODAY]
+    parser = PostDateParser(reference=lambda: reference[0])
+    assert parser.parse("1 ngày trước") == date(2026, 1, 1)
+
+    # Cached offsets still follow the clock across midnight
+    reference[0] = date(2026, 1, 3)
+    assert parser.parse("1 ngày trước") == date(2026, 1, 2)
+    assert parser.cache_info().hits == 1
+
+
+def test_parse_many():
+    assert PostDateParser().parse_many(["Hôm nay", None, "x", "2 ngày trước"], TODAY) == [
+        TODAY, None, None, date(2025, 12, 31),
+    ]
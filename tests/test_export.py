@@ -0,0 +1,70 @@
+import glob
+import json
+import os
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pd = pytest.importorskip("pandas")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from scraper.batdongsan.config import BatDongSanConfig  # noqa: E402
+from scraper.batdongsan.export import DetailsParquetExporter  # noqa: E402
+from scraper.batdongsan.normalize import PriceAreaNormalizer, to_number  # noqa: E402
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    return DetailsParquetExporter(BatDongSanConfig(output_dir=str(tmp_path / "raw")))
+
+
+@pytest.mark.parametrize("value, dtype, expected", [
+    ("1.200 m²", pa.float64(), 1200.0),
+    ("1,5 tỷ", pa.float64(), 1.5),
+    ("4,5 m", pa.float64(), 4.5),
+    ("3 phòng", pa.int16(), 3),
+    ("Không rõ", pa.float64(), None),
+    ("Sổ đỏ", pa.string(), "Sổ đỏ"),
+])
+def test_convert(exporter, value, dtype, expected):
+    assert exporter._convert(value, dtype) == expected
+
+
+@pytest.mark.parametrize("token", ["1.200", "1,5", "6.5", "12.500.000", "93"])
+def test_convert_agrees_with_normalizer(exporter, token):
+    assert exporter._convert(token, pa.float64()) == to_number(pd.Series([token]))[0]
+
+
+def test_normalizer_reads_the_same_numbers():
+    df = PriceAreaNormalizer().normalize(pd.DataFrame({"price": ["1,5 tỷ"], "area": ["1.200 m²"]}))
+    assert df["price_vnd"][0] == 1.5e9
+    assert df["area_m2"][0] == 1200.0
+
+
+def write_details(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False)
+    return str(path)
+
+
+def test_export_refuses_then_replaces_existing_dataset(exporter, tmp_path):
+    record = {"url": "https://batdongsan.vn/nha-r1", "date_posted": "01/01/2026",
+              "category": "Bán Nhà, Quận 1, Hồ Chí Minh"}
+    big = write_details(tmp_path / "big.json", [
+        dict(record, url=f"https://batdongsan.vn/nha-r{i}", category=f"Bán Nhà, {'Hà Nội' if i % 2 else 'Hồ Chí Minh'}")
+        for i in range(40)
+    ])
+    small = write_details(tmp_path / "small.json", [record])
+    out = str(tmp_path / "parquet")
+
+    # Two partitions through one open file: each gets several part files
+    exporter.max_open_files = 1
+    exporter.row_group_size = 5
+    assert exporter.export(out, [big])["rows"] == 40
+    assert len(glob.glob(os.path.join(out, "*", "*", "part-*.parquet"))) > 2
+
+    with pytest.raises(FileExistsError):
+        exporter.export(out, [small])
+
+    exporter.export(out, [small], overwrite=True)
+    assert pq.read_table(out).num_rows == 1
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from scraper.batdongsan.jsonfiles import iter_json_array
+
+
+RECORDS = [
+    {"url": "https://batdongsan.vn/nha-r1", "title": "Nhà [mặt tiền], {gần chợ}", "price": "3,5 tỷ"},
+    {"url": "https://batdongsan.vn/nha-r2", "images": ["a.jpg", "b.jpg"], "detail_info": {"Hướng": "Đông"}},
+    {"url": "https://batdongsan.vn/nha-r3", "description": "\"quoted\" \\ ] ,\n" * 50},
+]
+
+
+def write(tmp_path, text: str) -> str:
+    path = tmp_path / "records.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_reads_every_record_across_chunk_boundaries(tmp_path, chunk_size, indent):
+    path = write(tmp_path, json.dumps(RECORDS, ensure_ascii=False, indent=indent))
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == RECORDS
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ \n ]\n", ""])
+def test_empty(tmp_path, text):
+    assert list(iter_json_array(write(tmp_path, text))) == []
+
+
+def test_yields_records_before_a_truncated_tail(tmp_path):
+    path = write(tmp_path, json.dumps(RECORDS)[:-1] + ', {"url": ')
+    items = iter_json_array(path, chunk_size=16)
+    assert [next(items) for _ in RECORDS] == RECORDS
+    with pytest.raises(json.JSONDecodeError):
+        next(items)
+
+
+def test_rejects_non_array(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_json_array(write(tmp_path, json.dumps(RECORDS[0]))))
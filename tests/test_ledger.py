@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import requests
+
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.ledger import FailureLedger
+from scraper.batdongsan.scraper import BatDongSanScraper
+
+
+R1 = "https://batdongsan.vn/nha-r1"
+R2 = "https://batdongsan.vn/nha-r2"
+
+
+def test_retry_backoff(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path), retry_backoff_seconds=60, retry_max_attempts=3)
+    ledger = FailureLedger(config)
+    ledger.record_failure("detail", R1, "Timeout")
+    ledger.record_failure("detail", R1 + "?utm_source=x", "Timeout")
+
+    entry = ledger.get("detail", R1)
+    assert entry["attempts"] == 2
+    last = datetime.fromisoformat(entry["last_attempt_at"]).timestamp()
+    assert ledger.due(now=last + 119) == []
+    assert [e["url"] for e in ledger.due(now=last + 120)] == [R1]
+
+    ledger.record_failure("detail", R1, "Timeout")
+    assert ledger.due(now=last + 10 ** 6) == []
+
+
+def test_ledgers_sharing_a_file_keep_each_others_entries(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path))
+    first, second = FailureLedger(config), FailureLedger(config)
+    first.record_failure("detail", R1, "Timeout")
+    second.record_failure("detail", R2, "HTTPError", 500)
+    first.save()
+    second.save()
+    assert {e["url"] for e in FailureLedger(config).entries()} == {R1, R2}
+
+    # A resolve is a change too; untouched entries of others stay
+    second.resolve("detail", R1)
+    second.save()
+    first.record_failure("listing", R1, "Timeout", root="https://batdongsan.vn/ban-nha-dat", page=2)
+    first.save()
+    assert {(e["stage"], e["url"]) for e in FailureLedger(config).entries()} == {("detail", R2), ("listing", R1)}
+
+
+def test_listing_retry_keeps_only_today(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path), retry_backoff_seconds=0)
+    root = "https://batdongsan.vn/ban-nha-dat"
+    with BatDongSanScraper(config) as scraper:
+        def timeout(url, stage="other", cutoff=None):
+            raise requests.exceptions.Timeout()
+
+        scraper._fetch = timeout
+        scraper._crawl_listing_page_once(3, only_today=False, root=root)
+        scraper._crawl_listing_page_once(4, only_today=True, root=root)
+
+        retried = []
+        scraper._crawl_single_listing_page = lambda page, only_today, root: retried.append((page, only_today)) or ([], False)
+        scraper.retry_failures("listing")
+
+    assert sorted(retried) == [(3, False), (4, True)]
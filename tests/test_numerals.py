@@ -0,0 +1,19 @@
+import pytest
+
+from scraper.batdongsan.numerals import parse_number
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.200 m²", 1200.0),
+    ("12.500.000", 12_500_000.0),
+    ("1,5 tỷ", 1.5),
+    ("6.5 m", 6.5),
+    ("93 m²", 93.0),
+    ("3 phòng", 3.0),
+    ("Diện tích: 1.200,5", None),
+    ("", None),
+    (None, None),
+    ("Không rõ", None),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
@@ -0,0 +1,36 @@
+import json
+from datetime import datetime, timedelta
+
+from scraper.batdongsan import priority
+from scraper.batdongsan.canonical import url_key
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.priority import DetailPrioritizer
+
+
+def write_details(config, days_ago, urls):
+    date = (datetime.now() - timedelta(days=days_ago)).strftime(config.date_format)
+    path = f"{config.output_dir}/{config.details_file_pattern.format(date=date)}"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"url": url} for url in urls], f)
+
+
+def test_crawled_before_reads_history_once(tmp_path, monkeypatch):
+    config = BatDongSanConfig(output_dir=str(tmp_path), priority_history_days=7)
+    write_details(config, 1, ["https://batdongsan.vn/nha-r1"])
+    write_details(config, 30, ["https://batdongsan.vn/nha-r2"])  # outside the window
+
+    reads = []
+    iter_json_array = priority.iter_json_array
+    monkeypatch.setattr(priority, "iter_json_array", lambda path: reads.append(path) or iter_json_array(path))
+
+    prioritizer = DetailPrioritizer(config)
+    assert prioritizer.crawled_before() == {url_key("https://batdongsan.vn/nha-r1")}
+    prioritizer.mark_crawled([url_key("https://batdongsan.vn/nha-r3")])
+    assert prioritizer.crawled_before() == {
+        url_key("https://batdongsan.vn/nha-r1"),
+        url_key("https://batdongsan.vn/nha-r3"),
+    }
+    assert len(reads) == 1
+
+    # A different window is read again
+    assert url_key("https://batdongsan.vn/nha-r2") in prioritizer.crawled_before(days=60)
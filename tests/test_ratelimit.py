@@ -0,0 +1,70 @@
+import pytest
+
+from scraper.batdongsan import ratelimit
+from scraper.batdongsan.ratelimit import HostRateLimiter
+
+
+class FakeClock:
+    """monotonic() / sleep() that only move when slept"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+def test_spaces_requests_per_host(clock):
+    limiter = HostRateLimiter(rate=2.0)
+    waits = [limiter.acquire("https://a.example/p/1") for _ in range(4)]
+    assert waits == pytest.approx([0.0, 0.5, 0.5, 0.5])
+    assert clock.now == pytest.approx(1001.5)
+
+
+def test_burst_runs_back_to_back_then_spaces(clock):
+    limiter = HostRateLimiter(rate=1.0, burst=3)
+    waits = [limiter.acquire("https://a.example/") for _ in range(5)]
+    assert waits == pytest.approx([0.0, 0.0, 0.0, 1.0, 1.0])
+
+
+def test_idle_time_refills_burst(clock):
+    limiter = HostRateLimiter(rate=1.0, burst=2)
+    limiter.acquire("https://a.example/")
+    limiter.acquire("https://a.example/")
+    clock.sleep(10)
+    assert limiter.acquire("https://a.example/") == 0.0
+    assert limiter.acquire("https://a.example/") == 0.0
+    assert limiter.acquire("https://a.example/") == pytest.approx(1.0)
+
+
+def test_hosts_have_separate_budgets(clock):
+    limiter = HostRateLimiter(rate=1.0)
+    assert limiter.acquire("https://a.example/x") == 0.0
+    assert limiter.acquire("https://b.example/x") == 0.0
+    assert limiter.acquire("https://a.example/y") == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("rate", [None, 0])
+def test_disabled(clock, rate):
+    limiter = HostRateLimiter(rate=rate)
+    assert [limiter.acquire("https://a.example/") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.state() == {}
+
+
+def test_state_reports_backlog_and_wait(clock):
+    limiter = HostRateLimiter(rate=2.0)
+    for _ in range(3):
+        limiter.acquire("https://a.example/")
+    state = limiter.state()["a.example"]
+    assert state["waited_seconds"] == pytest.approx(1.0)
+    assert state["backlog_seconds"] == pytest.approx(0.5)
@@ -0,0 +1,147 @@
+import math
+import time
+
+import pytest
+
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.recrawl import RecrawlScheduler, content_hash
+from scraper.batdongsan.scraper import BatDongSanScraper
+
+
+HOUR = 3600.0
+URL = "https://batdongsan.vn/ban-nha-quan-1-r123456"
+
+
+@pytest.fixture
+def config(tmp_path):
+    return BatDongSanConfig(
+        output_dir=str(tmp_path),
+        recrawl_initial_interval_hours=24.0,
+        recrawl_min_interval_hours=6.0,
+        recrawl_max_interval_hours=24.0 * 14,
+    )
+
+
+def visit(scheduler, prices, url=URL, every_hours=24.0):
+    """Visit url once per price, every_hours apart; returns the time of the last visit"""
+    now = 0.0
+    for i, price in enumerate(prices):
+        now = 1_000_000.0 + i * every_hours * HOUR
+        scheduler.observe(url, {"title": "Nhà", "price": price}, now=now)
+    return now
+
+
+def test_first_visit_uses_initial_interval(config):
+    scheduler = RecrawlScheduler(config)
+    now = visit(scheduler, ["1 tỷ"])
+    entry = scheduler.get(URL)
+    assert entry["rate_per_hour"] is None
+    assert entry["next_visit"] == now + 24.0 * HOUR
+
+
+def test_estimator(config):
+    # 4 revisits a day apart, 2 of which saw a change
+    scheduler = RecrawlScheduler(config)
+    now = visit(scheduler, ["1 tỷ", "1 tỷ", "2 tỷ", "2 tỷ", "3 tỷ"])
+    entry = scheduler.get(URL)
+    expected_rate = -math.log((4 - 2 + 0.5) / (4 + 0.5)) / 24.0
+    assert (entry["visits"], entry["changes"]) == (4, 2)
+    assert entry["rate_per_hour"] == pytest.approx(expected_rate)
+    assert entry["next_visit"] == pytest.approx(now + HOUR / expected_rate)
+
+
+def test_unchanged_listing_backs_off_to_max(config):
+    scheduler = RecrawlScheduler(config)
+    now = visit(scheduler, ["1 tỷ"] * 4)
+    entry = scheduler.get(URL)
+    assert entry["rate_per_hour"] == 0.0
+    assert entry["next_visit"] == pytest.approx(now + 24.0 * 14 * HOUR)
+
+
+def test_always_changing_listing_clamps_to_min(config):
+    scheduler = RecrawlScheduler(config)
+    now = visit(scheduler, [f"{i} tỷ" for i in range(6)], every_hours=1.0)
+    assert scheduler.get(URL)["next_visit"] == pytest.approx(now + 6.0 * HOUR)
+
+
+def test_content_hash_covers_tracked_fields_only():
+    record = {"title": "Nhà", "price": "1 tỷ", "description": "x"}
+    assert content_hash(record) == content_hash(dict(record, description="y"))
+    assert content_hash(record) != content_hash(dict(record, price="2 tỷ"))
+
+
+def test_url_spellings_share_history(config):
+    scheduler = RecrawlScheduler(config)
+    scheduler.observe(URL, {"price": "1 tỷ"}, now=1.0)
+    assert scheduler.observe(URL + "?utm_source=x", {"price": "2 tỷ"}, now=1.0 + HOUR)
+    assert len(scheduler) == 1
+
+
+def test_due_most_overdue_first(config):
+    scheduler = RecrawlScheduler(config)
+    urls = [f"https://batdongsan.vn/nha-r{i}" for i in range(3)]
+    for i, url in enumerate(urls):
+        scheduler.observe(url, {"price": "1 tỷ"}, now=1_000_000.0 + i * HOUR)
+
+    later = 1_000_000.0 + 30 * HOUR
+    assert scheduler.due(now=later) == urls
+    assert scheduler.due(now=later, limit=2) == urls[:2]
+    assert scheduler.due(now=1_000_000.0) == []
+
+    scheduler.forget(urls[0])
+    assert scheduler.due(now=later) == urls[1:]
+
+
+def test_state_round_trip(config):
+    scheduler = RecrawlScheduler(config)
+    visit(scheduler, ["1 tỷ", "2 tỷ"])
+    scheduler.save()
+    assert RecrawlScheduler(config).get(URL) == scheduler.get(URL)
+
+
+def test_failures_back_off(config):
+    scheduler = RecrawlScheduler(config)
+    now = visit(scheduler, ["1 tỷ", "1 tỷ"])
+    history = scheduler.get(URL)["history"]
+
+    for failures, hours in [(1, 6.0), (2, 12.0), (3, 24.0), (10, 24.0 * 14)]:
+        while scheduler.get(URL).get("failures", 0) < failures:
+            scheduler.observe_failure(URL, now=now)
+        assert scheduler.get(URL)["next_visit"] == pytest.approx(now + hours * HOUR)
+    assert scheduler.get(URL)["history"] == history
+
+    scheduler.observe(URL, {"title": "Nhà", "price": "1 tỷ"}, now=now + HOUR)
+    assert "failures" not in scheduler.get(URL)
+
+
+def test_failing_listing_does_not_block_healthy_one(config):
+    dead = "https://batdongsan.vn/nha-r1"
+    live = "https://batdongsan.vn/nha-r2"
+    with BatDongSanScraper(config) as scraper:
+        # dead is the most overdue
+        scraper.recrawl_scheduler.observe(dead, {"price": "1 tỷ"}, now=time.time() - 72 * HOUR)
+        scraper.recrawl_scheduler.observe(live, {"price": "1 tỷ"}, now=time.time() - 48 * HOUR)
+        fetched = []
+
+        def fetch(url):
+            fetched.append(url)
+            return {"url": url, "price": "2 tỷ"} if url == live else None
+
+        scraper._crawl_single_detail_page = fetch
+        for _ in range(3):
+            scraper.recrawl(max_requests=1)
+
+    assert fetched == [dead, live]
+
+
+def test_schedulers_sharing_a_file_keep_each_others_listings(config):
+    first, second = RecrawlScheduler(config), RecrawlScheduler(config)
+    first.observe("https://batdongsan.vn/nha-r1", {"price": "1 tỷ"}, now=1.0)
+    second.observe("https://batdongsan.vn/nha-r2", {"price": "1 tỷ"}, now=1.0)
+    first.save()
+    second.save()
+    assert len(RecrawlScheduler(config)) == 2
+
+    first.forget("https://batdongsan.vn/nha-r2")
+    first.save()
+    assert [entry["url"] for entry in RecrawlScheduler(config)._state.values()] == ["https://batdongsan.vn/nha-r1"]
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from scraper.batdongsan import reposts
+from scraper.batdongsan.reposts import HammingIndex, phash_batch
+
+
+def reference_phash(image: np.ndarray) -> int:
+    """pHash spelled out: 2-D DCT-II, top-left 8x8 thresholded at its median"""
+    n = image.shape[0]
+    k = np.arange(n)
+    basis = np.cos(np.pi * np.outer(k, 2 * k + 1) / (2 * n))
+    coeffs = basis @ image.astype(np.float64) @ basis.T
+    low = coeffs[:8, :8].ravel()
+    bits = low > np.median(low)
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def flip_bits(value: int, count: int, rng: np.random.Generator) -> int:
+    for bit in rng.choice(64, size=count, replace=False):
+        value ^= 1 << int(bit)
+    return value
+
+
+def popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+# ============================================================================
+# phash_batch
+# ============================================================================
+
+def smooth_images(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Random low frequencies plus a little noise, as downscaled photos are"""
+    x = np.linspace(0, 1, 32)
+    waves = [np.outer(np.cos(np.pi * i * x), np.cos(np.pi * j * x)) for i in range(6) for j in range(6)]
+    return np.stack([
+        sum(rng.normal() * wave for wave in waves) * 40 + 128 + rng.normal(0, 2, (32, 32))
+        for _ in range(count)
+    ])
+
+
+def test_phash_batch_matches_reference():
+    images = smooth_images(np.random.default_rng(0), 16)
+    hashes = phash_batch(images)
+    assert hashes.dtype == np.uint64
+    assert hashes.tolist() == [reference_phash(image) for image in images]
+
+
+def test_phash_batch_is_stable_under_small_changes():
+    rng = np.random.default_rng(1)
+    base = smooth_images(rng, 8)
+    brighter = base * 1.1 + 5
+    noisy = base + rng.normal(0, 5, base.shape)
+
+    base_hashes, brighter_hashes, noisy_hashes = (phash_batch(p).tolist() for p in (base, brighter, noisy))
+    assert all(popcount(a ^ b) <= 1 for a, b in zip(base_hashes, brighter_hashes))  # only the DC bit may move
+    assert all(popcount(a ^ b) <= 6 for a, b in zip(base_hashes, noisy_hashes))
+    # Unrelated images are far apart
+    assert min(popcount(a ^ b) for a in base_hashes for b in base_hashes if a != b) > 12
+
+
+def test_phash_batch_empty():
+    assert phash_batch(np.zeros((0, 32, 32))).shape == (0,)
+
+
+# ============================================================================
+# HammingIndex
+# ============================================================================
+
+@pytest.mark.parametrize("radius, chunks", [(6, 4), (3, 4), (6, 8), (0, 4)])
+def test_query_matches_brute_force(radius, chunks):
+    rng = np.random.default_rng(radius * 10 + chunks)
+    indexed = [int(v) for v in rng.integers(0, 2 ** 64, 3000, dtype=np.uint64)]
+    owners = list(range(len(indexed)))
+
+    index = HammingIndex(radius=radius, chunks=chunks)
+    # Uneven batches so segments get merged
+    for start, stop in [(0, 1000), (1000, 1400), (1400, 1500), (1500, 1510), (1510, 3000)]:
+        index.add(np.array(indexed[start:stop], dtype=np.uint64), np.array(owners[start:stop]))
+    assert len(index) == len(indexed)
+    assert sorted(index.owners.tolist()) == owners
+
+    # Near-duplicates at every distance up to radius + 2, plus unrelated hashes
+    queries = [
+        flip_bits(indexed[int(i)], distance, rng)
+        for distance in range(radius + 3)
+        for i in rng.integers(0, len(indexed), 20)
+    ]
+    queries += [int(v) for v in rng.integers(0, 2 ** 64, 50, dtype=np.uint64)]
+
+    query_idx, found_owners, distances = index.query(np.array(queries, dtype=np.uint64))
+    found = set(zip(query_idx.tolist(), found_owners.tolist(), distances.tolist()))
+
+    expected = {
+        (q, owner, popcount(query ^ value))
+        for q, query in enumerate(queries)
+        for owner, value in zip(owners, indexed)
+        if popcount(query ^ value) <= radius
+    }
+    assert found == expected
+    assert len(found) == len(query_idx)  # no duplicate matches
+
+
+def test_query_empty_index():
+    query_idx, owners, distances = HammingIndex().query(np.array([1, 2], dtype=np.uint64))
+    assert len(query_idx) == len(owners) == len(distances) == 0
+
+
+def test_chunks_must_split_64_bits():
+    with pytest.raises(ValueError):
+        HammingIndex(chunks=5)
+
+
+def test_popcount_without_bitwise_count(monkeypatch):
+    values = np.array([0, 1, 2 ** 63, 2 ** 64 - 1, 0xF0F0], dtype=np.uint64)
+    expected = [0, 1, 1, 64, 8]
+    assert reposts._popcount(values).tolist() == expected
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert reposts._popcount(values).tolist() == expected
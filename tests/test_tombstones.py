@@ -0,0 +1,102 @@
+import json
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from scraper.batdongsan.config import BatDongSanConfig
+from scraper.batdongsan.scraper import BatDongSanScraper
+from scraper.batdongsan.tombstones import TombstoneStore, dead_reason, suspect_reason
+
+
+MARKERS = BatDongSanConfig.soft_404_markers
+URL = "https://batdongsan.vn/ban-nha-quan-1-r123456"
+LISTING = {"title": "Nhà", "price": "1 tỷ", "detail_info": {"Diện tích": "50 m²"}}
+
+
+@pytest.mark.parametrize("status, html, expected", [
+    (404, "", "http_404"),
+    (410, "<html>Gone</html>", "http_410"),
+    (200, "<h1>Tin đăng không tồn tại</h1>", "soft_404"),
+    (200, "<h1>TIN ĐĂNG ĐÃ HẾT HẠN</h1>", "soft_404"),
+    (200, "<h1>Nhà quận 1</h1>", None),
+    (500, "Không tìm thấy trang", None),  # error pages are failures, not proof
+    (403, "", None),
+    (429, "", None),
+])
+def test_dead_reason(status, html, expected):
+    assert dead_reason(status, html, MARKERS) == expected
+
+
+@pytest.mark.parametrize("final_url, redirected, data, expected", [
+    (URL, False, LISTING, None),
+    ("https://batdongsan.vn/ban-nha-quan-1-moi-r123456", True, LISTING, None),  # slug edit
+    ("https://batdongsan.vn/ban-nha-dat", True, LISTING, "redirect"),
+    ("https://batdongsan.vn/ban-nha-khac-r999", True, LISTING, "redirect"),
+    (URL, False, {"title": "", "price": "", "detail_info": {}}, "empty_page"),
+    (URL, False, {"price": "1 tỷ"}, None),
+    (URL, False, None, None),
+])
+def test_suspect_reason(final_url, redirected, data, expected):
+    assert suspect_reason(URL, 200, final_url, redirected, data) == expected
+
+
+def test_store_round_trip(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path))
+    store = TombstoneStore(config)
+    store.add(URL, "http_404", 404)
+    store.add(URL, "soft_404", 200)  # first death wins
+    store.save()
+
+    reloaded = TombstoneStore(config)
+    assert URL + "?utm_source=x" in reloaded
+    assert reloaded.get(URL)["reason"] == "http_404"
+    assert reloaded.filter_alive([URL, "https://batdongsan.vn/nha-r1"]) == ["https://batdongsan.vn/nha-r1"]
+
+
+def test_store_drops_suspect_entries_from_older_files(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path))
+    redirected = "https://batdongsan.vn/nha-r2"
+    with open(os.path.join(str(tmp_path), config.tombstones_file), "w", encoding="utf-8") as f:
+        json.dump({
+            URL: {"reason": "http_410", "status": 410},
+            redirected: {"reason": "redirect", "status": 200},
+        }, f)
+
+    store = TombstoneStore(config)
+    assert URL in store
+    assert redirected not in store
+
+
+def test_repeated_suspect_results_tombstone(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path), suspect_tombstone_after=3, suspect_tombstone_min_hours=24)
+    response = SimpleNamespace(status_code=200, url="https://batdongsan.vn/ban-nha-dat")
+    with BatDongSanScraper(config) as scraper:
+        # Quick retries of a login wall are not proof
+        for _ in range(4):
+            scraper._record_suspect(URL, response, "redirect")
+        assert URL not in scraper.tombstones
+        assert scraper.ledger.get("detail", URL)["suspect_streak"] == 4
+
+        # Still suspect a day later
+        since = (datetime.now() - timedelta(hours=25)).isoformat()
+        scraper.ledger.record_failure("detail", URL, "redirect", 200, suspect_streak=2, suspect_since=since)
+        scraper._record_suspect(URL, response, "redirect")
+        assert scraper.tombstones.get(URL)["reason"] == "repeated_redirect"
+        assert scraper.ledger.get("detail", URL) is None
+
+        scraper.tombstones.save()
+    assert URL in TombstoneStore(config)
+
+
+def test_stores_sharing_a_file_keep_each_others_entries(tmp_path):
+    config = BatDongSanConfig(output_dir=str(tmp_path))
+    first, second = TombstoneStore(config), TombstoneStore(config)
+    first.add("https://batdongsan.vn/nha-r1", "http_404", 404)
+    second.add("https://batdongsan.vn/nha-r2", "http_410", 410)
+    first.save()
+    second.save()
+
+    assert len(TombstoneStore(config)) == 2
+    assert "https://batdongsan.vn/nha-r1" in second